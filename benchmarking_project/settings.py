@@ -109,6 +109,25 @@ DATABASES = {
 }
 
 
+# File uploads
+# https://docs.djangoproject.com/en/5.0/ref/settings/#file-upload-max-memory-size
+# CSV uploads up to this size stay in memory and are parsed straight from the request, larger ones are spooled by Django to a private temporary file
+
+FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Shared by the processes of the web server: the live progress of upload jobs (benchmarks/jobs.py) is read by whichever process serves the poll
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
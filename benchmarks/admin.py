@@ -2,7 +2,7 @@ from django.urls import path
 from django.contrib import admin
 from django.contrib.admin.views.decorators import staff_member_required
 from django.http import HttpResponse
-from .views import dataupload
+from .views import dataupload, uploadprogress, uploadlog, uploadlogdownload
 
 # import models
 from .models import Topology, Manufacturer, Technology, Processor
@@ -10,7 +10,7 @@ from .models import GateSet, Gate, GateSetMembership
 from .models import System, Calibration
 from .models import Solver, PerformanceMetric, Graph, Problem, PerformanceReport
 from .models import CompilationTool, CompilationAlgorithmn, CompilationStep, PerformanceValue, ProblemInstance
-from .models import ErrorLog
+from .models import ErrorLog, UploadJob, IngestCheckpoint, IngestToken
 
 # customize admin site
 class AdminSiteBench(admin.AdminSite):
@@ -18,6 +18,9 @@ class AdminSiteBench(admin.AdminSite):
         urls = super().get_urls()
         custom_urls = [
             path('dataupload/', self.admin_view(dataupload), name='custom_admin_view'),
+            path('dataupload/progress/<int:job_id>/', self.admin_view(uploadprogress), name='dataupload_progress'),
+            path('dataupload/log/<int:job_id>/', self.admin_view(uploadlog), name='dataupload_log'),
+            path('dataupload/log/<int:job_id>/download/', self.admin_view(uploadlogdownload), name='dataupload_log_download'),
         ]
         return custom_urls + urls
     
@@ -46,3 +49,6 @@ admin_site.register(CompilationStep)
 admin_site.register(PerformanceValue)
 admin_site.register(ProblemInstance)
 admin_site.register(ErrorLog)
+admin_site.register(UploadJob)
+admin_site.register(IngestCheckpoint)
+admin_site.register(IngestToken)
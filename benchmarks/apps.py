@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate
 
 
 class BenchmarksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'benchmarks'
+
+    def ready(self):
+        from . import schemas # registers the csv ingest schemas
+        from .search import create_search_index
+        post_migrate.connect(create_search_index, sender=self)
+        from .jobs import delete_job_log
+        post_delete.connect(delete_job_log, sender='benchmarks.UploadJob')
@@ -0,0 +1,153 @@
+from .models import NormalizedName
+
+def chunked(values, size=500):
+    """
+    Split `values` into lists of at most `size` items (keeps IN (...) clauses under the database's parameter limit)
+    """
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+# tables matched on their normalized name (see models.NormalizedName): table -> function computing the lookup key of a name
+NAME_KEYS = {model._meta.db_table: model.normalize for model in NormalizedName.__subclasses__()}
+
+def lookup_ids(cursor, table, keys):
+    """
+    Return the key -> id map of the rows of `table` whose lookup key is in `keys`, one indexed IN (...) seek per chunk. Tables in NAME_KEYS are
+    matched on their normalized `name_key` column, the others on `name` exactly. When a key occurs more than once the lowest id wins
+
+    Arguments
+        ---------
+
+        `cursor` - database cursor
+
+        `table` - database table of the dimension (e.g. benchmarks_system)
+
+        `keys` - iterable of lookup keys (see DimensionResolver.key)
+    """
+    column = "name_key" if table in NAME_KEYS else "name"
+    ids = {}
+    for chunk in chunked(set(keys)):
+        cursor.execute(f'SELECT {column}, id FROM {table} WHERE {column} IN ({", ".join(["%s"] * len(chunk))}) ORDER BY id', chunk)
+        for key, name_id in cursor.fetchall():
+            ids.setdefault(key, name_id)
+    return ids
+
+def backfill_name_keys(cursor, table):
+    """
+    Fill the `name_key` of rows of a NAME_KEYS table saved before the column existed (or inserted by raw SQL), so lookup_ids finds them
+    """
+    cursor.execute(f'SELECT id, name FROM {table} WHERE name_key IS NULL AND name IS NOT NULL')
+    rows = cursor.fetchall()
+    if rows:
+        cursor.executemany(f'UPDATE {table} SET name_key = %s WHERE id = %s', [(NAME_KEYS[table](name), name_id) for name_id, name in rows])
+
+class DimensionResolver:
+    """
+    Cache of name -> id maps for the dimension tables referenced by an upload (System, Solver, Problem, Manufacturer, ...).
+    Only the names of a batch that are not cached yet are looked up (see lookup_ids), names missing from a table are inserted in one batch
+    and their new ids are written back into the map, so resolving a foreign key for a row is a dictionary lookup instead of a
+    SELECT/INSERT/SELECT round trip. Every ingest path (csv uploads, import commands, the JSON Lines endpoint) resolves names through this class
+
+    Arguments
+        ---------
+
+        `cursor` - database cursor used for all lookups and insertions
+
+        `dry_run` - give missing names placeholder (negative) ids instead of inserting them
+    """
+    def __init__(self, cursor, dry_run=False):
+        self.cursor = cursor
+        self.dry_run = dry_run
+        self.ids = {} # table -> {key: id}
+        self.created = {} # table -> names inserted by this resolver
+        self.planned = {} # table -> {key: placeholder id} of rows a dry run would insert (shared by all batches of an upload)
+        self.placeholder_id = 0
+
+    def key(self, table, name):
+        return NAME_KEYS[table](name) if table in NAME_KEYS else name
+
+    def load(self, table):
+        """
+        Return the key -> id map of `table` resolved so far
+        """
+        if table not in self.ids:
+            if table in NAME_KEYS:
+                backfill_name_keys(self.cursor, table)
+            self.ids[table] = {}
+            self.created[table] = set()
+
+        return self.ids[table]
+
+    def resolve(self, table, names, columns=(), values=None):
+        """
+        Make sure every name exists in `table`, inserting the missing ones with a single batched insert. Return the updated key -> id map
+
+        Arguments
+            ---------
+
+            `table` - database table of the dimension (e.g. benchmarks_system)
+
+            `names` - iterable of names, None entries are ignored
+
+            `columns` - additional columns written when a name is inserted
+
+            `values` - dict mapping a name to the tuple of values for `columns` (names without an entry get NULLs)
+        """
+        ids = self.load(table)
+
+        missing = {}
+        for name in names:
+            if name is None:
+                continue
+            key = self.key(table, name)
+            if key not in ids and key not in missing:
+                missing[key] = name
+        if missing:
+            ids.update(lookup_ids(self.cursor, table, missing))
+            missing = {key: name for key, name in missing.items() if key not in ids}
+
+        if missing and self.dry_run:
+            for key, name in missing.items():
+                self.placeholder_id -= 1
+                ids[key] = self.placeholder_id
+            self.created[table].update(missing.values())
+        elif missing:
+            values = values or {}
+            key_columns = ("name", "name_key") if table in NAME_KEYS else ("name",)
+            insert_sql = f'INSERT INTO {table}({", ".join(key_columns + tuple(columns))}) values ({", ".join(["%s"] * (len(key_columns) + len(columns)))})'
+            self.cursor.executemany(insert_sql, [(name, key)[:len(key_columns)] + tuple(values.get(name, (None,) * len(columns))) for key, name in missing.items()])
+            ids.update(lookup_ids(self.cursor, table, missing))
+            self.created[table].update(missing.values())
+
+        return ids
+
+    def plan(self, table, key):
+        """
+        Record that a dry run would insert the row identified by `key` into `table` and return its placeholder (negative) id
+        """
+        self.placeholder_id -= 1
+        self.planned.setdefault(table, {})[key] = self.placeholder_id
+        return self.placeholder_id
+
+    def take_created(self, table, name):
+        """
+        Return True if `name` was inserted into `table` by this resolver and has not been taken before (used to report each new name once)
+        """
+        created = self.created.get(table, set())
+        if name in created:
+            created.remove(name)
+            return True
+        return False
+
+    def get(self, table, name):
+        """
+        Return the id of `name` in `table` (None for None or unknown names). Names that were not resolved before are looked up
+        """
+        if name is None:
+            return None
+        ids = self.load(table)
+        key = self.key(table, name)
+        if key not in ids:
+            ids.update(lookup_ids(self.cursor, table, [key]))
+        return ids.get(key)
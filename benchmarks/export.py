@@ -0,0 +1,69 @@
+import csv, io, re
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+
+# Streaming csv/tsv export of the query builder pages (manytable and customize, ?export=csv or ?export=tsv). Rows are read in chunks
+# from a server-side cursor on PostgreSQL (Django's chunked cursor, a plain cursor on SQLite) and written to the response as they arrive,
+# so an export starts at once and its memory does not grow with the number of rows
+
+EXPORT_FORMATS = {"csv": (",", "text/csv"), "tsv": ("\t", "text/tab-separated-values")}
+EXPORT_CHUNK_SIZE = 2000
+
+def export_chunks(sql, params, key_count, columns=None, delimiter=",", setup=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the header and rows of a query as csv text, one string per chunk of rows
+
+    Arguments
+        ---------
+
+        `sql`, `params` - the query, its select list ends with `key_count` page key columns (see pagination.fetch_page), which are not exported
+
+        `columns` - header row, the column names of the query by default
+
+        `delimiter` - field delimiter
+
+        `setup` - statements run first on the same connection (e.g. creating a temporary table the query joins)
+
+        `chunk_size` - rows fetched from the cursor at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+    # inside a transaction PostgreSQL's named cursor is not declared WITH HOLD, which would materialize the whole result before the first row
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for statement in setup:
+                cursor.execute(statement)
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            if columns is None: # SQLite renames repeated column names ("id:1")
+                columns = [re.sub(r":\d+$", "", column[0]) for column in cursor.description[:len(cursor.description) - key_count]]
+            writer.writerow(columns)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(row[:len(row) - key_count] for row in rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    if buffer.tell(): # header of an empty result
+        yield buffer.getvalue()
+
+def export_response(file_format, file_name, sql, params, key_count, columns=None, setup=()):
+    """
+    Return a StreamingHttpResponse downloading the query as `file_name`.csv or .tsv (`file_format` is a key of EXPORT_FORMATS),
+    other arguments as for export_chunks
+    """
+    delimiter, content_type = EXPORT_FORMATS[file_format]
+    response = StreamingHttpResponse(export_chunks(sql, params, key_count, columns, delimiter, setup), content_type=f"{content_type}; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{file_name}.{file_format}"'
+    return response
+
+def export_query(request):
+    """
+    Query string of the export links of a query builder page: the request's columns, tables and filters, without its page cursors
+    """
+    query = request.GET.copy()
+    for parameter in ("after", "before", "page_size", "export"):
+        query.pop(parameter, None)
+    return query.urlencode()
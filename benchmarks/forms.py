@@ -2,9 +2,12 @@ from django import forms
 
 class PerformanceReportForm(forms.Form):
     performanceReportFile = forms.FileField(allow_empty_file=False, label='')
+    dryRun = forms.BooleanField(required=False, label='Dry run (report what would be inserted without saving)')
 
 class ProblemForm(forms.Form):
     problemFile = forms.FileField(allow_empty_file=False, label='')
+    dryRun = forms.BooleanField(required=False, label='Dry run (report what would be inserted without saving)')
 
 class ProcessorForm(forms.Form):
-    processorFile = forms.FileField(allow_empty_file=False, label='')
\ No newline at end of file
+    processorFile = forms.FileField(allow_empty_file=False, label='')
+    dryRun = forms.BooleanField(required=False, label='Dry run (report what would be inserted without saving)')
@@ -1,39 +1,94 @@
+import itertools
+from types import MappingProxyType
+
+class JoinPlan:
+    """
+    Join tree of one set of requested tables: the joined tables in join order, their display columns and the join clause
+    (first table, then one "full join ... on ..." line per table). Every call to Graph.plan_joins returns its own plan
+    """
+    def __init__(self, tables, columns, joins):
+        self.tables = tuple(tables)
+        self.columns = tuple(columns)
+        self.joins = joins
+
 class Graph:
+    """
+    Schema graph of the query builder: tables are vertices, foreign keys are edges labelled with their join condition.
+    The graph is built with the add_ and remove_ methods and then frozen, after which it is read-only and can be shared by
+    the threads of the server. Planning keeps no per-request state on the graph
+    """
     def __init__(self):
         self.adj_list = {}
         self.join_list = {}
         self.col_list={}
-        self.join_string =''
+        self.frozen = False
+        self.paths = None # all-pairs shortest paths, computed on first use
+        self.plans = {} # frozenset of tables -> (tables, columns, join clause) of its JoinPlan
 
     def add_vertex(self, vertex):
+        self.check_mutable()
         if vertex not in self.adj_list:
             self.adj_list[vertex] = []
             self.join_list[vertex] =[]
             self.col_list[vertex]=[]
-            self.string =''
+            self.invalidate()
 
     def add_edge(self, vertex1, vertex2, join_string):
+        self.check_mutable()
         if vertex1 in self.adj_list and vertex2 in self.adj_list and (vertex1 not in self.adj_list[vertex2] and vertex2 not in self.adj_list[vertex1] ):
             self.adj_list[vertex1].append(vertex2)
             self.adj_list[vertex2].append(vertex1)
             self.join_list[vertex1].append(join_string)
             self.join_list[vertex2].append(join_string)
+            self.invalidate()
     def add_col(self,vertex,columns):
+        self.check_mutable()
         if vertex in self.adj_list:
             self.col_list[vertex]= columns
+            self.invalidate()
 
     def remove_vertex(self, vertex):
+        self.check_mutable()
         if vertex in self.adj_list:
-            for neighbor in self.adj_list[vertex]:
-                self.adj_list[neighbor].remove(vertex)
+            for neighbor in self.adj_list[vertex][:]:
+                self.remove_edge(vertex, neighbor)
             del self.adj_list[vertex]
+            del self.join_list[vertex]
+            del self.col_list[vertex]
+            self.invalidate()
 
     def remove_edge(self, vertex1, vertex2):
+        self.check_mutable()
         if vertex1 in self.adj_list and vertex2 in self.adj_list:
-            if vertex2 in self.adj_list[vertex1]:
-                self.adj_list[vertex1].remove(vertex2)
-            if vertex1 in self.adj_list[vertex2]:
-                self.adj_list[vertex2].remove(vertex1)
+            # join_list[v][i] is the join condition of adj_list[v][i], both are removed together
+            for vertex, neighbor in ((vertex1, vertex2), (vertex2, vertex1)):
+                if neighbor in self.adj_list[vertex]:
+                    index = self.adj_list[vertex].index(neighbor)
+                    del self.adj_list[vertex][index]
+                    del self.join_list[vertex][index]
+            self.invalidate()
+
+    def invalidate(self):
+        # shortest paths and join plans are recomputed after the graph changed
+        self.paths = None
+        self.plans = {}
+
+    def check_mutable(self):
+        if self.frozen:
+            raise RuntimeError("The schema graph is frozen, build a new Graph to change it")
+
+    def freeze(self):
+        """
+        Make the graph read-only (adjacency, join conditions and columns become tuples behind read-only mappings) and compute its
+        shortest paths, so concurrent requests only ever read it. Returns the graph
+        """
+        self.shortest_paths()
+        self.adj_list = MappingProxyType({vertex: tuple(neighbors) for vertex, neighbors in self.adj_list.items()})
+        self.join_list = MappingProxyType({vertex: tuple(joins) for vertex, joins in self.join_list.items()})
+        self.col_list = MappingProxyType({vertex: tuple(columns) for vertex, columns in self.col_list.items()})
+        self.paths = MappingProxyType(self.paths)
+        self.frozen = True
+        return self
 
     def display(self):
         for vertex in self.adj_list:
@@ -55,62 +110,104 @@ class Graph:
 
     #Getting all the connection
     def connect_all(self, vertexlist):
-        col=[]
-        #print(vertexlist)
-        def dfs(graph, start, visited=None, join= '', column_list = []):
-            if visited is None:
-                visited = set()
-    
-            visited.add(start)
-            #print("CURRENT: "+start)
-            #print("CURRENT STRING: "+join)
-            #print("\n")
-            signal= False
-
-    
-            for neighbor in graph[start]:
-                test_join= f" full join {neighbor} on {self.join_list[neighbor][self.adj_list[neighbor].index(start)]} \n"
-                #print(signal)
-                if neighbor in vertexlist:
-                    if signal:
-                        self.join_string += test_join
-                    else:
-                        col.extend(column_list)
-                        self.join_string += join + test_join
-                    #print("SO FAR:\n"+self.join_string)
-                    col.append(neighbor)
-                    vertexlist.remove(neighbor)
-                    signal= True
-                    test_join=''
-    
-                if neighbor not in visited:
-                    if signal:
-                        nextsignal = dfs(graph, neighbor, visited, test_join, [neighbor])
-                    else:
-                        tempcolumnlist = column_list + [neighbor]
-                        nextsignal = dfs(graph, neighbor, visited, join + test_join, tempcolumnlist)
-                    if signal or nextsignal:
-                        signal= True
-            return signal
-
-
-
-        if vertexlist: 
-            self.join_string = vertexlist[0] + "\n"
-            col.append(vertexlist[0])
-            start = vertexlist[0]
-            vertexlist.remove(vertexlist[0])
-            dfs(self.adj_list,start)
-            #print(self.join_string)
-
-            return self.getcol(col), self.join_string
-        else:
-             return None , None
-
-
-
-
-
+        """
+        Return the columns (a new list) and the join clause of the smallest join tree connecting the tables of `vertexlist`, or (None, None)
+        for no tables (see plan_joins)
+        """
+        plan = self.plan_joins(vertexlist)
+        if plan is None:
+            return None, None
+        return list(plan.columns), plan.joins
+
+    def plan_joins(self, vertexlist):
+        """
+        Return a new JoinPlan of the smallest join tree connecting the tables of `vertexlist`, or None for no tables.
+        Plans are memoized by the set of tables, `vertexlist` is not changed
+
+        Arguments
+            ---------
+
+            `vertexlist` - table names, names that are not vertices of the graph are ignored
+        """
+        tables = frozenset(vertex for vertex in vertexlist if vertex in self.adj_list)
+        if not tables:
+            return None
+        plan = self.plans.get(tables)
+        if plan is None:
+            # threads racing on a new set of tables compute equal plans, the last one stored wins
+            plan = self.plan(tables)
+            self.plans[tables] = plan
+        return JoinPlan(*plan)
+
+    def plan(self, tables):
+        """
+        Build the (tables, columns, join clause) of the join tree of `tables` (see steiner_tree). The tree is walked breadth first from the
+        requested table added to the graph first, so the same set of tables always gives the same SQL
+        """
+        vertices = self.steiner_tree(tables)
+        root = next(vertex for vertex in self.adj_list if vertex in tables)
+        order = [root]
+        join_string = root + "\n"
+        for vertex in order:
+            for neighbor, join in zip(self.adj_list[vertex], self.join_list[vertex]):
+                if neighbor in vertices and neighbor not in order:
+                    order.append(neighbor)
+                    join_string += f" full join {neighbor} on {join} \n"
+        return tuple(order), tuple(self.getcol(order)), join_string
+
+    def shortest_paths(self):
+        """
+        All-pairs shortest paths of the graph, {start: {end: [start, ..., end]}}, from a breadth first search per vertex (joins are unweighted)
+        """
+        if self.paths is None:
+            paths = {}
+            for start in self.adj_list:
+                paths[start] = {start: [start]}
+                queue = [start]
+                for vertex in queue:
+                    for neighbor in self.adj_list[vertex]:
+                        if neighbor not in paths[start]:
+                            paths[start][neighbor] = paths[start][vertex] + [neighbor]
+                            queue.append(neighbor)
+            self.paths = paths
+        return self.paths
+
+    def steiner_tree(self, tables):
+        """
+        Return the smallest set of vertices containing `tables` whose induced subgraph is connected, i.e. the tables of a join tree with
+        as few joins as possible. The shortest path heuristic (attach the nearest remaining table by its shortest path) gives an upper bound,
+        then sets with fewer intermediate tables are searched, which is cheap for a schema graph of a few dozen tables
+        """
+        paths = self.shortest_paths()
+        tables = [vertex for vertex in self.adj_list if vertex in tables] # graph order, so plans are deterministic
+        # tables unreachable from the first one cannot be joined and are left out
+        tables = [vertex for vertex in tables if vertex in paths[tables[0]]]
+
+        tree = {tables[0]}
+        remaining = set(tables[1:])
+        while remaining:
+            path = min((paths[start][end] for start in tree for end in remaining), key=len)
+            tree.update(path)
+            remaining.discard(path[-1])
+
+        others = [vertex for vertex in self.adj_list if vertex not in tables and vertex in paths[tables[0]]]
+        for extra in range(len(tree) - len(tables)):
+            for combination in itertools.combinations(others, extra):
+                vertices = set(tables).union(combination)
+                if self.connected(vertices):
+                    return vertices
+        return tree
+
+    def connected(self, vertices):
+        start = next(iter(vertices))
+        seen = {start}
+        queue = [start]
+        for vertex in queue:
+            for neighbor in self.adj_list[vertex]:
+                if neighbor in vertices and neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        return len(seen) == len(vertices)
 
 
 graph = Graph()
@@ -213,6 +310,8 @@ graph.add_col('benchmarks_performancereport',['benchmarks_performancereport.id',
 graph.add_col('benchmarks_compilationstep',['benchmarks_compilationstep.version'])
 graph.add_col('benchmarks_performancevalue',['benchmarks_performancevalue.value'])
 
+graph.freeze()
+
 
 
 #print(graph.connect_all(['benchmarks_manufacturer a', 'benchmarks_solver c', 'benchmarks_performancemetric d','benchmarks_performancereport q']))
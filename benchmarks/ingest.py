@@ -0,0 +1,746 @@
+import numpy as np
+import pandas as pd
+import collections, csv, gzip, hashlib, io, itertools, json, os, tempfile
+from contextlib import contextmanager, nullcontext
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from .dimensions import DimensionResolver
+from .models import IngestCheckpoint
+
+try: # optional, only needed for Parquet and Arrow IPC uploads
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+BATCH_SIZE = 5000 # rows parsed, validated and inserted at a time
+INT64_LIMITS = (str(2 ** 63 - 1), str(2 ** 63)) # largest magnitude of a positive and of a negative int column value
+INLINE_MESSAGES = 50 # messages of each type kept in an upload summary, the rest are only in the upload log
+LOG_MEMBER_SIZE = 1000 # messages per gzip member of an upload log, read_log starts a page at the member holding it
+
+# file name extensions of the binary columnar formats, any other file is read as csv
+ARROW_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".arrows": "arrow"}
+
+# missing value markers of spreadsheet exports (the strings pandas.read_csv reads as NaN)
+NA_STRINGS = ("#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null")
+
+def schema_toString(schema):
+    schema = dict(schema)
+    for col in schema:
+        schema[col] = f"{schema[col][0].__name__}{' (nullable)' if None in schema[col] else ''}"
+    
+    return json.dumps(schema, indent=4)
+
+class ChunkStream(io.RawIOBase):
+    """
+    Read-only binary stream over an iterator of byte chunks, e.g. UploadedFile.chunks()
+    """
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            self.pending = next(self.chunks, None)
+            if self.pending is None: # end of stream
+                self.pending = b''
+                return 0
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+@contextmanager
+def open_csv(csv_file):
+    """
+    Open a csv file for CSVBatchReader in text mode
+
+    Arguments
+        ---------
+
+        `csv_file` - path of the csv file or an UploadedFile. Uploads are parsed straight from their chunk iterator, Django only spools
+        uploads larger than FILE_UPLOAD_MAX_MEMORY_SIZE to a private temporary file
+    """
+    if isinstance(csv_file, (str, os.PathLike)):
+        with open(csv_file, newline='', encoding='utf-8-sig') as file:
+            yield file
+    else:
+        with io.TextIOWrapper(io.BufferedReader(ChunkStream(csv_file.chunks())), newline='', encoding='utf-8-sig') as file:
+            yield file
+
+class CSVBatchReader:
+    """
+    Single pass validator and parser for uploaded csv files. Iterating over the reader reads the file once, `batch_size` records at a time,
+    type checks each batch column by column and yields it as a list of typed rows. A row is a tuple holding the values of every schema column
+    (None for empty values and for optional columns missing from the file) followed by the row number.
+
+    Validation problems are collected in `errors` as dicts in the form {"text": [str], "message_type": "error"}. Batches are still yielded after an
+    error so that every problem of the file gets reported, callers should stop inserting once `errors` is not empty.
+
+    Arguments
+        ---------
+
+        `csvfile` - file object of the csv file (opened in text mode)
+
+        `schema` - dictionary where keys are column names and values are lists of acceptable types (add None to value list for nullable columns)
+
+        `batch_size` - number of records per yielded batch
+
+        `strict_header` - require the header to hold exactly the schema columns found in it, in schema order. Otherwise header names are
+        stripped of surrounding whitespace and columns outside the schema are ignored (spreadsheet exports with extra or blank columns)
+
+        `na_values` - strings read as empty values in addition to the empty string (e.g. NA_STRINGS)
+
+        `skip_rows` - number of leading records that are counted but neither validated nor yielded (rows committed by an earlier run)
+
+        `errors` - optional list-like sink for the validation problems (e.g. a MessageLog), a new list by default
+    """
+    int_pattern = r"\s*[+-]?\d+\s*"
+    nan_strings = ["nan", "+nan", "-nan"]
+
+    def __init__(self, csvfile, schema, batch_size=BATCH_SIZE, strict_header=True, na_values=(), skip_rows=0, errors=None):
+        self.csvfile = csvfile
+        self.schema = schema
+        self.batch_size = batch_size
+        self.strict_header = strict_header
+        self.na_values = list(na_values)
+        self.skip_rows = skip_rows
+        self.errors = [] if errors is None else errors
+        self.rows_read = 0
+        self.columns = [] # schema columns present in the file
+        self.positions = None # field index of each of the columns when the file has columns outside the schema
+        self.width = 0 # number of fields of a record
+
+    def __iter__(self):
+        reader = csv.reader(self.csvfile)
+        column_names = next(reader, [])
+        if not self.strict_header:
+            column_names = [name.strip() for name in column_names]
+
+        # check that required columns are present, unrequired columns may be left out of the file
+        missing_columns = [column for column, types in self.schema.items() if column not in column_names and None not in types]
+        if missing_columns:
+            self.errors.append({"text": f"Header Error: missing required headers ({', '.join(missing_columns)})", "message_type": "error"})
+            return
+
+        self.columns = [column for column in self.schema if column in column_names]
+        self.width = len(self.columns)
+        if column_names != self.columns and not self.strict_header:
+            self.positions = [column_names.index(column) for column in self.columns]
+            self.width = len(column_names)
+        elif column_names != self.columns: # header has to match the schema columns found in it
+            self.errors.append({"text": f"Header Error: bad header", "message_type": "error"})
+
+        while self.rows_read < self.skip_rows and next(reader, None) is not None:
+            self.rows_read += 1
+
+        batch = []
+        for record in reader:
+            batch.append(record)
+            if len(batch) == self.batch_size:
+                yield self.parse(batch)
+                batch = []
+        if batch:
+            yield self.parse(batch)
+
+    def parse(self, records):
+        """
+        Type check a batch of records and convert it to typed rows
+        """
+        first_row = self.rows_read + 1
+        self.rows_read += len(records)
+        rownums = range(first_row, first_row + len(records))
+        width = len(self.columns)
+
+        # records shorter than the header have no value to check in their missing fields
+        if self.positions is None:
+            fields = [record[:width] + [None] * (width - len(record)) for record in records]
+        else:
+            fields = [[record[position] if position < len(record) else None for position in self.positions] for record in records]
+        frame = pd.DataFrame(fields, columns=self.columns, dtype=object)
+        problems = [(rownum, width, f"Record Length Error (row {rownum}): length {len(record)}")
+                    for rownum, record in zip(rownums, records) if len(record) != self.width]
+
+        values = {}
+        for position, column in enumerate(self.columns):
+            types = self.schema[column]
+            present = frame[column].notna().to_numpy()
+            text = frame[column].fillna('')
+            if self.na_values:
+                text = text.mask(text.str.strip().isin(self.na_values), '')
+            empty = (text == '').to_numpy()
+
+            if types[0] is int:
+                # digit strings beyond the int64 range of the database columns fail like any other non-int
+                stripped = text.str.strip()
+                magnitude = stripped.str.lstrip('+-').str.lstrip('0').to_numpy(dtype=str)
+                limit = np.where(stripped.str.startswith('-').to_numpy(dtype=bool), INT64_LIMITS[1], INT64_LIMITS[0])
+                lengths = np.char.str_len(magnitude)
+                in_range = (lengths < len(INT64_LIMITS[0])) | ((lengths == len(INT64_LIMITS[0])) & (magnitude <= limit))
+                valid = text.str.fullmatch(self.int_pattern).to_numpy() & in_range
+                numbers = text.where(valid, '0').str.strip().to_numpy(dtype=str).astype(np.int64)
+                converted = pd.Series(pd.arrays.IntegerArray(numbers, ~valid))
+            elif types[0] is float:
+                converted = pd.to_numeric(text.str.strip(), errors='coerce')
+                valid = converted.notna().to_numpy() | text.str.strip().str.lower().isin(self.nan_strings).to_numpy()
+            else:
+                converted = text
+                valid = np.ones(len(records), dtype=bool)
+
+            if None in types:
+                failed = present & ~empty & ~valid
+                message = f"{column} column expects nullable {types[0].__name__}s"
+            else:
+                failed = present & (empty | ~valid)
+                message = f"{column} column expects nonnull {types[0].__name__}s"
+            problems.extend((first_row + index, position, f"Value Error (row {first_row + index}): {message}") for index in np.flatnonzero(failed))
+
+            values[column] = converted.astype(object).where(present & ~empty & converted.notna().to_numpy(), None).tolist()
+
+        self.errors.extend({"text": text, "message_type": "error"} for rownum, position, text in sorted(problems))
+
+        empty_column = [None] * len(records)
+        return list(zip(*(values.get(column, empty_column) for column in self.schema), rownums))
+
+
+def file_format(csv_file):
+    """
+    Return "parquet", "arrow" or "csv" for a path or an UploadedFile, by file name extension
+    """
+    name = csv_file if isinstance(csv_file, (str, os.PathLike)) else csv_file.name
+    return ARROW_FORMATS.get(os.path.splitext(str(name))[1].lower(), "csv")
+
+class ArrowBatchReader:
+    """
+    Reader for Parquet and Arrow IPC (file or stream) uploads with the interface of CSVBatchReader. Columns are checked by their Arrow type
+    instead of being parsed from text and values are converted straight to Python objects, NaNs and empty strings become None like in csv files
+
+    Arguments
+        ---------
+
+        `source` - path of the file or a seekable binary file object
+
+        `file_format` - "parquet" or "arrow"
+
+        `schema`, `batch_size`, `skip_rows`, `errors` - as for CSVBatchReader
+
+        `strict_header` - reject files with columns outside the schema (column order does not matter, columns are matched by name)
+    """
+    def __init__(self, source, file_format, schema, batch_size=BATCH_SIZE, strict_header=True, skip_rows=0, errors=None):
+        self.source = source
+        self.file_format = file_format
+        self.schema = schema
+        self.batch_size = batch_size
+        self.strict_header = strict_header
+        self.skip_rows = skip_rows
+        self.errors = [] if errors is None else errors
+        self.rows_read = 0
+        self.columns = []
+
+    def record_batches(self):
+        """
+        Return the column names and an iterator over the record batches of the file
+        """
+        if self.file_format == "parquet":
+            parquet_file = pyarrow.parquet.ParquetFile(self.source)
+            return parquet_file.schema_arrow.names, parquet_file.iter_batches(batch_size=self.batch_size)
+
+        source = pyarrow.memory_map(str(self.source)) if isinstance(self.source, (str, os.PathLike)) else self.source
+        try:
+            reader = pyarrow.ipc.open_file(source)
+            return reader.schema.names, (reader.get_batch(index) for index in range(reader.num_record_batches))
+        except pyarrow.ArrowInvalid: # not the IPC file format, read it as an IPC stream
+            source.seek(0)
+            reader = pyarrow.ipc.open_stream(source)
+            return reader.schema.names, iter(reader)
+
+    def accepts(self, expected, arrow_type):
+        if pyarrow.types.is_null(arrow_type):
+            return True
+        if pyarrow.types.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        if expected is int: # pandas writes int columns with missing values as floats, their values are checked in parse
+            return pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type)
+        if expected is float:
+            return pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type) or pyarrow.types.is_decimal(arrow_type)
+        # dates and timestamps are read as their ISO strings
+        return pyarrow.types.is_string(arrow_type) or pyarrow.types.is_large_string(arrow_type) or pyarrow.types.is_temporal(arrow_type)
+
+    def __iter__(self):
+        if pyarrow is None:
+            self.errors.append({"text": "Format Error: Parquet and Arrow files can only be uploaded when pyarrow is installed", "message_type": "error"})
+            return
+
+        column_names, batches = self.record_batches()
+
+        missing_columns = [column for column, types in self.schema.items() if column not in column_names and None not in types]
+        if missing_columns:
+            self.errors.append({"text": f"Header Error: missing required headers ({', '.join(missing_columns)})", "message_type": "error"})
+            return
+
+        self.columns = [column for column in self.schema if column in column_names]
+        if self.strict_header and len(self.columns) != len(column_names):
+            self.errors.append({"text": f"Header Error: bad header", "message_type": "error"})
+
+        pending = None # rows of the file are re-batched to `batch_size` whatever the row groups or record batches of the file are
+        for batch in batches:
+            table = pyarrow.Table.from_batches([batch])
+            if self.skip_rows > self.rows_read:
+                skipped = min(self.skip_rows - self.rows_read, table.num_rows)
+                self.rows_read += skipped
+                table = table.slice(skipped)
+            pending = table if pending is None else pyarrow.concat_tables([pending, table])
+            while pending.num_rows >= self.batch_size:
+                yield self.parse(pending.slice(0, self.batch_size))
+                pending = pending.slice(self.batch_size)
+        if pending is not None and pending.num_rows:
+            yield self.parse(pending)
+
+    def parse(self, table):
+        """
+        Type check a batch of Arrow columns and convert it to typed rows
+        """
+        first_row = self.rows_read + 1
+        self.rows_read += table.num_rows
+        rownums = range(first_row, first_row + table.num_rows)
+
+        problems = []
+        values = {}
+        for position, column in enumerate(self.columns):
+            types = self.schema[column]
+            data = table.column(column)
+            if not self.accepts(types[0], data.type):
+                problems.append((first_row, position, f"Type Error: {column} column holds {data.type} values, expects {types[0].__name__}s"))
+                continue
+
+            if pyarrow.types.is_uint64(data.type): # values beyond the int64 range of the database columns are value errors
+                too_large = pyarrow.compute.fill_null(pyarrow.compute.greater(data, pyarrow.scalar(2 ** 63 - 1, data.type)), False)
+                if None in types: # nonnull columns report the nulled values below
+                    problems.extend((first_row + index, position, f"Value Error (row {first_row + index}): {column} column expects nullable ints")
+                                    for index in np.flatnonzero(too_large.to_numpy(zero_copy_only=False)))
+                data = pyarrow.compute.if_else(too_large, pyarrow.scalar(None, data.type), data)
+
+            if pyarrow.types.is_floating(data.type):
+                data = pyarrow.compute.if_else(pyarrow.compute.is_nan(data), pyarrow.scalar(None, data.type), data)
+                if types[0] is int: # only whole numbers in the int64 range are ints, like the digit strings of csv files
+                    data = data.cast(pyarrow.float64())
+                    whole = pyarrow.compute.and_(pyarrow.compute.equal(pyarrow.compute.floor(data), data),
+                                                 pyarrow.compute.and_(pyarrow.compute.greater_equal(data, -2.0 ** 63), pyarrow.compute.less(data, 2.0 ** 63)))
+                    not_int = pyarrow.compute.fill_null(pyarrow.compute.invert(whole), False)
+                    if None in types: # nonnull columns report the nulled values below
+                        problems.extend((first_row + index, position, f"Value Error (row {first_row + index}): {column} column expects nullable ints")
+                                        for index in np.flatnonzero(not_int.to_numpy(zero_copy_only=False)))
+                    data = pyarrow.compute.if_else(not_int, pyarrow.scalar(None, data.type), data).cast(pyarrow.int64())
+            elif pyarrow.types.is_decimal(data.type):
+                data = data.cast(pyarrow.float64())
+            elif types[0] is str:
+                data = pyarrow.compute.if_else(pyarrow.compute.equal(data.cast(pyarrow.string()), ""), pyarrow.scalar(None, pyarrow.string()), data.cast(pyarrow.string()))
+
+            if None not in types:
+                missing = np.flatnonzero(data.is_null().to_numpy(zero_copy_only=False))
+                problems.extend((first_row + index, position, f"Value Error (row {first_row + index}): {column} column expects nonnull {types[0].__name__}s") for index in missing)
+
+            values[column] = data.to_pylist()
+
+        self.errors.extend({"text": text, "message_type": "error"} for rownum, position, text in sorted(problems))
+
+        empty_column = [None] * table.num_rows
+        return list(zip(*(values.get(column, empty_column) for column in self.schema), rownums))
+
+@contextmanager
+def open_batches(csv_file, schema, skip_rows=0, errors=None):
+    """
+    Open an upload and return a batch reader for it: ArrowBatchReader for Parquet and Arrow IPC files, CSVBatchReader otherwise
+
+    Arguments
+        ---------
+
+        `csv_file` - path of the file or an UploadedFile
+
+        `schema` - IngestSchema of the upload
+
+        `skip_rows`, `errors` - see CSVBatchReader
+    """
+    upload_format = file_format(csv_file)
+    if upload_format == "csv":
+        with open_csv(csv_file) as csvfile:
+            yield CSVBatchReader(csvfile, schema.columns, strict_header=schema.strict_header, na_values=schema.na_values, skip_rows=skip_rows, errors=errors)
+    elif isinstance(csv_file, (str, os.PathLike)):
+        yield ArrowBatchReader(csv_file, upload_format, schema.columns, strict_header=schema.strict_header, skip_rows=skip_rows, errors=errors)
+    else:
+        with csv_file.open('rb') as file: # both formats need random access, UploadedFiles are seekable
+            yield ArrowBatchReader(file, upload_format, schema.columns, strict_header=schema.strict_header, skip_rows=skip_rows, errors=errors)
+
+class MessageLog:
+    """
+    Per-row messages of an upload ({"text", "message_type"} dicts) with bounded memory: every message is counted by type and written to a gzip
+    compressed JSON Lines file, only the first `inline` messages of each type are kept for the upload summary. Loaders append to it like to a list.
+    The file is a series of gzip members of LOG_MEMBER_SIZE messages (still one gzip stream to any reader), the index next to it (see log_index_path)
+    holds the byte offset of each member and the number of messages of each type before it, so read_log starts a deep page at its member
+
+    Arguments
+        ---------
+
+        `path` - file the full log is written to, None keeps only the counts and the inline messages
+
+        `inline` - messages of each type kept in memory (None keeps all of them)
+    """
+    def __init__(self, path=None, inline=INLINE_MESSAGES):
+        self.path = path
+        self.inline_size = inline
+        self.inline = []
+        self.counts = collections.Counter()
+        self.raw = open(path, 'wb') if path else None
+        self.file = None
+        self.members = [] # [byte offset, {message type: messages before the member}] of each member
+
+    def append(self, message):
+        if self.raw and (self.file is None or len(self) % LOG_MEMBER_SIZE == 0):
+            self.start_member()
+        self.counts[message["message_type"]] += 1
+        if self.inline_size is None or self.counts[message["message_type"]] <= self.inline_size:
+            self.inline.append(message)
+        if self.file:
+            self.file.write((json.dumps(message) + "\n").encode('utf-8'))
+
+    def start_member(self):
+        if self.file:
+            self.file.close() # ends the member, the underlying file stays open
+        self.members.append([self.raw.tell(), dict(self.counts)])
+        self.file = gzip.GzipFile(fileobj=self.raw, mode='wb')
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def close(self):
+        if self.raw:
+            if self.file is None: # an empty log is still a valid gzip file
+                self.start_member()
+            self.file.close()
+            self.raw.close()
+            with open(log_index_path(self.path), 'w') as index:
+                json.dump({"members": self.members}, index)
+            self.file = self.raw = None
+
+def log_index_path(path):
+    return f"{path}.idx"
+
+def move_log(source, target):
+    """
+    Rename an upload log and its index
+    """
+    os.replace(source, target)
+    if os.path.exists(log_index_path(source)):
+        os.replace(log_index_path(source), log_index_path(target))
+
+def remove_log(path):
+    """
+    Delete an upload log and its index, missing files are ignored
+    """
+    for file_path in (path, log_index_path(path)):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+def read_log(path, message_type=None, offset=0, limit=None):
+    """
+    Yield the messages of an upload log file written by MessageLog, optionally only those of one type and a page of them (`offset`, `limit`).
+    With an index the page is read from the gzip member holding its first message, without it the log is read from the start
+    """
+    start, skipped = 0, 0
+    if offset and os.path.exists(log_index_path(path)):
+        with open(log_index_path(path)) as index:
+            for member_offset, counts in json.load(index)["members"]:
+                before = counts.get(message_type, 0) if message_type else sum(counts.values())
+                if before > offset:
+                    break
+                start, skipped = member_offset, before
+
+    with open(path, 'rb') as raw:
+        raw.seek(start)
+        with gzip.open(raw, 'rt', encoding='utf-8') as file:
+            messages = (json.loads(line) for line in file)
+            if message_type:
+                messages = (message for message in messages if message["message_type"] == message_type)
+            yield from itertools.islice(messages, offset - skipped, None if limit is None else offset - skipped + limit)
+
+class Record:
+    """
+    Read-only view of a typed row by column name, passed to the name and value functions of a Dimension
+    """
+    __slots__ = ("positions", "row")
+
+    def __init__(self, positions, row):
+        self.positions = positions
+        self.row = row
+
+    def __getitem__(self, column):
+        return self.row[self.positions[column]]
+
+class Dimension:
+    """
+    Foreign-key dimension filled from the rows of an upload (System, Solver, Problem, Manufacturer, ...). Names missing from the table are
+    inserted in bulk and reported once as "New {label} (row N): name"
+
+    Arguments
+        ---------
+
+        `table` - database table of the dimension (e.g. benchmarks_system)
+
+        `name` - csv column holding the name, or a function of a Record returning it
+
+        `label` - label used in upload messages
+
+        `counter` - insertion counter incremented for every new name
+
+        `values` - dict mapping additional columns of the table to a csv column or to a function of (Record, DimensionResolver).
+        A new name takes the values of the first row it appears on
+    """
+    def __init__(self, table, name, label, counter, values=None):
+        self.table = table
+        self.name = name
+        self.label = label
+        self.counter = counter
+        self.values = values or {}
+
+    def names(self, records):
+        if isinstance(self.name, str):
+            return [record[self.name] for record in records]
+        return [self.name(record) for record in records]
+
+    def row_values(self, record, dimensions):
+        return tuple(record[value] if isinstance(value, str) else value(record, dimensions) for value in self.values.values())
+
+class IngestSchema:
+    """
+    Declarative description of a csv upload: the typed columns of the file, the dimensions its rows reference and the loader that bulk inserts
+    the rows themselves. run_ingest drives every upload through the same validate, resolve and load steps
+
+    Arguments
+        ---------
+
+        `name` - key of the schema in SCHEMAS
+
+        `columns` - dictionary where keys are column names and values are lists of acceptable types (add None to value list for nullable columns)
+
+        `dimensions` - list of Dimension, resolved in order (later dimensions may use the ids of earlier ones)
+
+        `loader` - function(cursor, dimensions, rows, messages, insertions) inserting a batch of typed rows once its dimensions are resolved.
+        Rows are tuples in `columns` order followed by the row number
+
+        `summary` - list of (counter, text) pairs for the upload summary, text is formatted with the counter value. The first entry is always shown,
+        the others only when not zero
+
+        `strict_header`, `na_values` - see CSVBatchReader
+    """
+    def __init__(self, name, columns, dimensions, loader, summary, strict_header=True, na_values=()):
+        self.name = name
+        self.columns = columns
+        self.dimensions = dimensions
+        self.loader = loader
+        self.summary = summary
+        self.strict_header = strict_header
+        self.na_values = na_values
+        self.positions = {column: position for position, column in enumerate(columns)}
+
+    def resolve_dimensions(self, dimensions, rows, messages, insertions):
+        """
+        Resolve the dimensions of a batch of typed rows and report each new name once, on the first row that introduced it
+        """
+        records = [Record(self.positions, row) for row in rows]
+        names = {}
+        values = {} # table -> {name: values}
+        for dimension in self.dimensions:
+            names[dimension] = dimension.names(records)
+            table_values = values.setdefault(dimension.table, {})
+            if dimension.values:
+                for name, record in zip(names[dimension], records):
+                    if name is not None and name not in table_values:
+                        table_values[name] = dimension.row_values(record, dimensions)
+
+            # dimensions sharing a table (e.g. time type and performance metric) are resolved together
+            same_table = [other for other in self.dimensions if other.table == dimension.table]
+            if dimension is same_table[-1]:
+                table_names = [name for other in same_table for name in names[other]]
+                dimensions.resolve(dimension.table, table_names, columns=tuple(dimension.values), values=table_values)
+
+        for position, row in enumerate(rows):
+            for dimension in self.dimensions:
+                name = names[dimension][position]
+                if dimensions.take_created(dimension.table, name):
+                    messages.append({"text": f"New {dimension.label} (row {row[-1]}): {name}", "message_type": "success"})
+                    insertions[dimension.counter] += 1
+
+SCHEMAS = {} # schema name -> IngestSchema, filled by benchmarks.schemas when the app is ready
+
+def register_schema(schema):
+    SCHEMAS[schema.name] = schema
+    return schema
+
+def file_hash(path):
+    """
+    Return the sha256 hex digest of a file's content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def summary_message(schema, rows_read, insertions, dry_run=False):
+    """
+    Top message of an upload summary: rows read and the schema's summary counters (the first one always, the others when not zero)
+    """
+    counts = [text.format(insertions[counter]) for position, (counter, text) in enumerate(schema.summary) if position == 0 or insertions[counter]]
+    return f"{'Dry Run Summary (nothing was saved)' if dry_run else 'Upload Summary'}: {rows_read} rows read, {', '.join(counts)}"
+
+def parse_file(schema, path):
+    """
+    Validate and parse a whole file without touching the database (run in the worker processes of the importdirectory command, which only
+    sends them files of at most its MAX_PARSED_SIZE). Return (rows read, list of typed row batches, MessageLog of the validation errors),
+    the batches are empty when the file has errors
+    """
+    schema = SCHEMAS[schema]
+    errors = MessageLog()
+    with open_batches(path, schema, errors=errors) as reader:
+        batches = list(reader)
+    return reader.rows_read, [] if errors else batches, errors
+
+def run_ingest(schema, csv_file, progress=None, dry_run=False, checkpoint=None, log_path=None):
+    """
+    Validate, parse and insert a csv file batch by batch in a single pass and a single transaction, everything is rolled back if any row
+    fails validation. Return an upload summary {"status": [str], "top_message": [str], "messages": [list], "message_counts": [dict]}
+    (with "schema" added when validation fails). "messages" holds the first INLINE_MESSAGES messages of each type, "message_counts" counts all of them
+
+    Arguments
+        ---------
+
+        `schema` - IngestSchema or its name in SCHEMAS
+
+        `csv_file` - path of the csv, Parquet or Arrow IPC file or an UploadedFile (the format is chosen by file name extension, see ARROW_FORMATS)
+
+        `progress` - optional callable invoked after every batch with the rows processed, the insertion counters and the number of errors so far
+
+        `dry_run` - only compute what would be inserted and which rows are duplicates, the transaction is always rolled back
+
+        `checkpoint` - optional IngestCheckpoint of the file. Each batch is then committed in its own transaction together with the checkpoint,
+        and the rows committed by an earlier run are skipped. A batch failing validation is not loaded and stops the checkpoint there
+
+        `log_path` - optional file receiving every message of the upload (see MessageLog and read_log). When the file fails validation the log holds the validation errors
+    """
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+    if dry_run:
+        checkpoint = None
+
+    upload_summary = {"status": "success", "top_message": ""}
+    insertions = {counter: 0 for counter, text in schema.summary}
+    skip_rows = 0
+    if checkpoint is not None:
+        insertions.update(checkpoint.insertions)
+        skip_rows = checkpoint.rows_committed
+
+    messages = MessageLog(log_path)
+    errors = MessageLog(log_path and f"{log_path}.errors")
+    try:
+        with open_batches(csv_file, schema, skip_rows, errors) as reader, transaction.atomic() if checkpoint is None else nullcontext(), connection.cursor() as cursor:
+            dimensions = DimensionResolver(cursor, dry_run=dry_run)
+            for rows in reader:
+                with transaction.atomic() if checkpoint is not None else nullcontext():
+                    if not errors:
+                        schema.resolve_dimensions(dimensions, rows, messages, insertions)
+                        schema.loader(cursor, dimensions, rows, messages, insertions)
+                        if checkpoint is not None:
+                            checkpoint.rows_committed = reader.rows_read
+                            checkpoint.insertions = insertions
+                            checkpoint.save(update_fields=["rows_committed", "insertions", "updated"])
+                if progress: # rows processed, insertions and errors so far
+                    progress(reader.rows_read, insertions, errors.counts["error"] + messages.counts["error"])
+            if checkpoint is None and (errors or dry_run):
+                transaction.set_rollback(True)
+    finally:
+        messages.close()
+        errors.close()
+        if log_path and errors: # the log keeps the validation errors if there are any, the messages of the loaded rows otherwise
+            move_log(errors.path, log_path)
+        elif log_path:
+            remove_log(errors.path)
+
+    # return with error messages if csv file does not follow set schema
+    if errors:
+        upload_summary["status"] = "error"
+        upload_summary["top_message"] = f"Uploaded file failed schema validation"
+        if checkpoint is not None and checkpoint.rows_committed:
+            upload_summary["top_message"] += f" (rows 1-{checkpoint.rows_committed} were committed before the error)"
+        upload_summary["schema"] = "Schema: " + schema_toString(schema.columns)
+        upload_summary["messages"] = errors.inline
+        upload_summary["message_counts"] = dict(errors.counts)
+
+        return upload_summary
+
+    if checkpoint is not None:
+        checkpoint.finished = True
+        checkpoint.save(update_fields=["finished", "updated"])
+
+    upload_summary["top_message"] = summary_message(schema, reader.rows_read, insertions, dry_run)
+    if skip_rows:
+        upload_summary["top_message"] += f" (resumed after row {skip_rows})"
+    upload_summary["messages"] = messages.inline
+    upload_summary["message_counts"] = dict(messages.counts)
+    return upload_summary
+
+class IngestCommand(BaseCommand):
+    """
+    Management command loading a csv file through run_ingest, subclasses only set `schema` and `help`.
+    With `checkpointed` set the file is committed batch by batch and an interrupted import resumes where it stopped (see IngestCheckpoint)
+    """
+    schema = None
+    checkpointed = False
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', type=str, help='Path to the CSV file')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be inserted without saving anything')
+        if self.checkpointed:
+            group = parser.add_mutually_exclusive_group()
+            group.add_argument('--resume', action='store_true', help='Continue after the last committed row of an earlier run on the same file (default)')
+            group.add_argument('--restart', action='store_true', help='Discard the checkpoint of the file and import it from the first row')
+
+    def handle(self, *args, **kwargs):
+        checkpoint = None
+        if self.checkpointed and not kwargs['dry_run']:
+            checkpoint = self.get_checkpoint(kwargs['csv_file'], kwargs['restart'])
+            if checkpoint.finished:
+                self.stdout.write(self.style.WARNING(f"{kwargs['csv_file']} was already imported completely, use --restart to import it again"))
+                return
+            if checkpoint.rows_committed:
+                self.stdout.write(f"Resuming after row {checkpoint.rows_committed}")
+
+        # every message is printed, streamed back from a temporary upload log so memory does not grow with the file
+        descriptor, log_path = tempfile.mkstemp(prefix="ingest-", suffix=".jsonl.gz")
+        os.close(descriptor)
+        try:
+            upload_summary = run_ingest(self.schema, kwargs['csv_file'], dry_run=kwargs['dry_run'], checkpoint=checkpoint, log_path=log_path)
+
+            styles = {"success": self.style.SUCCESS, "error": self.style.ERROR, "exception": self.style.WARNING}
+            for message in read_log(log_path):
+                self.stdout.write(styles[message["message_type"]](message["text"]))
+        finally:
+            remove_log(log_path)
+        if "schema" in upload_summary:
+            self.stdout.write(upload_summary["schema"])
+        self.stdout.write(styles[upload_summary["status"]](upload_summary["top_message"]))
+
+    def get_checkpoint(self, path, restart):
+        content_hash = file_hash(path)
+        if restart:
+            IngestCheckpoint.objects.filter(schema=self.schema, file_hash=content_hash).delete()
+        checkpoint, created = IngestCheckpoint.objects.get_or_create(schema=self.schema, file_hash=content_hash, defaults={"file_name": os.path.basename(path)})
+        return checkpoint
@@ -0,0 +1,195 @@
+import datetime, glob, os, socket, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from .csvupload import handle_performance_report_upload, handle_problem_upload, handle_processor_upload
+from .ingest import remove_log
+from .models import UploadJob
+
+UPLOAD_HANDLERS = {
+    "performance_report": handle_performance_report_upload,
+    "problem": handle_problem_upload,
+    "processor": handle_processor_upload,
+}
+
+# uploads run in a pool of worker threads inside the web server process, no external broker is needed
+executor = ThreadPoolExecutor(max_workers=getattr(settings, "UPLOAD_WORKERS", 2), thread_name_prefix="upload")
+
+# directory of the upload logs, one gzip compressed JSON Lines file of messages per job
+LOG_DIR = getattr(settings, "UPLOAD_LOG_DIR", os.path.join(settings.BASE_DIR, "upload_logs"))
+
+# live progress of running jobs is kept in the cache (see CACHES), which all processes of the web server share: an upload writes everything
+# in a single transaction, so it cannot be stored in the UploadJob row until the job finishes without a second write connection,
+# which SQLite would block on the upload's write lock
+PROGRESS_TIMEOUT = 24 * 60 * 60
+
+# jobs left queued or running by a process that is gone are marked as failed once per process, on its first use of the upload jobs
+stale_jobs_checked = False
+stale_jobs_lock = threading.Lock()
+
+def progress_key(job_id):
+    return f"upload-progress-{job_id}"
+
+def worker_name():
+    """
+    Host and process id of the upload pool of this process (computed on every call, the web server may fork after importing the app)
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError: # alive, owned by another user
+        return True
+    return True
+
+def fail_stale_jobs():
+    """
+    Mark the queued and running jobs whose upload pool no longer exists as failed: jobs of dead processes of this host and jobs without a worker.
+    Jobs of other hosts are left to their own processes. Runs once per process
+    """
+    global stale_jobs_checked
+    with stale_jobs_lock:
+        if stale_jobs_checked:
+            return
+        stale_jobs_checked = True
+
+    host = socket.gethostname()
+    stale = []
+    for job_id, worker in UploadJob.objects.filter(status__in=("queued", "running")).values_list("id", "worker"):
+        worker_host, _, pid = worker.rpartition(":")
+        if not worker or (worker_host == host and not process_alive(int(pid))):
+            stale.append(job_id)
+    if stale:
+        UploadJob.objects.filter(id__in=stale, status__in=("queued", "running")).update(status="error", finished=timezone.now(), summary={
+            "status": "error", "top_message": "Upload interrupted: the server process running it stopped, nothing was saved", "messages": [], "message_counts": {}})
+
+def submit_upload(upload_type, uploaded_file, dry_run=False):
+    """
+    Queue an upload and return its UploadJob immediately. Django closes the request's UploadedFiles when the request ends, so small in-memory
+    uploads are read here and the worker parses them from their chunks (see ingest.open_csv), only uploads Django spooled to disk
+    (or larger than FILE_UPLOAD_MAX_MEMORY_SIZE) are copied to a private temporary file
+
+    Arguments
+        ---------
+
+        `upload_type` - key of UPLOAD_HANDLERS
+
+        `uploaded_file` - UploadedFile from request.FILES
+
+        `dry_run` - run the handler in dry-run mode (nothing is saved)
+    """
+    if isinstance(uploaded_file, TemporaryUploadedFile) or uploaded_file.size > settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+        # keep the extension, the ingest engine picks the reader (csv, Parquet, Arrow IPC) by it
+        suffix = os.path.splitext(uploaded_file.name)[1].lower() or ".csv"
+        descriptor, source = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=getattr(settings, "FILE_UPLOAD_TEMP_DIR", None))
+        with os.fdopen(descriptor, "wb") as file:
+            for chunk in uploaded_file.chunks():
+                file.write(chunk)
+    else:
+        uploaded_file.seek(0)
+        source = SimpleUploadedFile(uploaded_file.name, uploaded_file.read(), uploaded_file.content_type)
+
+    fail_stale_jobs()
+    job = UploadJob.objects.create(upload_type=upload_type, file_name=uploaded_file.name, dry_run=dry_run, worker=worker_name())
+    executor.submit(run_upload_job, job.id, source)
+    return job
+
+def run_upload_job(job_id, source):
+    """
+    Worker entry point: run the upload handler of a job on `source` (a temporary file, removed afterwards, or an in-memory UploadedFile) and store its summary
+    """
+    close_old_connections()
+    try:
+        job = UploadJob.objects.get(id=job_id)
+        os.makedirs(LOG_DIR, exist_ok=True)
+        job.status = "running"
+        job.log_file = os.path.join(LOG_DIR, f"upload-{job.id}.jsonl.gz")
+        job.save(update_fields=["status", "log_file"])
+
+        latest = {"rows_processed": 0, "insertions": {}, "error_count": 0} # only this thread writes it, the counters saved below are a snapshot of it
+        def report_progress(rows_processed, insertions, error_count):
+            latest.update(rows_processed=rows_processed, insertions=dict(insertions), error_count=error_count)
+            cache.set(progress_key(job_id), latest, PROGRESS_TIMEOUT)
+
+        try:
+            summary = UPLOAD_HANDLERS[job.upload_type](source, progress=report_progress, dry_run=job.dry_run, log_path=job.log_file)
+        except Exception as e:
+            summary = {"status": "error", "top_message": f"Upload failed: {e}", "messages": [], "message_counts": {}}
+
+        job.status = summary["status"]
+        job.summary = summary
+        job.rows_processed = latest["rows_processed"]
+        job.insertions = latest["insertions"]
+        job.error_count = latest["error_count"]
+        job.finished = timezone.now()
+        try:
+            job.save()
+        except Exception as e:
+            # the job must not stay "running": store the failure without the summary that could not be saved
+            UploadJob.objects.filter(id=job_id).update(status="error", finished=job.finished, rows_processed=job.rows_processed, error_count=job.error_count, summary={
+                "status": "error", "top_message": f"Upload finished but its summary could not be saved: {e}", "messages": [], "message_counts": {}})
+    finally:
+        cache.delete(progress_key(job_id))
+        if isinstance(source, str):
+            os.remove(source)
+        connection.close()
+
+def job_progress(job):
+    """
+    Return the progress of a job as a dict (live counters while it runs, stored counters otherwise)
+    """
+    fail_stale_jobs()
+    if job.status in ("queued", "running"):
+        job.refresh_from_db()
+    live = cache.get(progress_key(job.id))
+
+    status = {
+        "id": job.id,
+        "upload_type": job.upload_type,
+        "file_name": job.file_name,
+        "dry_run": job.dry_run,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "insertions": job.insertions,
+        "error_count": job.error_count,
+        "top_message": job.summary["top_message"] if job.summary else "",
+    }
+    if live and job.status in ("queued", "running"):
+        status.update(live)
+    return status
+
+def delete_job_log(sender, instance, **kwargs):
+    """
+    Remove the upload log of a deleted UploadJob (a post_delete receiver)
+    """
+    if instance.log_file:
+        remove_log(instance.log_file)
+
+def prune_upload_logs(days):
+    """
+    Remove the upload logs of jobs that finished more than `days` days ago and the files of LOG_DIR no job refers to (logs of deleted jobs).
+    The jobs themselves and their summaries are kept. Return (number of jobs whose log was removed, number of orphaned files removed)
+    """
+    expired = UploadJob.objects.filter(finished__lt=timezone.now() - datetime.timedelta(days=days)).exclude(log_file="")
+    pruned = 0
+    for job in expired:
+        remove_log(job.log_file)
+        pruned += 1
+    expired.update(log_file="")
+
+    # logs of queued and running jobs are in use (with their .errors and .idx files), every other upload-* file is orphaned
+    in_use = {os.path.abspath(log_file) for log_file in UploadJob.objects.exclude(log_file="").values_list("log_file", flat=True)}
+    orphans = 0
+    for path in glob.glob(os.path.join(LOG_DIR, "upload-*")):
+        if not any(os.path.abspath(path).startswith(log_file) for log_file in in_use):
+            os.remove(path)
+            orphans += 1
+    return pruned, orphans
@@ -0,0 +1,254 @@
+import hashlib, json, math, secrets
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from .dimensions import DimensionResolver, chunked
+from .models import IngestToken, report_fingerprint
+from .schemas import fetch_report_ids
+
+# JSON Lines ingest of performance reports for benchmark harnesses (the api/ingest/reports/ endpoint). Each line of the request body is one
+# report with its compilation steps and performance values, lines are parsed as they arrive and written in batches of JSONL_BATCH_SIZE records,
+# every batch in its own transaction. Reports are deduplicated by the same natural-key fingerprint as the csv uploads
+
+JSONL_BATCH_SIZE = 1000
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# JSON fields of a report line and their types (None marks an optional field)
+REPORT_FIELDS = {"problem_id": [int], "qubo_var_count": [int, None], "qubo_quad_term_count": [int, None], "system": [str, None], "solver": [str, None],
+                 "qubit_count": [int, None], "rcs": [float, None], "mean_chain_length": [int, None], "max_chain_length": [int, None], "num_runs": [int, None],
+                 "url": [str, None], "notes": [str, None], "compilation_steps": [list, None], "values": [list, None]}
+STEP_FIELDS = {"algorithm": [str], "tool": [str, None], "version": [float, None]}
+VALUE_FIELDS = {"metric": [str], "value": [float, None]}
+
+# dimension tables of a report line: table -> (insertion counter, names of a record in that table)
+RECORD_DIMENSIONS = {
+    'benchmarks_system': ("systems", lambda record: [record.get("system")]),
+    'benchmarks_solver': ("solvers", lambda record: [record.get("solver")]),
+    'benchmarks_compilationalgorithmn': ("compilation_algorithms", lambda record: [step["algorithm"] for step in record.get("compilation_steps") or ()]),
+    'benchmarks_compilationtool': ("compilation_tools", lambda record: [step.get("tool") for step in record.get("compilation_steps") or ()]),
+    'benchmarks_performancemetric': ("metrics", lambda record: [value["metric"] for value in record.get("values") or ()]),
+}
+
+def hash_key(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+def create_token(name):
+    """
+    Create an IngestToken named `name` and return its key, which is not stored and can only be shown once
+    """
+    key = secrets.token_urlsafe(32)
+    IngestToken.objects.create(name=name, key_hash=hash_key(key))
+    return key
+
+def authenticate(request):
+    """
+    Return the active IngestToken of the request's "Authorization: Bearer <key>" header or None
+    """
+    scheme, _, key = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not key.strip():
+        return None
+
+    token = IngestToken.objects.filter(key_hash=hash_key(key.strip()), active=True).first()
+    if token is not None:
+        IngestToken.objects.filter(id=token.id).update(last_used=timezone.now())
+    return token
+
+def field_errors(record, fields, label):
+    """
+    Return the type errors of the JSON object `record` against `fields` (see REPORT_FIELDS)
+    """
+    if not isinstance(record, dict):
+        return [f"{label} must be a JSON object"]
+
+    errors = [f"unknown field {label}.{field}" for field in record if field not in fields]
+    for field, types in fields.items():
+        value = record.get(field)
+        if value is None:
+            if None not in types:
+                errors.append(f"{label}.{field} is required")
+        elif isinstance(value, bool) or not isinstance(value, int if types[0] is int else (int, float) if types[0] is float else types[0]):
+            errors.append(f"{label}.{field} expects a {types[0].__name__}")
+        elif types[0] is float and not math.isfinite(value):
+            errors.append(f"{label}.{field} expects a finite number")
+        elif types[0] is int and not INT64_MIN <= value <= INT64_MAX: # bigint columns
+            errors.append(f"{label}.{field} expects a 64-bit int")
+    return errors
+
+def parse_line(line):
+    """
+    Parse and type check one line of the request body. Return (record, None) or (None, [error])
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as error:
+        return None, [f"invalid JSON ({error})"]
+
+    errors = field_errors(record, REPORT_FIELDS, "report")
+    if not errors:
+        for index, step in enumerate(record.get("compilation_steps") or ()):
+            errors.extend(field_errors(step, STEP_FIELDS, f"compilation_steps[{index}]"))
+        for index, value in enumerate(record.get("values") or ()):
+            errors.extend(field_errors(value, VALUE_FIELDS, f"values[{index}]"))
+    return (None, errors) if errors else (record, None)
+
+def iter_batches(lines, batch_size=JSONL_BATCH_SIZE):
+    """
+    Stream-parse JSON Lines, yielding lists of (line number, record, errors) with at most `batch_size` entries. Blank lines are skipped
+    """
+    batch = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        batch.append((number,) + parse_line(line))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load_report_batch(cursor, dimensions, batch, insertions):
+    """
+    Insert a parsed batch of report lines with batched inserts and return one result per line: {"line", "id", "duplicate"} or {"line", "errors"}.
+    A report whose fingerprint already exists is a duplicate, only its compilation steps and values that are not stored yet are added to it
+
+    Arguments
+        ---------
+
+        `cursor` - database cursor
+
+        `dimensions` - DimensionResolver shared by all batches of the request
+
+        `batch` - list of (line number, record, errors) from iter_batches
+
+        `insertions` - dict of insertion counters updated in place
+    """
+    insert_report_sql = """INSERT INTO benchmarks_performancereport
+    (problem_id, qubo_var_count, qubo_quad_term_count, system_id, solver_id, qubit_count, rcs, mean_chain_length, max_chain_length, num_runs, url1, notes, fingerprint)
+    values {}
+    ON CONFLICT (fingerprint) DO NOTHING RETURNING fingerprint
+    """
+    insert_step_sql = 'INSERT INTO benchmarks_compilationstep (compilation_algorithmn_id, compilation_tool_id, version, performance_report_id) values(%s,%s,%s,%s)'
+    insert_value_sql = 'INSERT INTO benchmarks_performancevalue (metric_id, value, performance_report_id) values(%s,%s,%s)'
+
+    results = {number: {"line": number, "errors": errors} for number, record, errors in batch if errors}
+    records = [(number, record) for number, record, errors in batch if not errors]
+
+    # Problem Instances are not created by the endpoint, reports of unknown instances are rejected
+    known_problems = set()
+    for ids in chunked(sorted({record["problem_id"] for number, record in records})):
+        cursor.execute(f"SELECT id FROM benchmarks_probleminstance WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+        known_problems.update(problem_id for (problem_id,) in cursor.fetchall())
+    for number, record in records:
+        if record["problem_id"] not in known_problems:
+            results[number] = {"line": number, "errors": [f"problem instance {record['problem_id']} does not exist"]}
+    records = [(number, record) for number, record in records if number not in results]
+
+    for table, (counter, names) in RECORD_DIMENSIONS.items():
+        dimensions.resolve(table, [name for number, record in records for name in names(record)])
+        insertions[counter] += len(dimensions.created[table])
+        dimensions.created[table].clear()
+
+    # Performance Reports, probed against the unique fingerprint index at once
+    record_keys = []
+    for number, record in records:
+        key = (record["problem_id"], record.get("qubo_var_count"), record.get("qubo_quad_term_count"), dimensions.get('benchmarks_system', record.get("system")),
+               dimensions.get('benchmarks_solver', record.get("solver")), record.get("qubit_count"), record.get("rcs"), record.get("mean_chain_length"),
+               record.get("max_chain_length"), record.get("num_runs"))
+        record_keys.append((key, report_fingerprint(key)))
+    report_ids = fetch_report_ids(cursor, {fingerprint for key, fingerprint in record_keys})
+    existing_report_ids = set(report_ids.values())
+
+    new_reports = {}
+    for (number, record), (key, fingerprint) in zip(records, record_keys):
+        if fingerprint not in report_ids and fingerprint not in new_reports:
+            new_reports[fingerprint] = key + (record.get("url"), record.get("notes"), fingerprint)
+    # reports written by a concurrent request since the probe are skipped by ON CONFLICT: they are not counted, answered as duplicates and their steps
+    # and values are left to that request (they may not be committed yet, so they cannot be compared)
+    inserted = set()
+    for chunk in chunked(new_reports.values()):
+        cursor.execute(insert_report_sql.format(', '.join(['(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)'] * len(chunk))), [value for report in chunk for value in report])
+        inserted.update(fingerprint for (fingerprint,) in cursor.fetchall())
+    insertions["performance_reports"] += len(inserted)
+    report_ids.update(fetch_report_ids(cursor, new_reports))
+    concurrent_report_ids = {report_ids[fingerprint] for fingerprint in new_reports if fingerprint not in inserted and fingerprint in report_ids}
+
+    # Compilation Steps and Performance Values: only reports that existed before this batch can hold duplicates
+    existing_steps = set()
+    existing_values = set()
+    for ids in chunked(sorted(existing_report_ids)):
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f'SELECT compilation_algorithmn_id, compilation_tool_id, version, performance_report_id FROM benchmarks_compilationstep WHERE performance_report_id IN ({placeholders})', ids)
+        existing_steps.update(cursor.fetchall())
+        cursor.execute(f'SELECT metric_id, value, performance_report_id FROM benchmarks_performancevalue WHERE performance_report_id IN ({placeholders})', ids)
+        existing_values.update(cursor.fetchall())
+
+    new_steps = []
+    new_values = []
+    seen_reports = set()
+    for (number, record), (key, fingerprint) in zip(records, record_keys):
+        report_id = report_ids.get(fingerprint)
+        if report_id is None:
+            results[number] = {"line": number, "errors": ["performance report could not be found after insertion"]}
+            continue
+        results[number] = {"line": number, "id": report_id, "duplicate": report_id in existing_report_ids or report_id in concurrent_report_ids or report_id in seen_reports}
+        seen_reports.add(report_id)
+        if report_id in concurrent_report_ids:
+            continue
+
+        for step in record.get("compilation_steps") or ():
+            step = (dimensions.get('benchmarks_compilationalgorithmn', step["algorithm"]), dimensions.get('benchmarks_compilationtool', step.get("tool")), step.get("version"), report_id)
+            if step not in existing_steps:
+                existing_steps.add(step)
+                new_steps.append(step)
+        for value in record.get("values") or ():
+            value = (dimensions.get('benchmarks_performancemetric', value["metric"]), value.get("value"), report_id)
+            if value not in existing_values:
+                existing_values.add(value)
+                new_values.append(value)
+
+    if new_steps:
+        cursor.executemany(insert_step_sql, new_steps)
+        insertions["compilation_steps"] += len(new_steps)
+    if new_values:
+        cursor.executemany(insert_value_sql, new_values)
+        insertions["performance_values"] += len(new_values)
+
+    return [results[number] for number, record, errors in batch]
+
+def ingest_reports(lines, batch_size=JSONL_BATCH_SIZE):
+    """
+    Ingest JSON Lines performance reports, committing every batch in its own transaction. Return the response summary
+    {"records", "inserted", "duplicates", "errors", "insertions", "results"} with the results in line order
+
+    Arguments
+        ---------
+
+        `lines` - iterable of lines (bytes or str), e.g. the HttpRequest itself so the body is read as it is parsed
+
+        `batch_size` - records per transaction
+    """
+    insertions = dict.fromkeys(["performance_reports", "performance_values", "compilation_steps"] + [counter for counter, names in RECORD_DIMENSIONS.values()], 0)
+    results = []
+    with connection.cursor() as cursor:
+        dimensions = DimensionResolver(cursor)
+        for batch in iter_batches(lines, batch_size):
+            batch_insertions = dict.fromkeys(insertions, 0)
+            try:
+                with transaction.atomic():
+                    results.extend(load_report_batch(cursor, dimensions, batch, batch_insertions))
+            except DatabaseError as error:
+                # the batch is rolled back as a whole, the batches before it stay committed
+                results.extend({"line": number, "errors": [f"batch rolled back ({error})"]} for number, record, errors in batch)
+                # ids handed out inside the rolled back transaction are gone, read the dimension tables again for the next batch
+                dimensions = DimensionResolver(cursor)
+                continue
+            for counter, count in batch_insertions.items():
+                insertions[counter] += count
+
+    return {
+        "records": len(results),
+        "inserted": sum(1 for result in results if result.get("duplicate") is False),
+        "duplicates": sum(1 for result in results if result.get("duplicate")),
+        "errors": sum(1 for result in results if "errors" in result),
+        "insertions": insertions,
+        "results": results,
+    }
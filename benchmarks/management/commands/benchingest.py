@@ -0,0 +1,118 @@
+import io, json, os, platform, tempfile, time, tracemalloc
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, setup_databases, teardown_databases
+from django.utils import timezone
+from benchmarks.csvupload import handle_performance_report_upload, handle_problem_upload, handle_processor_upload
+from benchmarks.dimensions import DimensionResolver
+from benchmarks.synthetic import GENERATORS
+
+# (kind, upload handler, import command) of every benchmarked upload type
+CASES = [
+    ("problem", handle_problem_upload, "importproblem"),
+    ("processor", handle_processor_upload, "importprocessor"),
+    ("performance_report", handle_performance_report_upload, "importcsv"),
+]
+PROBLEM_INSTANCES = 100 # problem instances created up front for the performance report files to reference
+BENCHMARK_PROBLEM = "Max Cut" # problem of those instances
+
+
+class Command(BaseCommand):
+    help = ('Time the csv upload handlers and import commands on synthetic files and write rows/sec, query counts and peak memory to a JSON file. '
+            'Runs against a throwaway test database of the configured default database (SQLite or PostgreSQL)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help='Rows per generated file (1k to 1M)')
+        parser.add_argument('--kinds', nargs='+', choices=[case[0] for case in CASES], default=[case[0] for case in CASES], help='Upload types to benchmark')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='Fraction of rows repeating an earlier row')
+        parser.add_argument('--new-dimension-ratio', type=float, default=0.01, help='Fraction of rows introducing a new dimension name')
+        parser.add_argument('--no-memory', action='store_true', help='Skip the extra traced run measuring peak memory')
+        parser.add_argument('--output', type=str, default='ingest-benchmark.json', help='Path of the JSON result file')
+
+    def handle(self, *args, **kwargs):
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'})
+        try:
+            results = []
+            with tempfile.TemporaryDirectory(prefix='benchingest-') as directory:
+                for size in kwargs['sizes']:
+                    for kind, handler, command in CASES:
+                        if kind in kwargs['kinds']:
+                            results.extend(self.run_case(directory, kind, handler, command, size, kwargs))
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        report = {
+            "created": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "duplicate_ratio": kwargs['duplicate_ratio'],
+            "new_dimension_ratio": kwargs['new_dimension_ratio'],
+            "results": results,
+        }
+        with open(kwargs['output'], 'w') as file:
+            json.dump(report, file, indent=4)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {kwargs['output']}"))
+
+    def run_case(self, directory, kind, handler, command, size, kwargs):
+        """
+        Time a fresh upload, a re-upload of the same file (all duplicates) and the import command on a second file of the same size
+        """
+        call_command('flush', interactive=False, verbosity=0)
+        options = {'duplicate_ratio': kwargs['duplicate_ratio'], 'new_dimension_ratio': kwargs['new_dimension_ratio']}
+        if kind == 'performance_report':
+            options['problem_ids'] = self.create_problem_instances()
+
+        paths = []
+        for seed in (0, 1):
+            paths.append(os.path.join(directory, f'{kind}-{size}-{seed}.csv'))
+            GENERATORS[kind](paths[-1], size, seed=seed, **options)
+
+        results = []
+        for step, path, run in (("upload", paths[0], lambda: handler(paths[0])),
+                                ("reupload", paths[0], lambda: handler(paths[0])),
+                                ("command", paths[1], lambda: call_command(command, paths[1], stdout=io.StringIO()))):
+            result = {"kind": kind, "step": step, "rows": size, "file_bytes": os.path.getsize(path)}
+            result.update(self.measure(run, size, kwargs['no_memory']))
+            results.append(result)
+            self.stdout.write(f"{kind:<20} {step:<10} {size:>8} rows {result['seconds']:>8.2f}s {result['rows_per_second']:>10.0f} rows/s "
+                              f"{result['queries']:>6} queries")
+        return results
+
+    def measure(self, run, rows, no_memory):
+        """
+        Time `run` and count its queries. Peak memory is traced in a separate run that is rolled back first, tracemalloc would slow the timed run down several times
+        """
+        peak = None
+        if not no_memory:
+            tracemalloc.start()
+            with transaction.atomic():
+                run()
+                transaction.set_rollback(True)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            summary = run()
+            seconds = time.perf_counter() - start
+
+        return {
+            "seconds": round(seconds, 4),
+            "rows_per_second": round(rows / seconds, 1),
+            "queries": len(queries),
+            "peak_memory_bytes": peak,
+            "status": summary["status"] if summary else None,
+        }
+
+    def create_problem_instances(self):
+        with connection.cursor() as cursor:
+            # instances belong to a problem like the ones of problem uploads, so the reports join through to benchmarks_problem
+            dimensions = DimensionResolver(cursor)
+            dimensions.resolve('benchmarks_problem', [BENCHMARK_PROBLEM])
+            problem_id = dimensions.get('benchmarks_problem', BENCHMARK_PROBLEM)
+            cursor.executemany('INSERT INTO benchmarks_probleminstance (problem_id, graph_size) VALUES (%s, %s)', [(problem_id, size) for size in range(PROBLEM_INSTANCES)])
+            cursor.execute('SELECT id FROM benchmarks_probleminstance WHERE problem_id = %s ORDER BY id', [problem_id])
+            return [instance_id for (instance_id,) in cursor.fetchall()]
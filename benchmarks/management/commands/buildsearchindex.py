@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from benchmarks.search import SEARCH_TABLE, create_search_index, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = ('Create the search index of names, notes and urls if it is missing (pg_trgm and tsvector indexes on PostgreSQL, '
+            'an FTS5 table kept in sync by triggers on SQLite) and, on SQLite, fill it again from the searched tables')
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            create_search_index()
+            with connection.cursor() as cursor:
+                rebuild_search_index(cursor)
+                if connection.vendor == 'sqlite':
+                    cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+                    self.stdout.write(self.style.SUCCESS(f'{cursor.fetchone()[0]} rows indexed'))
+                    return
+        self.stdout.write(self.style.SUCCESS(f'Search indexes of the {connection.vendor} database are in place'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from benchmarks.jsoningest import create_token
+
+
+class Command(BaseCommand):
+    help = 'Create an API key for the JSON Lines ingest endpoint (api/ingest/reports/). The key is printed once, only its hash is stored'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', type=str, help='Name of the harness or person using the key')
+
+    def handle(self, *args, **kwargs):
+        key = create_token(kwargs['name'])
+        self.stdout.write(self.style.SUCCESS(f"Created ingest token {kwargs['name']}, send it as 'Authorization: Bearer {key}'"))
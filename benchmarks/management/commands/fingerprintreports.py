@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from benchmarks.models import REPORT_KEY_FIELDS, report_fingerprint
+
+
+class Command(BaseCommand):
+    help = 'Fill in the natural-key fingerprint of performance reports created before the fingerprint column existed'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT fingerprint FROM benchmarks_performancereport WHERE fingerprint IS NOT NULL')
+            taken = {fingerprint for (fingerprint,) in cursor.fetchall()}
+
+            cursor.execute(f'SELECT id, {", ".join(REPORT_KEY_FIELDS)} FROM benchmarks_performancereport WHERE fingerprint IS NULL ORDER BY id')
+            updates = []
+            duplicates = 0
+            for report in cursor.fetchall():
+                fingerprint = report_fingerprint(report[1:])
+                # the oldest report keeps the fingerprint, later duplicates stay NULL so the unique index holds
+                if fingerprint in taken:
+                    duplicates += 1
+                    continue
+                taken.add(fingerprint)
+                updates.append((fingerprint, report[0]))
+
+            cursor.executemany('UPDATE benchmarks_performancereport SET fingerprint = %s WHERE id = %s', updates)
+
+        self.stdout.write(self.style.SUCCESS(f'{len(updates)} reports fingerprinted, {duplicates} duplicate reports left without a fingerprint'))
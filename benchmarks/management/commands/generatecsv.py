@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.synthetic import GENERATORS
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic CSV file of performance reports, problems or processors for ingest benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(GENERATORS), help='Upload type of the generated file')
+        parser.add_argument('csv_file', type=str, help='Path of the CSV file to write')
+        parser.add_argument('--rows', type=int, default=1000, help='Number of rows (1k to 1M)')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='Fraction of rows repeating an earlier row')
+        parser.add_argument('--new-dimension-ratio', type=float, default=0.01, help='Fraction of rows introducing a new system, solver, problem, ... name')
+        parser.add_argument('--problem-ids', type=str, default='1-100', help='Range of existing problem instance ids referenced by performance reports (first-last)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the random generator')
+
+    def handle(self, *args, **kwargs):
+        if not 0 <= kwargs['duplicate_ratio'] <= 1 or not 0 <= kwargs['new_dimension_ratio'] <= 1:
+            raise CommandError('ratios have to be between 0 and 1')
+
+        options = {'duplicate_ratio': kwargs['duplicate_ratio'], 'new_dimension_ratio': kwargs['new_dimension_ratio'], 'seed': kwargs['seed']}
+        if kwargs['kind'] == 'performance_report':
+            first, _, last = kwargs['problem_ids'].partition('-')
+            options['problem_ids'] = list(range(int(first), int(last or first) + 1))
+        GENERATORS[kwargs['kind']](kwargs['csv_file'], kwargs['rows'], **options)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {kwargs['rows']} {kwargs['kind']} rows to {kwargs['csv_file']}"))
@@ -0,0 +1,8 @@
+from benchmarks.ingest import IngestCommand
+
+
+class Command(IngestCommand):
+    help = ('Load calibration snapshots keyed on (system, date) from a processor CSV file with an optional Date column (columns of schemas.CALIBRATION_SCHEMA). '
+            'Unchanged snapshots are skipped and snapshots of an existing (system, date) are updated, rows without a Date are snapshots of today')
+    schema = 'calibration'
+    checkpointed = True
@@ -0,0 +1,142 @@
+import collections, glob, multiprocessing, os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from benchmarks.dimensions import DimensionResolver
+from benchmarks.ingest import ARROW_FORMATS, SCHEMAS, MessageLog, file_hash, open_batches, parse_file, summary_message
+from benchmarks.models import IngestCheckpoint
+
+EXTENSIONS = {".csv"} | set(ARROW_FORMATS) # files picked up from a directory
+MAX_PARSED_SIZE = 64 * 1024 * 1024 # larger files are not parsed by the workers, the writer streams them batch by batch
+
+
+class Command(BaseCommand):
+    help = ('Import a directory or glob of csv, Parquet or Arrow files of one upload type. Files are validated and parsed in parallel by a process pool, '
+            'the parsed rows are written by this process, one transaction per file, and a consolidated summary is printed. '
+            'Files imported completely by an earlier run are skipped')
+
+    def add_arguments(self, parser):
+        parser.add_argument('schema', choices=sorted(SCHEMAS), help='Upload type of the files')
+        parser.add_argument('paths', nargs='+', help='Directories, files or glob patterns (quote them, e.g. "results/**/*.csv")')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parser processes (1 parses in this process)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be inserted without saving anything')
+        parser.add_argument('--restart', action='store_true', help='Import files again even when an earlier run imported them completely')
+
+    def handle(self, *args, **kwargs):
+        schema = SCHEMAS[kwargs['schema']]
+        paths = self.find_files(kwargs['paths'])
+        if not paths:
+            raise CommandError("No files found")
+
+        totals = {counter: 0 for counter, text in schema.summary}
+        counts = collections.Counter()
+        # files imported completely by an earlier run are skipped before anything is parsed
+        hashes = {path: file_hash(path) for path in paths}
+        finished = set()
+        if not kwargs['restart'] and not kwargs['dry_run']:
+            finished.update(IngestCheckpoint.objects.filter(schema=schema.name, file_hash__in=set(hashes.values()), finished=True).values_list('file_hash', flat=True))
+        for path in paths:
+            if hashes[path] in finished:
+                self.stdout.write(self.style.WARNING(f"{path}: skipped, already imported completely"))
+                counts["skipped"] += 1
+
+        with connection.cursor() as cursor:
+            dimensions = DimensionResolver(cursor, dry_run=kwargs['dry_run'])
+            for path, parsed in self.parse_files(schema.name, [path for path in paths if hashes[path] not in finished], kwargs['workers']):
+                if parsed is None: # parsed here batch by batch, loading stops at the first validation error and the file is rolled back
+                    errors = MessageLog()
+                    reader = open_batches(path, schema, errors=errors)
+                else:
+                    rows_read, batches, errors = parsed
+                    if errors:
+                        self.report_errors(path, errors)
+                        counts["failed"] += 1
+                        continue
+                    reader = nullcontext(batches)
+
+                messages = MessageLog(inline=None if kwargs['verbosity'] > 1 else 0) # messages are only kept when they are printed
+                insertions = {counter: 0 for counter in totals}
+                failed = False
+                try:
+                    with reader as batches, transaction.atomic():
+                        for rows in batches:
+                            if not errors:
+                                schema.resolve_dimensions(dimensions, rows, messages, insertions)
+                                schema.loader(cursor, dimensions, rows, messages, insertions)
+                        if parsed is None:
+                            rows_read = batches.rows_read
+                        if kwargs['dry_run'] or errors:
+                            transaction.set_rollback(True)
+                        else:
+                            IngestCheckpoint.objects.update_or_create(schema=schema.name, file_hash=hashes[path], defaults={
+                                "file_name": os.path.basename(path), "rows_committed": rows_read, "insertions": insertions, "finished": True})
+                except DatabaseError as error:
+                    self.stdout.write(self.style.ERROR(f"{path}: rolled back ({error})"))
+                    failed = True
+                if errors:
+                    self.report_errors(path, errors)
+                if failed or errors:
+                    counts["failed"] += 1
+                    # ids resolved inside the rolled back transaction are gone, the next file reads the dimension tables again
+                    dimensions = DimensionResolver(cursor, dry_run=kwargs['dry_run'])
+                    continue
+
+                if kwargs['verbosity'] > 1:
+                    for message in messages.inline:
+                        self.stdout.write(f"    {message['text']}")
+                self.stdout.write(f"{path}: {summary_message(schema, rows_read, insertions, kwargs['dry_run'])}")
+                counts["imported"] += 1
+                counts["rows"] += rows_read
+                counts["messages"] += messages.counts["error"]
+                for counter, count in insertions.items():
+                    totals[counter] += count
+
+        self.stdout.write(self.style.SUCCESS(f"{counts['imported']} of {len(paths)} files imported ({counts['skipped']} skipped, {counts['failed']} failed, "
+                                             f"{counts['messages']} insertion errors). {summary_message(schema, counts['rows'], totals, kwargs['dry_run'])}"))
+
+    def report_errors(self, path, errors):
+        """
+        Print the first validation errors of a file
+        """
+        self.stdout.write(self.style.ERROR(f"{path}: failed schema validation, nothing was saved"))
+        for message in errors.inline[:10]:
+            self.stdout.write(f"    {message['text']}")
+        if len(errors) > 10:
+            self.stdout.write(f"    ... {len(errors) - 10} more errors")
+
+    def find_files(self, patterns):
+        """
+        Expand directories (their files with a known extension, not recursive) and glob patterns into a sorted list of files
+        """
+        paths = set()
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                paths.update(os.path.join(pattern, name) for name in os.listdir(pattern) if os.path.splitext(name)[1].lower() in EXTENSIONS)
+            else:
+                paths.update(glob.glob(pattern, recursive=True))
+        return sorted(path for path in paths if os.path.isfile(path))
+
+    def parse_files(self, schema, paths, workers):
+        """
+        Yield (path, parse_file result) in path order, or (path, None) for the files the writer parses itself: every file when there is a
+        single worker and files larger than MAX_PARSED_SIZE, whose parsed rows would not fit comfortably in memory. Workers parse ahead of
+        the writer, at most two files per worker are held in memory
+        """
+        if workers <= 1:
+            for path in paths:
+                yield path, None
+            return
+
+        # spawned rather than forked, so the workers never inherit the writer's open database connection
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=django.setup) as executor:
+            pending = collections.deque()
+            for path in paths:
+                pending.append((path, None if os.path.getsize(path) > MAX_PARSED_SIZE else executor.submit(parse_file, schema, path)))
+                if len(pending) >= 2 * workers:
+                    path, future = pending.popleft()
+                    yield path, future and future.result()
+            while pending:
+                path, future = pending.popleft()
+                yield path, future and future.result()
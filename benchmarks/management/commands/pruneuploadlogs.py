@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from benchmarks.jobs import LOG_DIR, prune_upload_logs
+
+
+class Command(BaseCommand):
+    help = 'Delete the upload logs of admin upload jobs that finished more than --days days ago and the logs left behind by deleted jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Age in days of the newest upload logs removed (default 30)')
+
+    def handle(self, *args, **kwargs):
+        pruned, orphans = prune_upload_logs(kwargs['days'])
+        self.stdout.write(self.style.SUCCESS(f'{pruned} upload logs older than {kwargs["days"]} days and {orphans} orphaned files removed from {LOG_DIR}'))
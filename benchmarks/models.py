@@ -1,45 +1,85 @@
+import hashlib
 from django.db import models
 from django.core.exceptions import ValidationError
 
+def normalize_name(name):
+    """
+    Lookup key of a dimension name: names differing only in case or surrounding whitespace are the same
+    """
+    return name.strip().lower()
+
+def gate_names(gates):
+    """
+    Split a comma separated gate list ("ID, RZ, SX, X") into its gate names, names repeated in another case are kept once
+    """
+    names = {}
+    for name in (gates or "").split(","):
+        if name.strip():
+            names.setdefault(name.strip().lower(), name.strip())
+    return list(names.values())
+
+def gate_set_key(name):
+    """
+    Lookup key of a gate set name: its sorted, lower case gate names. Gate sets with the same members are one gate set, whatever order they were named in
+    """
+    return ', '.join(sorted(gate.lower() for gate in gate_names(name)))
+
+class NormalizedName(models.Model):
+    """
+    Base of the dimension tables matched case-insensitively by the ingest engine (see dimensions.DimensionResolver). `name_key` holds the
+    normalized name, computed in Python rather than with the database's lower() so matching is the same on SQLite (ASCII only) and PostgreSQL,
+    and indexed so resolving a name is an index seek
+    """
+    name_key = models.CharField(max_length=100, null=True, blank=True, editable=False, db_index=True, default=None)
+
+    normalize = staticmethod(normalize_name)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.name_key = self.normalize(self.name)
+        super().save(*args, **kwargs)
+
 # Single Column Models
-class Manufacturer(models.Model):
+class Manufacturer(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
 
     def __str__(self):
         return self.name
 
-class Technology(models.Model):
+class Technology(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
 
     def __str__(self):
         return self.name
     
 class Solver(models.Model):
-    name = models.CharField(max_length=50, null=False, blank=False)
+    name = models.CharField(max_length=50, null=False, blank=False, db_index=True)
 
     def __str__(self):
         return self.name
 
 class PerformanceMetric(models.Model):
-    name = models.CharField(max_length=50, null=False, blank=False)
+    name = models.CharField(max_length=50, null=False, blank=False, db_index=True)
 
     def __str__(self):
         return self.name
 
 class CompilationTool(models.Model):
-    name = models.CharField(max_length=50, null=False, blank=False)
+    name = models.CharField(max_length=50, null=False, blank=False, db_index=True)
 
     def __str__(self):
         return self.name
 
 class CompilationAlgorithmn(models.Model):
-    name = models.CharField(max_length=50, null=False, blank=False)
+    name = models.CharField(max_length=50, null=False, blank=False, db_index=True)
 
     def __str__(self):
         return self.name
 
 # Multi-Column Models 
-class Topology(models.Model):
+class Topology(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     physical_qubits_per_cell = models.IntegerField(null=True, blank=True)
     qubit_degree = models.FloatField(null=True, blank=True)
@@ -52,7 +92,7 @@ class Topology(models.Model):
     def __str__(self):
         return self.name
 
-class Processor(models.Model):
+class Processor(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     technology = models.ForeignKey(Technology, on_delete=models.SET_NULL, null=True, blank=False)
     manufacturer = models.ForeignKey(Manufacturer, on_delete=models.SET_NULL, null=True, blank=False)
@@ -67,22 +107,28 @@ class Processor(models.Model):
     def __str__(self):
         return self.name
     
-class GateSet(models.Model):
+class GateSet(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     url1 = models.URLField(max_length=200, null=True, blank=True)
     url2 = models.URLField(max_length=200, null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
 
+    # the same gates listed in another order or case are one gate set
+    normalize = staticmethod(gate_set_key)
+
     def __str__(self):
         return self.name
     
-class Gate(models.Model):
+class Gate(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     qubits = models.IntegerField(null=False, blank=False)
     url1 = models.URLField(max_length=200, blank=True)
     url2 = models.URLField(max_length=200, blank=True)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["name"], name="gate_name_idx")]
+
     def __str__(self):
         return f"{self.qubits}, {self.name}"
     
@@ -90,10 +136,13 @@ class GateSetMembership(models.Model):
     gate_set = models.ForeignKey(GateSet, on_delete=models.SET_NULL, null=True, blank=False)
     gate = models.ForeignKey(Gate, on_delete=models.SET_NULL, null=True, blank=False)
 
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["gate_set", "gate"], name="unique_gate_set_membership")]
+
     def __str__(self):
         return f"{self.gate_set} - {self.gate.qubits}Q {self.gate.name}"
 
-class System(models.Model):
+class System(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     manufactor = models.ForeignKey(Manufacturer,  on_delete=models.SET_NULL, null=True, blank=True)
     processor = models.ForeignKey(Processor, on_delete=models.SET_NULL, null=True, blank=True)
@@ -138,8 +187,14 @@ class Calibration(models.Model):
     url1 = models.URLField(max_length=200, null=True, blank=True)
     url2 = models.URLField(max_length=200, null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
-    
-class Graph(models.Model):
+    # sha256 of the snapshot values, lets the calibration import skip snapshots that did not change (see schemas.upsert_calibrations)
+    content_hash = models.CharField(max_length=64, null=True, blank=True, editable=False, default=None)
+
+    class Meta:
+        # one snapshot per system and date, also the index of the per-system time series lookups
+        constraints = [models.UniqueConstraint(fields=["system", "date"], name="unique_calibration_system_date")]
+
+class Graph(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     url1 = models.URLField(max_length=200, null= True,  blank=True)
     url2 = models.URLField(max_length=200,null = True,  blank=True)
@@ -148,7 +203,7 @@ class Graph(models.Model):
     def __str__(self):
         return self.name
     
-class Problem(models.Model):
+class Problem(NormalizedName):
     name = models.CharField(max_length=50, null=False, blank=False)
     url1 = models.URLField(max_length=200, null = True,  blank=True)
     url2 = models.URLField(max_length=200, null = True, blank=True)
@@ -178,10 +233,39 @@ class PerformanceReport(models.Model):
     url1 = models.URLField( null=True, blank=True)
     url2 = models.URLField( null=True, blank=True)
     notes = models.TextField(null=True, blank=True, default=None)
+    # hash of the natural key (see report_fingerprint), duplicate checks are unique index probes instead of table scans
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False, default=None)
 
-    
+    def natural_key(self):
+        return tuple(getattr(self, field) for field in REPORT_KEY_FIELDS)
+
+    def clean(self):
+        fingerprint = report_fingerprint(self.natural_key())
+        if PerformanceReport.objects.filter(fingerprint=fingerprint).exclude(pk=self.pk).exists():
+            raise ValidationError("A performance report with the same problem, qubo counts, system, solver, qubits, rcs, chain lengths and runs already exists")
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = report_fingerprint(self.natural_key())
+        super().save(*args, **kwargs)
+
+# columns identifying a performance report, in the order hashed by report_fingerprint
+REPORT_KEY_FIELDS = ("problem_id", "qubo_var_count", "qubo_quad_term_count", "system_id", "solver_id", "qubit_count", "rcs", "mean_chain_length", "max_chain_length", "num_runs")
+
+def report_fingerprint(key):
+    """
+    Return the sha256 hex digest of a performance report's natural key (values of REPORT_KEY_FIELDS in order).
+    Numbers are normalized so 3, 3.0 and numpy scalars hash alike and NULLs compare equal, like the old `col = %s OR col IS NULL AND %s IS NULL` check
+    """
+    parts = []
+    for value in key:
+        if value is None or value != value: # None and NaN
+            parts.append("")
+        elif float(value).is_integer():
+            parts.append(str(int(value)))
+        else:
+            parts.append(repr(float(value)))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
 
-    
 # New Multiple Columns Model
 class CompilationStep(models.Model):
     compilation_tool = models.ForeignKey(CompilationTool,on_delete=models.SET_NULL, null=True, blank=True)
@@ -204,3 +288,56 @@ class ErrorLog(models.Model):
     error_message = models.TextField()
     
     querycode= models.TextField()
+
+class UploadJob(models.Model):
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("success", "Success"),
+        ("error", "Error"),
+    ]
+    upload_type = models.CharField(max_length=30)
+    file_name = models.CharField(max_length=200)
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    rows_processed = models.IntegerField(default=0)
+    insertions = models.JSONField(default=dict, blank=True)
+    error_count = models.IntegerField(default=0)
+    summary = models.JSONField(null=True, blank=True, default=None)
+    log_file = models.CharField(max_length=255, blank=True, default="") # gzip JSON Lines file with every message of the upload (see ingest.MessageLog)
+    worker = models.CharField(max_length=100, blank=True, default="") # "host:pid" of the process whose upload pool runs the job (see jobs.fail_stale_jobs)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True, default=None)
+
+    def __str__(self):
+        return f"{self.upload_type} {'dry run' if self.dry_run else 'upload'} {self.id} ({self.file_name}): {self.status}"
+
+class IngestCheckpoint(models.Model):
+    """
+    Progress of a checkpointed csv import, keyed by the upload schema and the sha256 of the file content
+    """
+    schema = models.CharField(max_length=30)
+    file_hash = models.CharField(max_length=64, db_index=True)
+    file_name = models.CharField(max_length=200)
+    rows_committed = models.IntegerField(default=0)
+    insertions = models.JSONField(default=dict, blank=True)
+    finished = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.schema} import of {self.file_name}: {self.rows_committed} rows committed{' (finished)' if self.finished else ''}"
+
+class IngestToken(models.Model):
+    """
+    API key of a benchmark harness pushing results to the JSON Lines ingest endpoint. Only the sha256 of the key is stored,
+    keys are created with the createingesttoken command
+    """
+    name = models.CharField(max_length=50)
+    key_hash = models.CharField(max_length=64, unique=True, editable=False)
+    active = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_used = models.DateTimeField(null=True, blank=True, default=None)
+
+    def __str__(self):
+        return f"{self.name}{'' if self.active else ' (revoked)'}"
@@ -0,0 +1,119 @@
+import base64, json, re
+from django.core.exceptions import BadRequest
+
+# Keyset pagination of the table views. A paged query ends its select list with its key columns, named page_key0, page_key1, ... in
+# ordering order, which together identify a row (ids of the joined tables, COALESCE(id, 0) for nullable outer joined ones). It marks where
+# fetch_page puts the seek predicate with SEEK_WHERE (a query without WHERE clause, before any GROUP BY) or SEEK_AND (at the end of its
+# WHERE clause, no parameter is bound after the mark). fetch_page compares and orders by the key expressions themselves, so the database seeks on the index of the first key
+# and a page costs the same at any depth, only one page of rows is fetched
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SEEK_WHERE = "/*page seek where*/"
+SEEK_AND = "/*page seek and*/"
+
+class Page:
+    """
+    One page of a query: its rows and column names without the key columns, and the cursors of the pages around it (None at either end)
+    """
+    def __init__(self, rows, columns, next_cursor, previous_cursor, page_size):
+        self.rows = rows
+        self.columns = columns
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.page_size = page_size
+        self.next_query = None # query strings of the links to the pages around this one, see page_links
+        self.previous_query = None
+
+def encode_cursor(keys):
+    return base64.urlsafe_b64encode(json.dumps(list(keys)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, key_count):
+    """
+    Return the key values of a cursor, raising BadRequest (a 400 response) if it is not a cursor of `key_count` integer keys
+    """
+    try:
+        keys = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        keys = None
+    if not isinstance(keys, list) or len(keys) != key_count or not all(isinstance(key, int) and not isinstance(key, bool) for key in keys):
+        raise BadRequest("Invalid page cursor")
+    return keys
+
+def page_request(request):
+    """
+    Return the (after, before, page size) of a request's ?after=, ?before= and ?page_size= parameters, the size is clamped to MAX_PAGE_SIZE
+    """
+    try:
+        page_size = min(max(int(request.GET.get("page_size", PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = PAGE_SIZE
+    return request.GET.get("after"), request.GET.get("before"), page_size
+
+def fetch_page(cursor, sql, params, keys, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    Return the Page of `sql` after the cursor `after`, or before the cursor `before`, or the first page
+
+    Arguments
+        ---------
+
+        `cursor` - database cursor
+
+        `sql`, `params` - the query, its select list ends with the key columns page_key0 ... and it holds SEEK_WHERE or SEEK_AND
+
+        `keys` - SQL expressions of the key columns, in ordering order
+
+        `after`, `before` - cursors of a Page (next_cursor, previous_cursor), invalid cursors raise BadRequest
+
+        `page_size` - rows per page
+    """
+    key_count = len(keys)
+    backwards = bool(before)
+    values = decode_cursor(before if backwards else after, key_count) if before or after else None
+    operator, direction = ("<", " DESC") if backwards else (">", "")
+
+    seek = ""
+    page_params = list(params)
+    if values is not None and key_count == 1:
+        seek = f"{keys[0]} {operator} %s"
+        page_params += values
+    elif values is not None:
+        # the range on the first key lets the database seek, the row comparison skips the rows of the first key already shown
+        seek = f"{keys[0]} {operator}= %s AND ({', '.join(keys)}) {operator} ({', '.join(['%s'] * key_count)})"
+        page_params += values[:1] + values
+    page_sql = sql.replace(SEEK_WHERE, f"WHERE {seek}" if seek else "").replace(SEEK_AND, f"AND {seek}" if seek else "")
+    page_sql += f" ORDER BY {', '.join(key + direction for key in keys)} LIMIT {page_size + 1}"
+    cursor.execute(page_sql, page_params)
+    rows = cursor.fetchall()
+    # SQLite renames repeated column names ("id:1"), the page shows the original names
+    columns = [re.sub(r":\d+$", "", column[0]) for column in cursor.description[:-key_count]]
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    first = encode_cursor(rows[0][-key_count:]) if rows else None
+    last = encode_cursor(rows[-1][-key_count:]) if rows else None
+    next_cursor = last if (more and not backwards) or (backwards and rows) else None
+    previous_cursor = first if (more and backwards) or (values is not None and not backwards and rows) else None
+    return Page([row[:-key_count] for row in rows], columns, next_cursor, previous_cursor, page_size)
+
+def page_links(request, page):
+    """
+    Set the query strings of the next and previous page links of `page`, keeping the request's other parameters (columns, filters, ...)
+    """
+    for attribute, parameter, cursor in (("next_query", "after", page.next_cursor), ("previous_query", "before", page.previous_cursor)):
+        if cursor is not None:
+            query = request.GET.copy()
+            query.pop("after", None)
+            query.pop("before", None)
+            query[parameter] = cursor
+            setattr(page, attribute, query.urlencode())
+    return page
+
+def paginate(request, cursor, sql, params, keys):
+    """
+    fetch_page for the page a request asks for, with its links set
+    """
+    after, before, page_size = page_request(request)
+    return page_links(request, fetch_page(cursor, sql, params, keys, after, before, page_size))
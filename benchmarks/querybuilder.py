@@ -0,0 +1,253 @@
+import datetime, functools, re
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.utils import timezone
+from .graph import graph
+from .pagination import SEEK_AND, SEEK_WHERE
+from .search import SEARCH_FILTER, column_filter, escape_like
+
+# SQL compiler of the query builder pages (manytable and customize). Table and column names of a request are checked against a whitelist
+# built from the models, filter values are always bound as parameters, and the SQL of a spec shape (tables, columns and filtered columns,
+# not the filter values) is built once and cached. Identical statement text also lets the database driver reuse its prepared statements
+# (sqlite3's statement cache, psycopg's automatic prepare). The select list ends with the page keys of the query (see pagination.fetch_page)
+
+# customize: base table -> (alias, {joined table: (alias, join condition, table it joins through)}), joins are emitted in this order
+CUSTOM_TABLES = {
+    "benchmarks_performancereport": ("a", {
+        "benchmarks_solver": ("e", "a.solver_id = e.id", None),
+        "benchmarks_performancevalue": ("f", "f.performance_report_id = a.id", None),
+        "benchmarks_compilationstep": ("g", "g.performance_report_id = a.id", None),
+        "benchmarks_system": ("h", "h.id = a.system_id", None),
+        "benchmarks_probleminstance": ("i", "i.id = a.problem_id", None),
+    }),
+    "benchmarks_system": ("b", {
+        "benchmarks_performancereport": ("j", "j.system_id = b.id", None),
+        "benchmarks_calibration": ("k", "k.system_id = b.id", None),
+        "benchmarks_manufacturer": ("l", "l.id = b.manufactor_id", None),
+        "benchmarks_processor": ("m", "m.id = b.processor_id", None),
+        "benchmarks_gateset": ("n", "n.id = b.gate_set_id", None),
+    }),
+    "benchmarks_gateset": ("c", {
+        "benchmarks_gatesetmembership": ("o", "o.gate_set_id = c.id", None),
+        "benchmarks_gate": ("p", "p.id = o.gate_id", "benchmarks_gatesetmembership"),
+    }),
+    "benchmarks_probleminstance": ("d", {
+        "benchmarks_graph": ("q", "q.id = d.graph_id", None),
+        "benchmarks_problem": ("r", "r.id = d.problem_id", None),
+    }),
+}
+CUSTOM_DEFAULT_BASE = "benchmarks_performancereport"
+
+# columns of the temporary table manytable joins for performance values of performance reports (both text)
+METRIC_COLUMNS = ("temp_metric.combined", "temp_metric.chosen")
+
+# filter predicates, "{}" is the column. Text columns take "contains" (the default), "prefix" (abc*), "eq" (=abc) and "in" (a|b),
+# other columns take "eq" (5), ranges (>5, >=5, <5, <=5, 5..10, 5.., ..10) and "in" (1,2,3) with the values converted to the column's type,
+# so comparisons are on the column itself and can use its index
+FILTER_PREDICATES = {
+    "eq": "{} = %s",
+    "lt": "{} < %s",
+    "le": "{} <= %s",
+    "gt": "{} > %s",
+    "ge": "{} >= %s",
+    "range": "{} BETWEEN %s AND %s",
+    "prefix": "{} LIKE %s ESCAPE '\\'",
+    "contains": "{} LIKE %s ESCAPE '\\'",
+    "search": SEARCH_FILTER, # "contains" on a column of the search index (SQLite), "{}" is the id column of its table
+}
+COMPARISONS = {"=": "eq", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
+TEXT_FIELDS = (models.CharField, models.TextField)
+
+@functools.lru_cache(maxsize=None)
+def table_columns():
+    """
+    Whitelist of identifiers: {table: {column name: model field}} for the models of the benchmarks app
+    """
+    return {model._meta.db_table: {field.column: field for field in model._meta.concrete_fields}
+            for model in apps.get_app_config('benchmarks').get_models()}
+
+def filter_predicate(field, column, value):
+    """
+    Return the (operator, params) of a filter value on a column, raising ValueError for values that are not of the column's type
+
+    Arguments
+        ---------
+
+        `field` - model field of the column, None for a text column of no model (temp_metric)
+
+        `column` - column name, for error messages
+
+        `value` - filter text, see FILTER_PREDICATES
+    """
+    value = value.strip()
+    if field is None or isinstance(field, TEXT_FIELDS):
+        if value.startswith("="):
+            return "eq", [value[1:]]
+        if "|" in value:
+            return "in", [part.strip() for part in value.split("|")]
+        if value.endswith("*"):
+            return "prefix", [escape_like(value[:-1]) + "%"]
+        indexed = column_filter(field.model._meta.db_table, field.column, value) if field is not None and "." in column else None
+        if indexed is not None:
+            return "search", indexed
+        return "contains", [f"%{escape_like(value)}%"]
+    if isinstance(field, models.JSONField):
+        raise ValueError(f"Column {column!r} can not be filtered")
+
+    def typed(part):
+        try:
+            converted = field.to_python(part.strip())
+            if isinstance(converted, datetime.datetime) and settings.USE_TZ and timezone.is_naive(converted): # dates typed in a filter are local times
+                converted = timezone.make_aware(converted)
+            return field.get_db_prep_value(converted, connection)
+        except (ValidationError, TypeError, ValueError):
+            raise ValueError(f"Invalid value {part.strip()!r} for column {column!r}")
+
+    if ".." in value:
+        low, _, high = (part.strip() for part in value.partition(".."))
+        if low and high:
+            return "range", [typed(low), typed(high)]
+        if low or high:
+            return ("ge", [typed(low)]) if low else ("le", [typed(high)])
+        raise ValueError(f"Invalid value {value!r} for column {column!r}")
+    comparison = re.match(r"(<=|>=|<|>|=)(.*)", value)
+    if comparison:
+        return COMPARISONS[comparison.group(1)], [typed(comparison.group(2))]
+    parts = re.split(r"[,|]", value)
+    if len(parts) > 1:
+        return "in", [typed(part) for part in parts]
+    return "eq", [typed(value)]
+
+def predicate_sql(column, operator, count):
+    if operator == "in":
+        return f"{column} IN ({', '.join(['%s'] * count)})"
+    if operator == "search":
+        return FILTER_PREDICATES[operator].format(column.rpartition(".")[0] + ".id")
+    return FILTER_PREDICATES[operator].format(column)
+
+def compile_filters(filters):
+    """
+    Return (filter shape, params) of a list of (column, operator, params), the shape is part of the cache key of the compiled SQL
+    """
+    return tuple((column.strip(), operator, len(values)) for column, operator, values in filters), [value for column, operator, values in filters for value in values]
+
+def where_clause(filter_shape):
+    # ends with the place of the page seek predicate (see pagination.fetch_page)
+    return (' where ' + ' and '.join(predicate_sql(*predicate) for predicate in filter_shape) + f' {SEEK_AND}') if filter_shape else f' {SEEK_WHERE}'
+
+def page_keys(keys):
+    return ''.join(f", {key} AS page_key{index}" for index, key in enumerate(keys))
+
+def manytable_query(tables, columns, filters, metric=False):
+    """
+    Return (sql, params, page keys) of a manytable query
+
+    Arguments
+        ---------
+
+        `tables` - tables to join (see graph.plan_joins)
+
+        `columns` - "table.column" display columns
+
+        `filters` - list of ("table.column", value) pairs, see filter_predicate
+
+        `metric` - join the temp_metric table of performance values (METRIC_COLUMNS may then be displayed and filtered)
+    """
+    known = table_columns()
+    predicates = []
+    for column, value in filters:
+        table, _, name = column.strip().partition(".")
+        if column.strip() not in METRIC_COLUMNS and name not in known.get(table, ()):
+            raise ValueError(f"Unknown column {column!r}")
+        predicates.append((column, *filter_predicate(known.get(table, {}).get(name), column, value)))
+    filter_shape, params = compile_filters(predicates)
+    sql, keys = compile_manytable(frozenset(tables), tuple(columns), filter_shape, metric)
+    return sql, params, keys
+
+@functools.lru_cache(maxsize=256)
+def compile_manytable(tables, columns, filter_shape, metric):
+    """
+    Build the (SQL, page keys) of a manytable spec shape, raising ValueError for identifiers that are not columns of the joined tables.
+    Rows are keyed by the ids of the joined tables (all of them may be NULL in a full join, the id of a single table is never NULL)
+    """
+    plan = graph.plan_joins(tables)
+    if plan is None:
+        raise ValueError("No tables to query")
+    allowed = {column.strip() for column in plan.columns} | (set(METRIC_COLUMNS) if metric else set())
+    for column in columns + tuple(column for column, operator, count in filter_shape):
+        if column.strip() not in allowed:
+            raise ValueError(f"Unknown column {column!r}")
+
+    if len(plan.tables) == 1 and not metric:
+        keys = (f"{plan.tables[0]}.id",)
+    else:
+        keys = tuple(f"COALESCE({table}.id, 0)" for table in plan.tables) + (("COALESCE(temp_metric.performance_report_id, 0)",) if metric else ())
+    sql = f"SELECT {', '.join(column.strip() for column in columns)}{page_keys(keys)} FROM {plan.joins} "
+    if metric:
+        sql += " full join temp_metric on benchmarks_performancereport.id = temp_metric.performance_report_id"
+    sql += where_clause(filter_shape)
+    return sql, keys
+
+def custom_tables(base, joins):
+    """
+    Return the (alias, table) pairs a customize query selects from: the base table, then the joined tables in CUSTOM_TABLES order
+    (tables a join goes through are added, unknown joins are ignored). Raises ValueError for an unknown base table
+    """
+    if base not in CUSTOM_TABLES:
+        raise ValueError(f"Unknown base table {base!r}")
+    alias, join_tables = CUSTOM_TABLES[base]
+    wanted = set(joins)
+    wanted.update(join_tables[table][2] for table in joins if table in join_tables and join_tables[table][2])
+    return [(alias, base)] + [(join_tables[table][0], table) for table in join_tables if table in wanted]
+
+def custom_query(base, joins, columns, filters):
+    """
+    Return (sql, params, page keys) of a customize query
+
+    Arguments
+        ---------
+
+        `base` - base table, a key of CUSTOM_TABLES
+
+        `joins` - tables joined to the base table (see custom_tables)
+
+        `columns` - column names of the selected tables, optionally prefixed with a table alias ("a.rcs"), or ["*"]
+
+        `filters` - list of (column, value) pairs, see filter_predicate
+    """
+    selected = custom_tables(base, joins)
+    known = table_columns()
+    predicates = []
+    for column, value in filters:
+        alias, _, name = column.rpartition(".")
+        fields = [known[table][name] for table_alias, table in selected if name in known[table] and alias in ("", table_alias)]
+        if not fields:
+            raise ValueError(f"Unknown column {column!r}")
+        predicates.append((column, *filter_predicate(fields[0], column, value)))
+    filter_shape, params = compile_filters(predicates)
+    sql, keys = compile_custom(base, tuple(table for alias, table in selected[1:]), tuple(columns), filter_shape)
+    return sql, params, keys
+
+@functools.lru_cache(maxsize=256)
+def compile_custom(base, joins, columns, filter_shape):
+    """
+    Build the (SQL, page keys) of a customize spec shape, raising ValueError for identifiers that are not columns of the selected tables.
+    Rows are keyed by the id of the base table and the ids of the (left) joined tables
+    """
+    selected = custom_tables(base, joins)
+    known = table_columns()
+    aliases = {alias: known[table] for alias, table in selected}
+    names = set().union(*aliases.values())
+    for column in [column for column in columns if column != "*"] + [column for column, operator, count in filter_shape]:
+        alias, _, name = column.rpartition(".")
+        if name not in (aliases.get(alias, ()) if alias else names):
+            raise ValueError(f"Unknown column {column!r}")
+
+    base_alias, join_tables = CUSTOM_TABLES[base]
+    keys = (f"{base_alias}.id",) + tuple(f"COALESCE({join_tables[table][0]}.id, 0)" for table in joins)
+    sql = f"SELECT {', '.join(columns)}{page_keys(keys)} FROM {base} as {base_alias} "
+    sql += ' '.join(f"left join {table} as {join_tables[table][0]} on {join_tables[table][1]}" for table in joins)
+    sql += where_clause(filter_shape)
+    return sql, keys
@@ -0,0 +1,487 @@
+import datetime, hashlib, json
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .dimensions import chunked
+from .ingest import NA_STRINGS, Dimension, IngestSchema, Record, register_schema
+from .models import gate_names, report_fingerprint
+
+# Schema registry entries for csv ingest: the columns of each upload type, the dimensions its rows reference and the loader inserting the rows.
+# The admin upload handlers and the import management commands all run these through ingest.run_ingest
+
+def fetch_report_ids(cursor, fingerprints):
+    """
+    Return a dict mapping natural-key fingerprints (see models.report_fingerprint) to the id of the performance report holding them
+    """
+    report_ids = {}
+    for chunk in chunked(sorted(fingerprints)):
+        cursor.execute(f"SELECT fingerprint, id FROM benchmarks_performancereport WHERE fingerprint IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        report_ids.update(cursor.fetchall())
+
+    return report_ids
+
+def load_performance_reports(cursor, dimensions, rows, messages, insertions):
+    """
+    Insert a batch of typed performance report rows (see CSVBatchReader) with set-based lookups and batched inserts, once its dimensions are resolved.
+    When `dimensions` is a dry run resolver nothing is inserted, new rows are only counted and remembered for the later batches
+
+    Arguments
+        ---------
+
+        `cursor` - database cursor
+
+        `dimensions` - DimensionResolver shared by all batches of the upload, its dimensions are resolved
+
+        `rows` - typed rows of the batch
+
+        `messages` - list that upload summary messages are appended to
+
+        `insertions` - dict of insertion counters updated in place
+    """
+    insert_report_sql = """INSERT INTO benchmarks_performancereport
+    (problem_id,
+    qubo_var_count,
+    qubo_quad_term_count,
+    system_id,
+    solver_id,
+    qubit_count,
+    rcs,
+    mean_chain_length,
+    max_chain_length,
+    num_runs,
+    url1,
+    notes,
+    fingerprint)
+    values(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    ON CONFLICT (fingerprint) DO NOTHING
+    """
+    insert_value_sql = """INSERT INTO benchmarks_PerformanceValue
+    (metric_id,
+    value,
+    performance_report_id)
+    values(%s,%s,%s)
+    """
+    insert_compilation_sql = """INSERT INTO benchmarks_CompilationStep
+    (compilation_algorithmn_id,
+    performance_report_id)
+    values(%s,%s)
+    """
+
+    # Performance Reports: every row's natural key is hashed and probed against the unique fingerprint index at once
+    row_keys = []
+    for row in rows:
+        key = (row[0], row[1], row[2], dimensions.get('benchmarks_system', row[3]), dimensions.get('benchmarks_solver', row[5]), row[7], row[8], row[9], row[10], row[11])
+        row_keys.append((key, report_fingerprint(key)))
+    report_ids = fetch_report_ids(cursor, {fingerprint for key, fingerprint in row_keys})
+    planned_reports = dimensions.planned.setdefault('benchmarks_performancereport', {})
+    report_ids.update((fingerprint, planned_reports[fingerprint]) for key, fingerprint in row_keys if fingerprint in planned_reports)
+
+    row_reports = []
+    new_reports = {}
+    existing_report_ids = set()
+    for row, (key, fingerprint) in zip(rows, row_keys):
+        if fingerprint in report_ids or fingerprint in new_reports:
+            if fingerprint in report_ids:
+                existing_report_ids.add(report_ids[fingerprint])
+            messages.append({"text": f"Exception (row {row[-1]}): Entry already exists in Performance Report table", "message_type": "exception"})
+            row_reports.append((fingerprint, False))
+        else:
+            new_reports[fingerprint] = key + (row[6], row[16], fingerprint)
+            row_reports.append((fingerprint, True))
+
+    if new_reports and dimensions.dry_run:
+        insertions["performance_reports"] += len(new_reports)
+        report_ids.update((fingerprint, dimensions.plan('benchmarks_performancereport', fingerprint)) for fingerprint in new_reports)
+    elif new_reports:
+        cursor.executemany(insert_report_sql, list(new_reports.values()))
+        # reports written by a concurrent upload since the probe are skipped by ON CONFLICT and not counted
+        insertions["performance_reports"] += cursor.rowcount if cursor.rowcount >= 0 else len(new_reports)
+        report_ids.update(fetch_report_ids(cursor, new_reports))
+
+    # Compilation Steps and Performance Values: only reports that existed before this batch can hold duplicates
+    # (in a dry run the steps and values planned by earlier batches count as existing too)
+    existing_steps = set()
+    existing_values = set()
+    planned_steps = dimensions.planned.setdefault('benchmarks_compilationstep', {})
+    planned_values = dimensions.planned.setdefault('benchmarks_performancevalue', {})
+    for ids in chunked(sorted(existing_report_ids)):
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f'SELECT compilation_algorithmn_id, performance_report_id FROM benchmarks_compilationstep WHERE performance_report_id IN ({placeholders})', ids)
+        existing_steps.update(cursor.fetchall())
+        cursor.execute(f'SELECT metric_id, value, performance_report_id FROM benchmarks_performancevalue WHERE performance_report_id IN ({placeholders})', ids)
+        existing_values.update(cursor.fetchall())
+
+    new_steps = []
+    new_values = []
+    for row, (fingerprint, new_report) in zip(rows, row_reports):
+        rownum = row[-1]
+        report_id = report_ids.get(fingerprint)
+        if report_id is None:
+            messages.append({"text": f"Insertion Error (row {rownum}): Performance Report could not be found after insertion", "message_type": "error"})
+            continue
+
+        embedding_algorithm_id = dimensions.get('benchmarks_compilationalgorithmn', row[4])
+        if embedding_algorithm_id:
+            step = (embedding_algorithm_id, report_id)
+            if not new_report and (step in existing_steps or step in planned_steps):
+                messages.append({"text": f"Exception (row {rownum}): report, embedding algorithm already in Compilation Step table", "message_type": "exception"})
+            else:
+                existing_steps.add(step)
+                new_steps.append(step)
+                insertions["compilation_steps"] += 1
+
+        for metric_id, value, counter, label in ((dimensions.get('benchmarks_performancemetric', row[12]), row[13], "time_values", "report, time already in Performance Value table"),
+                                                 (dimensions.get('benchmarks_performancemetric', row[14]), row[15], "performance_values", "report, performance in Performance Value table")):
+            if not metric_id:
+                continue
+            performance_value = (metric_id, value, report_id)
+            if not new_report and (performance_value in existing_values or performance_value in planned_values):
+                messages.append({"text": f"Exception (row {rownum}): {label}", "message_type": "exception"})
+            else:
+                existing_values.add(performance_value)
+                new_values.append(performance_value)
+                insertions[counter] += 1
+
+    if dimensions.dry_run:
+        planned_steps.update(dict.fromkeys(new_steps))
+        planned_values.update(dict.fromkeys(new_values))
+        return
+
+    if new_steps:
+        cursor.executemany(insert_compilation_sql, new_steps)
+    if new_values:
+        cursor.executemany(insert_value_sql, new_values)
+
+def load_problem_instances(cursor, dimensions, rows, messages, insertions):
+    """
+    Insert a batch of typed problem rows (see CSVBatchReader), arguments as for load_performance_reports
+    """
+    insert_instance_sql = """
+        INSERT INTO benchmarks_probleminstance (problem_id, graph_id, graph_size, url1, notes)
+        VALUES (%s, %s, %s, %s, %s)
+    """
+
+    # Problem Instances of the batch's problems, (problem, graph, graph size) identifies an instance
+    existing_instances = set()
+    for ids in chunked(sorted({dimensions.get('benchmarks_problem', row[0]) for row in rows})):
+        cursor.execute(f"SELECT problem_id, graph_id, graph_size FROM benchmarks_probleminstance WHERE problem_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        existing_instances.update(cursor.fetchall())
+    planned_instances = dimensions.planned.setdefault('benchmarks_probleminstance', {})
+
+    new_instances = []
+    for row in rows:
+        problem, graphsize, graphtype, url, note, rownum = row
+
+        # Problem Foreign Key
+        problem_id = dimensions.get('benchmarks_problem', problem)
+        if problem_id is None: # cannot insert entry due to foreign key error
+            messages.append({"text": f"Insertion Error (row {rownum}): Problem {problem} was not found after insertion.", "message_type": "error"})
+            continue
+
+
+        # Graph Foreign Key
+        graph_id = dimensions.get('benchmarks_graph', graphtype)
+        if graph_id is None: # cannot insert entry due to foreign key error
+            messages.append({"text": f"Insertion Error (row {rownum}): Graph {graphtype} was not found after insertion.", "message_type": "error"})
+            continue
+
+
+        # Problem Instance
+        instance = (problem_id, graph_id, graphsize)
+        if instance in existing_instances or instance in planned_instances:
+            messages.append({"text": f"Exception (row {rownum}): Entry already exists in Problem Instances table", "message_type": "exception"})
+            continue
+
+        existing_instances.add(instance)
+        new_instances.append(instance + (url, note))
+        insertions["problem_instances"] += 1
+
+    if dimensions.dry_run:
+        planned_instances.update(dict.fromkeys(instance[:3] for instance in new_instances))
+    elif new_instances:
+        cursor.executemany(insert_instance_sql, new_instances)
+
+# columns of the Calibration table filled from a processor file, mapped to their csv columns
+CALIBRATION_COLUMNS = {
+    "eplg": "EPLG", "clops": "CLOPS", "median_cz_err": "Median CZ Error", "median_ecr_err": "Median ECR Error", "median_cnot_err": "Median CNOT error",
+    "median_sx_err": "Median SX Error", "min_1q_err": "Min Single-Qubit Gate Error", "max_1q_err": "Max Single-Qubit Gate Error",
+    "typical_1q_err": "Typical Single-Qubit Gate Error", "median_1q_err": "Median Single-Qubit Gate Error", "min_2q_err": "Min Two-Qubit Gate Error",
+    "max_2q_err": "Max Two-Qubit Gate Error", "typical_2q_err": "Typical Two-Qubit Gate Error", "median_2q_err": "Median Two-Qubit Gate Error",
+    "median_readout_err": "Median Readout Error", "spam_err": "SPAM Error", "mem_err_avg_d1_circuit": "Memory Error Per Qubit at Average Depth-1 Circuit",
+    "crosstalk_err_mid_circuit": "Mid-Circuit Measurement Cross-Talk Error", "min_t1": "Min T1", "max_t1": "Max T1", "median_t1": "Median T1",
+    "mean_t1": "Mean T1", "min_t2": "Min T2", "max_t2": "Max T2", "median_t2": "Median T2", "mean_t2": "Mean T2", "url1": "url", "notes": "Notes",
+}
+
+def load_calibrations(cursor, dimensions, rows, messages, insertions):
+    """
+    Insert one calibration snapshot per typed processor row (see CSVBatchReader), arguments as for load_performance_reports. A row whose content hash
+    is already stored for its system (an earlier import of the same file, or a repeated row) is skipped, so reimporting a file adds nothing
+    """
+    insert_calibration_sql = f"""INSERT INTO benchmarks_calibration(system_id, content_hash, {', '.join(CALIBRATION_COLUMNS)})
+    VALUES ({', '.join(['%s'] * (len(CALIBRATION_COLUMNS) + 2))})"""
+    positions = [PROCESSOR_SCHEMA.positions[column] for column in CALIBRATION_COLUMNS.values()]
+    system_position = PROCESSOR_SCHEMA.positions["System Name"]
+
+    load_gate_memberships(cursor, dimensions, rows, messages, insertions)
+
+    # content hashes stored for the batch's systems, with the snapshots a dry run planned in earlier batches
+    stored = set()
+    system_ids = {dimensions.get('benchmarks_system', row[system_position]) for row in rows} - {None}
+    for ids in chunked(sorted(system_ids)):
+        cursor.execute(f"SELECT system_id, content_hash FROM benchmarks_calibration WHERE content_hash IS NOT NULL AND system_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        stored.update(cursor.fetchall())
+    planned = dimensions.planned.setdefault('benchmarks_calibration_hashes', {})
+    stored.update(planned)
+
+    calibrations = []
+    for row in rows:
+        system_id = dimensions.get('benchmarks_system', row[system_position])
+        if system_id is None: # cannot insert entry due to foreign key error
+            messages.append({"text": f"Insertion Error (row {row[-1]}): System {row[system_position]} was not found after insertion.", "message_type": "error"})
+            continue
+        values = tuple(row[position] for position in positions)
+        content_hash = calibration_hash(values)
+        if (system_id, content_hash) in stored:
+            messages.append({"text": f"Exception (row {row[-1]}): calibration of {row[system_position]} already stored", "message_type": "exception"})
+            insertions["calibrations_unchanged"] += 1
+            continue
+        stored.add((system_id, content_hash))
+        calibrations.append((system_id, content_hash) + values)
+    insertions["calibrations"] += len(calibrations)
+
+    if dimensions.dry_run:
+        planned.update(dict.fromkeys(calibration[:2] for calibration in calibrations))
+    elif calibrations:
+        cursor.executemany(insert_calibration_sql, calibrations)
+
+def calibration_date(value):
+    """
+    Return the aware datetime of a calibration date given as an ISO date/datetime string or read from the database (None for unparsable values)
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        value = parse_datetime(value) or parse_date(value)
+    if isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if isinstance(value, datetime.datetime) and timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    return value
+
+def calibration_hash(values):
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()
+
+def upsert_calibrations(cursor, dimensions, rows, messages, insertions):
+    """
+    Load calibration snapshots keyed on (system, date), arguments as for load_performance_reports. Rows without a Date are snapshots of the day of the import.
+    A snapshot whose content hash equals the system's previous snapshot is skipped, a snapshot of a (system, date) already stored is updated in place,
+    so reloading a vendor file only adds rows for real changes
+    """
+    insert_calibration_sql = f"""INSERT INTO benchmarks_calibration(system_id, date, content_hash, {', '.join(CALIBRATION_COLUMNS)})
+    VALUES ({', '.join(['%s'] * (len(CALIBRATION_COLUMNS) + 3))})"""
+    update_calibration_sql = f"""UPDATE benchmarks_calibration SET content_hash = %s, {', '.join(f'{column} = %s' for column in CALIBRATION_COLUMNS)}
+    WHERE system_id = %s AND date = %s"""
+    positions = [CALIBRATION_SCHEMA.positions[column] for column in CALIBRATION_COLUMNS.values()]
+    system_position = CALIBRATION_SCHEMA.positions["System Name"]
+    date_position = CALIBRATION_SCHEMA.positions["Date"]
+    today = calibration_date(timezone.now().date())
+    load_gate_memberships(cursor, dimensions, rows, messages, insertions)
+
+    # Snapshot history of the batch's systems: system id -> {date: content hash}, with the snapshots a dry run planned in earlier batches
+    history = {}
+    system_ids = {dimensions.get('benchmarks_system', row[system_position]) for row in rows} - {None}
+    for ids in chunked(sorted(system_ids)):
+        cursor.execute(f"SELECT system_id, date, content_hash FROM benchmarks_calibration WHERE date IS NOT NULL AND system_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        for system_id, date, content_hash in cursor.fetchall():
+            history.setdefault(system_id, {})[calibration_date(date)] = content_hash
+    planned = dimensions.planned.setdefault('benchmarks_calibration', {})
+    for (system_id, date), content_hash in planned.items():
+        if system_id in system_ids:
+            history.setdefault(system_id, {})[date] = content_hash
+
+    # the last row of the batch wins when several rows snapshot the same (system, date)
+    snapshot_rows = {}
+    for row in rows:
+        rownum = row[-1]
+        system_id = dimensions.get('benchmarks_system', row[system_position])
+        if system_id is None: # cannot insert entry due to foreign key error
+            messages.append({"text": f"Insertion Error (row {rownum}): System {row[system_position]} was not found after insertion.", "message_type": "error"})
+            continue
+        date = today if row[date_position] is None else calibration_date(row[date_position])
+        if date is None:
+            messages.append({"text": f"Value Error (row {rownum}): Date {row[date_position]} is not an ISO date", "message_type": "error"})
+            continue
+        if (system_id, date) in snapshot_rows:
+            messages.append({"text": f"Exception (row {snapshot_rows[(system_id, date)][-1]}): calibration of {row[system_position]} on {date.date()} replaced by row {rownum}", "message_type": "exception"})
+            del snapshot_rows[(system_id, date)]
+        snapshot_rows[(system_id, date)] = row
+
+    new_calibrations = {}
+    changed_calibrations = {}
+    for (system_id, date), row in sorted(snapshot_rows.items(), key=lambda item: item[0][1]):
+        rownum = row[-1]
+        values = tuple(row[position] for position in positions)
+        content_hash = calibration_hash(values)
+        snapshots = history.setdefault(system_id, {})
+        if date in snapshots:
+            if snapshots[date] == content_hash:
+                messages.append({"text": f"Exception (row {rownum}): calibration of {row[system_position]} on {date.date()} already stored", "message_type": "exception"})
+                insertions["calibrations_unchanged"] += 1
+                continue
+            changed_calibrations[(system_id, date)] = (content_hash,) + values
+        else:
+            earlier = [snapshot for snapshot in snapshots if snapshot < date]
+            if earlier and snapshots[max(earlier)] == content_hash:
+                messages.append({"text": f"Exception (row {rownum}): calibration of {row[system_position]} unchanged since {max(earlier).date()}", "message_type": "exception"})
+                insertions["calibrations_unchanged"] += 1
+                continue
+            new_calibrations[(system_id, date)] = (content_hash,) + values
+        snapshots[date] = content_hash
+    insertions["calibrations"] += len(new_calibrations)
+    insertions["calibrations_updated"] += len(changed_calibrations)
+
+    if dimensions.dry_run:
+        planned.update((key, values[0]) for key, values in {**new_calibrations, **changed_calibrations}.items())
+        return
+
+    adapt = connection.ops.adapt_datetimefield_value
+    if new_calibrations:
+        cursor.executemany(insert_calibration_sql, [(system_id, adapt(date)) + values for (system_id, date), values in new_calibrations.items()])
+    if changed_calibrations:
+        cursor.executemany(update_calibration_sql, [values + (system_id, adapt(date)) for (system_id, date), values in changed_calibrations.items()])
+
+def processor_name(record):
+    """
+    Processors without a type are named after their system
+    """
+    return record["Processor Type"] if record["Processor Type"] is not None else record["System Name"] + "'s processor"
+
+def gate_set_gates(record):
+    """
+    Return the (gate name, qubits) pairs of a processor record, two qubit gates first
+    """
+    return [(name, 2) for name in gate_names(record["Two Qubit Gates"])] + [(name, 1) for name in gate_names(record["One Qubit Gates"])]
+
+def gate_set_name(record):
+    """
+    Gate sets are named after their gates, two qubit gates first and each group sorted, so the same gates listed in another order give the same name
+    """
+    groups = [', '.join(sorted(gate_names(record[column]), key=str.lower)) for column in ("Two Qubit Gates", "One Qubit Gates")]
+    return ', '.join(group for group in groups if group) or None
+
+def load_gate_memberships(cursor, dimensions, rows, messages, insertions):
+    """
+    Add the gates of a batch of typed processor rows to the Gate catalog and link them to the rows' gate sets, arguments as for load_performance_reports
+    """
+    insert_membership_sql = 'INSERT INTO benchmarks_gatesetmembership (gate_set_id, gate_id) VALUES (%s, %s)'
+    records = [Record(PROCESSOR_SCHEMA.positions, row) for row in rows]
+
+    # Gates, a gate's qubit count is taken from the list it first appeared in
+    gate_values = {}
+    for record in records:
+        for name, qubits in gate_set_gates(record):
+            gate_values.setdefault(name, (qubits, '', '', ''))
+    dimensions.resolve('benchmarks_gate', gate_values, columns=('qubits', 'url1', 'url2', 'notes'), values=gate_values)
+    for row, record in zip(rows, records):
+        for name, qubits in gate_set_gates(record):
+            if dimensions.take_created('benchmarks_gate', name):
+                messages.append({"text": f"New Gate (row {row[-1]}): {name}", "message_type": "success"})
+                insertions["gates"] += 1
+
+    # Gate Set Memberships missing for the batch's gate sets (new gate sets and gate sets created before the gate catalog was filled)
+    gate_sets = {}
+    for record in records:
+        gate_set_id = dimensions.get('benchmarks_gateset', gate_set_name(record))
+        if gate_set_id is not None and gate_set_id not in gate_sets:
+            gate_sets[gate_set_id] = {dimensions.get('benchmarks_gate', name) for name, qubits in gate_set_gates(record)}
+
+    planned = dimensions.planned.setdefault('benchmarks_gatesetmembership', {})
+    existing = set(planned)
+    for ids in chunked(sorted(gate_sets)):
+        cursor.execute(f"SELECT gate_set_id, gate_id FROM benchmarks_gatesetmembership WHERE gate_set_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        existing.update(cursor.fetchall())
+
+    memberships = [(gate_set_id, gate_id) for gate_set_id, gate_ids in gate_sets.items() for gate_id in sorted(gate_ids) if (gate_set_id, gate_id) not in existing]
+    insertions["gate_set_memberships"] += len(memberships)
+    if dimensions.dry_run:
+        planned.update(dict.fromkeys(memberships))
+    elif memberships:
+        cursor.executemany(insert_membership_sql, memberships)
+
+PERFORMANCE_REPORT_SCHEMA = register_schema(IngestSchema(
+    "performance_report",
+    columns={"Problem ID": [int], "QUBO Variables": [int, None], "QUBO Quadratic Terms": [int, None], "System Name": [str, None], "Embedding Algorithm": [str, None],
+             "Solver": [str, None], "URL": [str, None], "Qubits": [int, None], "RCS": [float, None], "Mean Chain Length": [int, None], "Max Chain Length": [int, None],
+             "Number of Runs": [int, None], "Time Type": [str, None], "Time": [float, None], "Performance Metric": [str, None], "Performance Value": [float, None],
+             "Notes": [str, None]},
+    dimensions=[
+        Dimension('benchmarks_system', "System Name", "System", "systems"),
+        Dimension('benchmarks_compilationalgorithmn', "Embedding Algorithm", "Embedding Algorithm", "embedding_algorithms"),
+        Dimension('benchmarks_solver', "Solver", "Solver", "solvers"),
+        Dimension('benchmarks_performancemetric', "Time Type", "Time Type (Performance Metric)", "metrics"),
+        Dimension('benchmarks_performancemetric', "Performance Metric", "Performance Metric", "metrics"),
+    ],
+    loader=load_performance_reports,
+    summary=[("performance_reports", "{} performance reports inserted"), ("performance_values", "{} performance values inserted"),
+             ("time_values", "{} time values inserted"), ("compilation_steps", "{} compilation steps inserted"), ("systems", "{} new systems"),
+             ("embedding_algorithms", "{} new compilation (embedding) algorithms"), ("solvers", "{} new solvers"), ("metrics", "{} new performance metrics")],
+))
+
+PROBLEM_SCHEMA = register_schema(IngestSchema(
+    "problem",
+    columns={"Problem": [str], "Graph Size": [float, None], "Graph Type": [str], "url": [str, None], "Notes": [str, None]},
+    dimensions=[
+        Dimension('benchmarks_problem', "Problem", "Problem", "problems", values={'url1': "url", 'notes': "Notes"}),
+        Dimension('benchmarks_graph', "Graph Type", "Graph", "graphs", values={'url1': "url", 'notes': "Notes"}),
+    ],
+    loader=load_problem_instances,
+    summary=[("problem_instances", "{} problem instances inserted"), ("problems", "{} new problems"), ("graphs", "{} new graphs")],
+))
+
+PROCESSOR_SCHEMA = register_schema(IngestSchema(
+    "processor",
+    columns={"System Name": [str], "Manufacturer": [str, None], "Physical Qubits": [int, None], "Processor Type": [str, None], "Technology": [str, None],
+             "Year of Intro": [int, None], "Topology": [str, None], "EPLG": [float, None], "CLOPS": [int, None], "Median CZ Error": [float, None],
+             "Median ECR Error": [float, None], "Median CNOT error": [float, None], "Median SX Error": [float, None], "Min Single-Qubit Gate Error": [float, None],
+             "Max Single-Qubit Gate Error": [float, None], "Typical Single-Qubit Gate Error": [float, None], "Median Single-Qubit Gate Error": [float, None],
+             "Min Two-Qubit Gate Error": [float, None], "Max Two-Qubit Gate Error": [float, None], "Typical Two-Qubit Gate Error": [float, None],
+             "Median Two-Qubit Gate Error": [float, None], "Median Readout Error": [float, None], "SPAM Error": [float, None],
+             "Memory Error Per Qubit at Average Depth-1 Circuit": [float, None], "Mid-Circuit Measurement Cross-Talk Error": [float, None],
+             "Min T1": [float, None], "Max T1": [float, None], "Median T1": [float, None], "Mean T1": [float, None], "Min T2": [float, None],
+             "Max T2": [float, None], "Median T2": [float, None], "Mean T2": [float, None], "Two Qubit Gates": [str, None], "One Qubit Gates": [str, None],
+             "Notes": [str, None], "url": [str, None]},
+    dimensions=[
+        Dimension('benchmarks_manufacturer', "Manufacturer", "Manufacturer", "manufacturers"),
+        Dimension('benchmarks_technology', "Technology", "Technology", "technologies"),
+        Dimension('benchmarks_topology', "Topology", "Topology", "topologies"),
+        Dimension('benchmarks_processor', processor_name, "Processor", "processors", values={
+            'technology_id': lambda record, dimensions: dimensions.get('benchmarks_technology', record["Technology"]),
+            'manufacturer_id': lambda record, dimensions: dimensions.get('benchmarks_manufacturer', record["Manufacturer"]),
+            'physical_qubits': "Physical Qubits",
+            'topology_id': lambda record, dimensions: dimensions.get('benchmarks_topology', record["Topology"]),
+            'intro_year': "Year of Intro", 'url1': "url", 'notes': "Notes"}),
+        Dimension('benchmarks_gateset', gate_set_name, "Gate Set", "gate_sets"),
+        Dimension('benchmarks_system', "System Name", "System", "systems", values={
+            'manufactor_id': lambda record, dimensions: dimensions.get('benchmarks_manufacturer', record["Manufacturer"]),
+            'processor_id': lambda record, dimensions: dimensions.get('benchmarks_processor', processor_name(record)),
+            'intro_year': "Year of Intro",
+            'gate_set_id': lambda record, dimensions: dimensions.get('benchmarks_gateset', gate_set_name(record)),
+            'url1': "url", 'notes': "Notes"}),
+    ],
+    loader=load_calibrations,
+    summary=[("calibrations", "{} calibrations inserted"), ("calibrations_unchanged", "{} unchanged calibrations skipped"), ("manufacturers", "{} new manufacturers"), ("technologies", "{} new technologies"),
+             ("topologies", "{} new topologies"), ("processors", "{} new processors"), ("gate_sets", "{} new gate sets"), ("systems", "{} new systems"),
+             ("gates", "{} new gates"), ("gate_set_memberships", "{} gate set memberships inserted")],
+    strict_header=False,
+    na_values=NA_STRINGS,
+))
+
+CALIBRATION_SCHEMA = register_schema(IngestSchema(
+    "calibration",
+    columns={**PROCESSOR_SCHEMA.columns, "Date": [str, None]},
+    dimensions=PROCESSOR_SCHEMA.dimensions,
+    loader=upsert_calibrations,
+    summary=[("calibrations", "{} calibrations inserted"), ("calibrations_updated", "{} calibrations updated"), ("calibrations_unchanged", "{} unchanged calibrations skipped")]
+            + PROCESSOR_SCHEMA.summary[2:],
+    strict_header=False,
+    na_values=NA_STRINGS,
+))
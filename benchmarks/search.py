@@ -0,0 +1,158 @@
+import re
+from django.db import connection
+from .models import Problem, Graph, System, Processor, Solver, PerformanceReport
+
+# Text search over the names, notes and urls of problems, graphs, systems, processors, solvers and performance reports.
+# PostgreSQL: pg_trgm GIN indexes on each searched column (they also serve the query builder's LIKE '%...%' filters) and a GIN index on
+# the tsvector of each table's document, matches are ranked by ts_rank and word_similarity.
+# SQLite: an FTS5 table with the trigram tokenizer (benchmarks_search) kept in sync by triggers, matches are ranked by bm25.
+# The index is created after migrate (see apps.py) and can be rebuilt with "python manage.py buildsearchindex"
+
+SEARCH_FIELDS = ("name", "notes", "url1", "url2")
+SEARCH_TABLE = "benchmarks_search"
+ROWID_SPAN = 1 << 40 # SQLite: rowid of a row in the FTS table = table number * ROWID_SPAN + id
+MIN_TRIGRAM = 3 # shorter words can not use a trigram index and are matched with LIKE
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+# searched table -> (number of the table, its searched columns)
+SEARCH_TABLES = {model._meta.db_table: (number, tuple(field for field in SEARCH_FIELDS if field in {f.column for f in model._meta.concrete_fields}))
+                 for number, model in enumerate((Problem, Graph, System, Processor, Solver, PerformanceReport), start=1)}
+
+class SearchResult:
+    """
+    A matching row: its table and id, the searched columns ({column: text}) and its rank (higher is better)
+    """
+    def __init__(self, table, id, fields, rank):
+        self.table = table
+        self.id = id
+        self.fields = fields
+        self.rank = rank
+
+    def as_dict(self):
+        return {"table": self.table, "id": self.id, "rank": self.rank, **self.fields}
+
+def document(columns):
+    # immutable expression (PostgreSQL can index it), concat_ws is not
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+def create_search_index(**kwargs):
+    """
+    Create the search index of the database if it does not exist (a post_migrate receiver)
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for table, (number, columns) in SEARCH_TABLES.items():
+                for column in columns:
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON {table} USING gin ({column} gin_trgm_ops)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_search_tsv ON {table} USING gin (to_tsvector('simple', {document(columns)}))")
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f"SELECT 1 FROM sqlite_master WHERE name = '{SEARCH_TABLE}'")
+            missing = cursor.fetchone() is None
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({', '.join(SEARCH_FIELDS)}, tokenize='trigram')")
+            for table, (number, columns) in SEARCH_TABLES.items():
+                values = ', '.join(f"new.{field}" if field in columns else "NULL" for field in SEARCH_FIELDS)
+                insert = f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) VALUES ({number * ROWID_SPAN} + new.id, {values});"
+                delete = f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {number * ROWID_SPAN} + old.id;"
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END")
+            if missing: # rows written before the triggers existed
+                rebuild_search_index(cursor)
+
+def rebuild_search_index(cursor):
+    """
+    SQLite: fill the FTS table again from the searched tables (PostgreSQL's indexes never need it)
+    """
+    if connection.vendor != 'sqlite':
+        return
+    cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    for table, (number, columns) in SEARCH_TABLES.items():
+        values = ', '.join(field if field in columns else "NULL" for field in SEARCH_FIELDS)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) SELECT {number * ROWID_SPAN} + id, {values} FROM {table}")
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+def escape_like(value):
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+def fts_phrase(text, column=None):
+    """
+    FTS5 query matching `text` as a substring (of `column`, of any column by default)
+    """
+    phrase = '"' + text.replace('"', '""') + '"'
+    return f"{column} : {phrase}" if column else phrase
+
+# query builder "contains" filter of a searched column served by the index, "{}" is the id column of the filtered table
+SEARCH_FILTER = f"{{}} IN (SELECT rowid - %s FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid BETWEEN %s AND %s)"
+
+def column_filter(table, column, value):
+    """
+    Return the params of SEARCH_FILTER for rows of `table` whose `column` contains `value`, or None when the column is not searched
+    or the value is too short (the filter is then a LIKE, which PostgreSQL's trigram indexes serve)
+    """
+    if connection.vendor != 'sqlite' or table not in SEARCH_TABLES or column not in SEARCH_TABLES[table][1] or len(value) < MIN_TRIGRAM:
+        return None
+    offset = SEARCH_TABLES[table][0] * ROWID_SPAN
+    return [offset, fts_phrase(value, column), offset, offset + ROWID_SPAN - 1]
+
+def search(query, tables=None, limit=SEARCH_LIMIT):
+    """
+    Return the SearchResults of the rows matching `query`, best first
+
+    Arguments
+        ---------
+
+        `query` - words, a row matches when each word is a substring of one of its searched columns (case insensitive)
+
+        `tables` - searched tables, keys of SEARCH_TABLES (all of them by default), unknown tables raise ValueError
+
+        `limit` - maximum number of results
+    """
+    tables = list(SEARCH_TABLES) if not tables else tables
+    for table in tables:
+        if table not in SEARCH_TABLES:
+            raise ValueError(f"Unknown search table {table!r}")
+    words = query.split()
+    if not words:
+        return []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            return postgresql_search(cursor, words, tables, limit)
+        return sqlite_search(cursor, words, tables, limit)
+
+def postgresql_search(cursor, words, tables, limit):
+    selects, params = [], []
+    text = ' '.join(words)
+    for table in tables:
+        number, columns = SEARCH_TABLES[table]
+        doc = document(columns)
+        fields = ', '.join(field if field in columns else f"NULL AS {field}" for field in SEARCH_FIELDS)
+        # each word is a substring of some column (trigram indexes), or the words match as a full text query (tsvector index)
+        substrings = ' AND '.join('(' + ' OR '.join(f"{column} ILIKE %s" for column in columns) + ')' for word in words)
+        selects.append(f"SELECT '{table}' AS search_table, id, {fields}, ts_rank(to_tsvector('simple', {doc}), plainto_tsquery('simple', %s)) + word_similarity(%s, {doc}) AS rank "
+                       f"FROM {table} WHERE ({substrings}) OR to_tsvector('simple', {doc}) @@ plainto_tsquery('simple', %s)")
+        params += [text, text] + [f"%{escape_like(word)}%" for word in words for column in columns] + [text]
+    cursor.execute(' UNION ALL '.join(selects) + f" ORDER BY rank DESC, search_table, id LIMIT {int(limit)}", params)
+    return [SearchResult(row[0], row[1], {field: value for field, value in zip(SEARCH_FIELDS, row[2:-1]) if field in SEARCH_TABLES[row[0]][1]}, row[-1])
+            for row in cursor.fetchall()]
+
+def sqlite_search(cursor, words, tables, limit):
+    numbers = {SEARCH_TABLES[table][0]: table for table in tables}
+    long_words = [word for word in words if len(word) >= MIN_TRIGRAM]
+    sql = f"SELECT rowid, {', '.join(SEARCH_FIELDS)}, {'-bm25(' + SEARCH_TABLE + ')' if long_words else '0'} AS rank FROM {SEARCH_TABLE} WHERE "
+    conditions, params = [], []
+    if long_words:
+        conditions.append(f"{SEARCH_TABLE} MATCH %s")
+        params.append(' '.join(fts_phrase(word) for word in long_words))
+    for word in words:
+        if len(word) < MIN_TRIGRAM:
+            conditions.append('(' + ' OR '.join(f"{field} LIKE %s ESCAPE '\\'" for field in SEARCH_FIELDS) + ')')
+            params += [f"%{escape_like(word)}%"] * len(SEARCH_FIELDS)
+    conditions.append('(' + ' OR '.join(f"rowid BETWEEN {number * ROWID_SPAN} AND {(number + 1) * ROWID_SPAN - 1}" for number in numbers) + ')')
+    cursor.execute(sql + ' AND '.join(conditions) + f" ORDER BY rank DESC, rowid LIMIT {int(limit)}", params)
+    results = []
+    for row in cursor.fetchall():
+        table = numbers[row[0] // ROWID_SPAN]
+        results.append(SearchResult(table, row[0] % ROWID_SPAN, {field: value for field, value in zip(SEARCH_FIELDS, row[1:-1]) if field in SEARCH_TABLES[table][1]}, row[-1]))
+    return results
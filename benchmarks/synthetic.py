@@ -0,0 +1,125 @@
+import csv, random
+from .schemas import PERFORMANCE_REPORT_SCHEMA, PROBLEM_SCHEMA, PROCESSOR_SCHEMA
+
+# Synthetic csv files shaped like real uploads, used by the generatecsv and benchingest commands
+
+SYSTEMS = ["DW_2000Q_6", "Advantage_system4.1", "Advantage_system6.3", "ibm_torino", "ibm_sherbrooke", "ibm_brisbane", "IonQ Aria", "IonQ Forte",
+           "Quantinuum System Model H1", "OQC Toshiko Gen 1"]
+SOLVERS = ["quantum annealing", "QAOA", "VQE", "simulated annealing", "tabu search", "Gurobi", "CPLEX", "parallel tempering"]
+EMBEDDING_ALGORITHMS = ["minor miner", "clique embedding", "layout aware", None]
+TIME_TYPES = ["annealing time", "QPU access time", "wall clock time", "time to solution"]
+METRICS = ["Approximation Ratio", "Success Probability", "Number of Cuts Ratio (current/METIS)", "Energy Gap", "Time to Target"]
+PROBLEMS = ["2-way Graph Partitioning", "Max Cut", "Maximum Independent Set", "Graph Coloring", "Traveling Salesperson", "Number Partitioning"]
+GRAPHS = ["Erdos-Renyi, p = 0.2", "Erdos-Renyi, p = 0.5", "3-regular", "Barabasi-Albert, m = 2", "Chimera", "Complete"]
+MANUFACTURERS = ["IBM", "D-Wave", "IonQ", "Quantinuum", "OQC", "Rigetti"]
+TECHNOLOGIES = ["superconducting", "trapped ion", "neutral atom"]
+TOPOLOGIES = ["heavy-hex lattice", "all-to-all", "Pegasus", "Zephyr", "square lattice"]
+GATES = [("CZ", "ID, RZ, SX, X"), ("ECR", "ID, RZ, SX, X"), ("MS", "GPI, GPI2"), ("ZZ", "U1q, Rz"), (None, None)]
+
+POOL_SIZE = 10000 # earlier rows kept around to draw duplicates from
+
+class SyntheticRows:
+    """
+    Row source shared by the generators: every row is either a copy of an earlier row (duplicate), a row naming a dimension that
+    does not exist yet, or a fresh row over the fixed name pools
+
+    Arguments
+        ---------
+
+        `duplicate_ratio` - fraction of rows repeating an earlier row
+
+        `new_dimension_ratio` - fraction of rows introducing a new dimension name (system, solver, problem, ...)
+
+        `seed` - seed of the random generator, the same arguments always produce the same file
+    """
+    def __init__(self, duplicate_ratio=0.1, new_dimension_ratio=0.01, seed=0):
+        self.random = random.Random(seed)
+        self.duplicate_ratio = duplicate_ratio
+        self.new_dimension_ratio = new_dimension_ratio
+        self.pool = []
+        self.new_names = 0
+
+    def choice(self, names, prefix):
+        if self.random.random() < self.new_dimension_ratio:
+            self.new_names += 1
+            return f"{prefix} {self.new_names}"
+        return self.random.choice(names)
+
+    def rows(self, count, make_row):
+        for number in range(count):
+            if self.pool and self.random.random() < self.duplicate_ratio:
+                yield self.random.choice(self.pool)
+                continue
+            row = make_row(number)
+            if len(self.pool) < POOL_SIZE:
+                self.pool.append(row)
+            else:
+                self.pool[self.random.randrange(POOL_SIZE)] = row
+            yield row
+
+def write_csv(path, columns, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+def generate_performance_reports(path, count, duplicate_ratio=0.1, new_dimension_ratio=0.01, seed=0, problem_ids=range(1, 101)):
+    """
+    Write `count` performance report rows referencing the problem instances `problem_ids` (they have to exist before the upload)
+    """
+    source = SyntheticRows(duplicate_ratio, new_dimension_ratio, seed)
+    draw = source.random
+
+    def make_row(number):
+        qubo_vars = draw.randint(10, 5000)
+        max_chain = draw.randint(1, 20)
+        return [draw.choice(problem_ids), qubo_vars, draw.choice([None, qubo_vars * draw.randint(2, 10)]), source.choice(SYSTEMS, "system"),
+                draw.choice(EMBEDDING_ALGORITHMS), source.choice(SOLVERS, "solver"), f"https://example.org/paper/{number}",
+                draw.randint(20, 5000), draw.choice([None, round(draw.uniform(0.05, 1), 3)]), draw.randint(1, max_chain), max_chain,
+                draw.choice([100, 500, 1000, 10000]), draw.choice(TIME_TYPES), round(draw.uniform(1, 1000), 2), source.choice(METRICS, "metric"),
+                round(draw.random(), 4), draw.choice([None, "synthetic row"])]
+
+    write_csv(path, list(PERFORMANCE_REPORT_SCHEMA.columns), source.rows(count, make_row))
+
+def generate_problems(path, count, duplicate_ratio=0.1, new_dimension_ratio=0.01, seed=0):
+    """
+    Write `count` problem instance rows
+    """
+    source = SyntheticRows(duplicate_ratio, new_dimension_ratio, seed)
+    draw = source.random
+
+    def make_row(number):
+        return [source.choice(PROBLEMS, "problem"), draw.randint(10, 100000), source.choice(GRAPHS, "graph"),
+                f"https://example.org/problem/{number}", draw.choice([None, "synthetic row"])]
+
+    write_csv(path, list(PROBLEM_SCHEMA.columns), source.rows(count, make_row))
+
+def generate_processors(path, count, duplicate_ratio=0.1, new_dimension_ratio=0.01, seed=0):
+    """
+    Write `count` processor rows, i.e. calibration snapshots of a pool of systems
+    """
+    source = SyntheticRows(duplicate_ratio, new_dimension_ratio, seed)
+    draw = source.random
+    columns = list(PROCESSOR_SCHEMA.columns)
+
+    def make_row(number):
+        values = {column: None for column in columns}
+        system = source.choice(SYSTEMS, "system")
+        two_qubit_gates, one_qubit_gates = draw.choice(GATES)
+        values.update({"System Name": system, "Manufacturer": source.choice(MANUFACTURERS, "manufacturer"), "Physical Qubits": draw.randint(5, 6000),
+                       "Processor Type": draw.choice([None, f"{system} r{draw.randint(1, 3)}"]), "Technology": draw.choice(TECHNOLOGIES),
+                       "Year of Intro": draw.randint(2011, 2024), "Topology": source.choice(TOPOLOGIES, "topology"), "Two Qubit Gates": two_qubit_gates,
+                       "One Qubit Gates": one_qubit_gates, "url": f"https://example.org/system/{number}"})
+        for column in columns:
+            if PROCESSOR_SCHEMA.columns[column][0] is float and draw.random() < 0.5:
+                values[column] = round(draw.uniform(0.0001, 300), 6)
+        values["CLOPS"] = draw.choice([None, draw.randint(1000, 5000)])
+        return [values[column] for column in columns]
+
+    write_csv(path, columns, source.rows(count, make_row))
+
+GENERATORS = {
+    "performance_report": generate_performance_reports,
+    "problem": generate_problems,
+    "processor": generate_processors,
+}
@@ -1,3 +1,813 @@
-from django.test import TestCase
+import contextlib, csv, datetime, io, json, os, random, re, socket, subprocess, tempfile, threading, unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.exceptions import BadRequest
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile, TemporaryUploadedFile, UploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from . import jobs, jsoningest, schemas
+from .dimensions import DimensionResolver
+from .csvupload import handle_performance_report_upload, handle_problem_upload, handle_processor_upload
+from .ingest import INLINE_MESSAGES, NA_STRINGS, SCHEMAS, ArrowBatchReader, CSVBatchReader, MessageLog, log_index_path, read_log, run_ingest
+from .ingest import pyarrow
+from .graph import graph
+from .jsoningest import create_token
+from .management.commands import benchingest, importdirectory
+from .models import IngestCheckpoint, UploadJob
+from .export import export_chunks
+from .pagination import SEEK_WHERE, encode_cursor, fetch_page
+from .querybuilder import compile_manytable, custom_query, manytable_query
+from .search import search
+from .synthetic import GENERATORS
+from .views import manytable
 
 # Create your tests here.
+class SyntheticIngestTests(TestCase):
+    """
+    Round trips of generated files through the upload handlers: a fresh upload inserts every distinct row, a re-upload inserts nothing
+    """
+    rows = 1000
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO benchmarks_probleminstance (graph_size) VALUES (%s)', [(size,) for size in range(10)])
+            cursor.execute('SELECT id FROM benchmarks_probleminstance')
+            self.problem_ids = [problem_id for (problem_id,) in cursor.fetchall()]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def generate(self, kind, **options):
+        path = os.path.join(self.directory.name, f'{kind}.csv')
+        GENERATORS[kind](path, self.rows, **options)
+        return path
+
+    def test_performance_report_reupload_inserts_nothing(self):
+        path = self.generate('performance_report', problem_ids=self.problem_ids)
+        first = handle_performance_report_upload(path)
+        dry_run = handle_performance_report_upload(path, dry_run=True)
+        second = handle_performance_report_upload(path)
+
+        self.assertEqual(first["status"], "success")
+        self.assertIn(f"{self.rows} rows read", first["top_message"])
+        self.assertIn(" 0 performance reports inserted", second["top_message"])
+        self.assertEqual(dry_run["top_message"].split(": ", 1)[1], second["top_message"].split(": ", 1)[1])
+
+    def test_performance_report_statements_do_not_grow_with_rows(self):
+        statements = []
+        for rows in (50, 400):
+            path = os.path.join(self.directory.name, f'reports-{rows}.csv')
+            GENERATORS['performance_report'](path, rows, problem_ids=self.problem_ids)
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                self.assertIn(f"{rows} rows read", handle_performance_report_upload(path)["top_message"])
+                transaction.set_rollback(True)
+            statements.append(len(queries))
+        self.assertEqual(statements[0], statements[1])
+
+    def test_reports_of_a_concurrent_upload_are_skipped_on_conflict(self):
+        path = self.generate('performance_report', problem_ids=self.problem_ids)
+        handle_performance_report_upload(path)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_performancereport')
+            reports = cursor.fetchone()[0]
+
+        # the fingerprint probe misses the reports, as if another upload inserted them after it ran
+        fetch_report_ids = schemas.fetch_report_ids
+        with mock.patch.object(schemas, 'fetch_report_ids') as probe:
+            probe.side_effect = lambda cursor, fingerprints: {} if probe.call_count == 1 else fetch_report_ids(cursor, fingerprints)
+            summary = handle_performance_report_upload(path)
+        self.assertEqual(summary["status"], "success")
+        self.assertIn(" 0 performance reports inserted", summary["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_performancereport')
+            self.assertEqual(cursor.fetchone()[0], reports)
+
+    def test_problem_reupload_inserts_nothing(self):
+        path = self.generate('problem')
+        self.assertEqual(handle_problem_upload(path)["status"], "success")
+        self.assertIn(" 0 problem instances inserted", handle_problem_upload(path)["top_message"])
+
+    def test_uploads_are_parsed_from_their_chunks(self):
+        path = os.path.join(self.directory.name, 'names.csv')
+        with open(path, 'w') as file: # multi-byte names, chunks of 7 bytes split characters and records
+            file.write('Problem,Graph Size,Graph Type\n' + ''.join(f'Max Cut {index},{index},Erdős–Rényi\n' for index in range(50)))
+        with transaction.atomic():
+            expected = handle_problem_upload(path)
+            transaction.set_rollback(True)
+        self.assertIn("50 problem instances inserted", expected["top_message"])
+
+        working_directory = sorted(os.listdir())
+        for max_memory_size, upload_class in ((1 << 20, InMemoryUploadedFile), (100, TemporaryUploadedFile)):
+            with open(path, 'rb') as file, self.settings(FILE_UPLOAD_MAX_MEMORY_SIZE=max_memory_size):
+                uploaded = RequestFactory().post('/', {'problemFile': file}).FILES['problemFile']
+            self.assertIsInstance(uploaded, upload_class)
+            with transaction.atomic(), mock.patch.object(UploadedFile, 'DEFAULT_CHUNK_SIZE', 7):
+                self.assertEqual(handle_problem_upload(uploaded), expected)
+                transaction.set_rollback(True)
+            uploaded.close()
+        self.assertEqual(sorted(os.listdir()), working_directory)
+
+    def test_upload_log_keeps_summary_bounded(self):
+        path = self.generate('problem')
+        handle_problem_upload(path)
+        log_path = os.path.join(self.directory.name, 'upload.jsonl.gz')
+        summary = handle_problem_upload(path, log_path=log_path)
+
+        self.assertEqual(summary["message_counts"], {"exception": self.rows})
+        self.assertEqual(len(summary["messages"]), INLINE_MESSAGES)
+        self.assertEqual(sum(1 for message in read_log(log_path)), self.rows)
+        self.assertEqual([message["text"] for message in read_log(log_path, "exception", offset=INLINE_MESSAGES - 1, limit=2)][0], summary["messages"][-1]["text"])
+
+    def test_upload_log_pages_start_at_their_member(self):
+        log_path = os.path.join(self.directory.name, 'paged.jsonl.gz')
+        with mock.patch('benchmarks.ingest.LOG_MEMBER_SIZE', 10):
+            log = MessageLog(log_path)
+            log.extend({"text": f"message {number}", "message_type": "error" if number % 3 == 0 else "exception"} for number in range(95))
+            log.close()
+        with open(log_index_path(log_path)) as index:
+            self.assertEqual(len(json.load(index)["members"]), 10)
+
+        everything = list(read_log(log_path))
+        self.assertEqual(len(everything), 95)
+        for message_type in (None, "error", "exception"):
+            matching = [message for message in everything if message_type in (None, message["message_type"])]
+            for offset in (0, 9, 10, 31, 64, len(matching) - 1, len(matching) + 5):
+                self.assertEqual(list(read_log(log_path, message_type, offset, 7)), matching[offset:offset + 7])
+        with open(log_path, 'r+b') as file: # deep pages do not read the first members at all
+            file.write(bytes(20))
+        self.assertEqual(list(read_log(log_path, None, 90, 5)), everything[90:])
+
+        # a file failing validation keeps its errors as the log, with their index
+        path = os.path.join(self.directory.name, 'broken.csv')
+        with open(path, 'w') as file:
+            file.write("Problem,Graph Size,Graph Type\nMax Cut,ten,ER\n")
+        handle_problem_upload(path, log_path=log_path)
+        self.assertEqual([message["text"] for message in read_log(log_path, "error", offset=0)], ["Value Error (row 1): Graph Size column expects nullable floats"])
+        self.assertTrue(os.path.exists(log_index_path(log_path)))
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['broken.csv', 'paged.jsonl.gz', 'paged.jsonl.gz.idx'])
+
+    def test_benchmark_problem_instances_have_a_problem(self):
+        instance_ids = benchingest.Command().create_problem_instances()
+        self.assertEqual(len(instance_ids), benchingest.PROBLEM_INSTANCES)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT DISTINCT p.name FROM benchmarks_probleminstance i JOIN benchmarks_problem p ON p.id = i.problem_id WHERE i.id IN ({', '.join(['%s'] * len(instance_ids))})", instance_ids)
+            self.assertEqual(cursor.fetchall(), [(benchingest.BENCHMARK_PROBLEM,)])
+
+    def test_processor_upload(self):
+        path = self.generate('processor', new_dimension_ratio=0)
+        summary = handle_processor_upload(path)
+        self.assertEqual(summary["status"], "success")
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_calibration')
+            calibrations = cursor.fetchone()[0]
+        # repeated rows of the file are snapshots already stored, as is every row of a reimport
+        self.assertIn(f"{calibrations} calibrations inserted, {self.rows - calibrations} unchanged calibrations skipped", summary["top_message"])
+        self.assertIn(f"0 calibrations inserted, {self.rows} unchanged calibrations skipped", handle_processor_upload(path)["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_calibration')
+            self.assertEqual(cursor.fetchone()[0], calibrations)
+
+    def test_processor_reimport_keeps_one_calibration(self):
+        path = os.path.join(self.directory.name, 'kyiv.csv')
+        with open(path, 'w') as file:
+            file.write('System Name,Manufacturer,Processor Type,Physical Qubits,EPLG,CLOPS\nibm_kyiv,IBM,Eagle r3,127,0.021,5000\n')
+        self.assertIn("1 calibrations inserted", handle_processor_upload(path)["top_message"])
+        self.assertIn(" 0 calibrations inserted, 1 unchanged calibrations skipped", handle_processor_upload(path)["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_calibration')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_and_arrow_uploads_match_csv(self):
+        import pyarrow.csv, pyarrow.ipc, pyarrow.parquet
+        path = self.generate('performance_report', problem_ids=self.problem_ids)
+        table = pyarrow.csv.read_csv(path)
+        pyarrow.parquet.write_table(table, path + '.parquet', row_group_size=300)
+        with pyarrow.ipc.new_file(path + '.arrow', table.schema) as writer:
+            writer.write_table(table)
+
+        summaries = []
+        for upload in (path, path + '.parquet', path + '.arrow'):
+            with transaction.atomic():
+                summaries.append(handle_performance_report_upload(upload))
+                transaction.set_rollback(True)
+        self.assertEqual(summaries[0]["status"], "success")
+        self.assertEqual(summaries[1], summaries[0])
+        self.assertEqual(summaries[2], summaries[0])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_nullable_int_columns_written_as_floats(self):
+        import pandas as pd
+        path = os.path.join(self.directory.name, 'processors.parquet')
+        # pandas stores an int column with missing values as float64
+        pd.DataFrame({"System Name": ["ibm_kyiv", "ibm_torino", "ibm_brisbane", "ibm_osaka"], "CLOPS": [5000, None, 2.5, 1e19],
+                      "Physical Qubits": [127.0, 133.0, 127.0, float("nan")]}).to_parquet(path)
+        schema = {"System Name": [str], "CLOPS": [int, None], "Physical Qubits": [int]}
+        reader = ArrowBatchReader(path, "parquet", schema)
+        rows = [row for batch in reader for row in batch]
+        self.assertEqual(rows, [("ibm_kyiv", 5000, 127, 1), ("ibm_torino", None, 133, 2), ("ibm_brisbane", None, 127, 3), ("ibm_osaka", None, None, 4)])
+        self.assertEqual([error["text"] for error in reader.errors], ["Value Error (row 3): CLOPS column expects nullable ints",
+            "Value Error (row 4): CLOPS column expects nullable ints", "Value Error (row 4): Physical Qubits column expects nonnull ints"])
+
+        pd.DataFrame({"System Name": ["ibm_kyiv", "ibm_torino"], "Physical Qubits": [127, None]}).to_parquet(path)
+        self.assertEqual(handle_processor_upload(path)["status"], "success")
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT s.name, p.physical_qubits FROM benchmarks_system s JOIN benchmarks_processor p ON p.id = s.processor_id ORDER BY s.name')
+            self.assertEqual(cursor.fetchall(), [("ibm_kyiv", 127), ("ibm_torino", None)])
+
+    def test_calibration_snapshots_are_idempotent(self):
+        def write(name, rows):
+            path = os.path.join(self.directory.name, name)
+            with open(path, 'w') as file:
+                file.write("System Name,CLOPS,Date\n" + "".join(f"{system},{clops},{date}\n" for system, clops, date in rows))
+            return path
+
+        week1 = write('week1.csv', [("ibm_torino", 100, "2024-01-01"), ("ibm_brisbane", 200, "2024-01-01")])
+        week2 = write('week2.csv', [("ibm_torino", 100, "2024-01-08"), ("ibm_brisbane", 250, "2024-01-08")])
+        fixed = write('fixed.csv', [("ibm_torino", 150, "2024-01-08")])
+
+        self.assertIn("2 calibrations inserted", run_ingest('calibration', week1)["top_message"])
+        self.assertIn("0 calibrations inserted, 2 unchanged calibrations skipped", run_ingest('calibration', week1)["top_message"])
+        self.assertIn("1 calibrations inserted, 1 unchanged calibrations skipped", run_ingest('calibration', week2)["top_message"])
+        self.assertIn("1 calibrations inserted", run_ingest('calibration', fixed)["top_message"])
+        self.assertIn("0 calibrations inserted, 1 calibrations updated", run_ingest('calibration', write('fixed2.csv', [("ibm_torino", 175, "2024-01-08")]))["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT s.name, c.clops FROM benchmarks_calibration c JOIN benchmarks_system s ON s.id = c.system_id ORDER BY c.date, s.name')
+            self.assertEqual(cursor.fetchall(), [("ibm_brisbane", 200), ("ibm_torino", 100), ("ibm_brisbane", 250), ("ibm_torino", 175)])
+
+    def test_gate_sets_are_deduplicated_by_members(self):
+        with connection.cursor() as cursor: # gate set of an import before the gate catalog, named in file order and without memberships
+            cursor.execute("INSERT INTO benchmarks_gateset (name) VALUES ('ECR, X, SX, RZ, ID')")
+        path = os.path.join(self.directory.name, 'gates.csv')
+        with open(path, 'w') as file:
+            file.write('System Name,Two Qubit Gates,One Qubit Gates\nibm_kyiv,ECR,"ID, RZ, SX, X"\nibm_sherbrooke,ecr,"x,sx,rz,id"\nibm_torino,CZ,"ID, RZ, SX, X"\n')
+
+        summary = handle_processor_upload(path)
+        self.assertIn("1 new gate sets", summary["top_message"])
+        self.assertIn("6 new gates, 10 gate set memberships inserted", summary["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute("""SELECT s.name FROM benchmarks_gate g JOIN benchmarks_gatesetmembership m ON m.gate_id = g.id
+                JOIN benchmarks_system s ON s.gate_set_id = m.gate_set_id WHERE g.name = 'ECR' ORDER BY s.name""")
+            self.assertEqual(cursor.fetchall(), [("ibm_kyiv",), ("ibm_sherbrooke",)])
+
+    def test_names_are_matched_on_the_indexed_name_key(self):
+        with connection.cursor() as cursor: # problem saved before name_key existed
+            cursor.execute("INSERT INTO benchmarks_problem (name) VALUES ('Max Cut')")
+        path = os.path.join(self.directory.name, 'names.csv')
+        with open(path, 'w') as file:
+            file.write('Problem,Graph Size,Graph Type\nmax cut ,10,Erdős–Rényi\nMAX CUT,12,ERDŐS–RÉNYI\n')
+
+        summary = handle_problem_upload(path)
+        self.assertIn("2 problem instances inserted, 1 new graphs", summary["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT name, name_key FROM benchmarks_problem')
+            self.assertEqual(cursor.fetchall(), [("Max Cut", "max cut")])
+            cursor.execute('SELECT name_key FROM benchmarks_graph')
+            self.assertEqual(cursor.fetchall(), [("erdős–rényi",)])
+            if connection.vendor == 'sqlite':
+                cursor.execute("EXPLAIN QUERY PLAN SELECT name_key, id FROM benchmarks_system WHERE name_key IN ('ibm_torino')")
+                self.assertIn("INDEX benchmarks_system_name_key", " ".join(str(row[-1]) for row in cursor.fetchall()))
+
+    def test_ints_outside_int64_are_value_errors(self):
+        path = os.path.join(self.directory.name, 'overflow.csv')
+        with open(path, 'w') as file:
+            file.write(f"Problem ID,Qubits\n99999999999999999999,1\n{self.problem_ids[0]},-9223372036854775809\n{self.problem_ids[0]},9223372036854775807\n")
+
+        summary = handle_performance_report_upload(path)
+        self.assertEqual(summary["status"], "error")
+        self.assertEqual([message["text"] for message in summary["messages"]],
+                         ["Value Error (row 1): Problem ID column expects nonnull ints", "Value Error (row 2): Qubits column expects nullable ints"])
+
+    def test_checkpointed_import_resumes_after_the_last_committed_batch(self):
+        path = os.path.join(self.directory.name, 'processors.csv')
+        GENERATORS['processor'](path, 7000, new_dimension_ratio=0) # two batches of BATCH_SIZE rows
+        loader = SCHEMAS['processor'].loader
+        calls = []
+        def failing_loader(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError("worker stopped")
+            return loader(*args)
+
+        with mock.patch.object(SCHEMAS['processor'], 'loader', failing_loader), self.assertRaises(RuntimeError):
+            call_command('importprocessor', path, stdout=io.StringIO())
+        checkpoint = IngestCheckpoint.objects.get(schema='processor')
+        self.assertEqual((checkpoint.rows_committed, checkpoint.finished), (5000, False))
+        self.assertEqual(checkpoint.insertions["calibrations"] + checkpoint.insertions["calibrations_unchanged"], 5000)
+
+        output = io.StringIO()
+        call_command('importprocessor', path, stdout=output)
+        self.assertIn("Resuming after row 5000", output.getvalue())
+        self.assertIn("(resumed after row 5000)", output.getvalue())
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.insertions["calibrations"] + checkpoint.insertions["calibrations_unchanged"], 7000)
+        self.assertIn(f"7000 rows read, {checkpoint.insertions['calibrations']} calibrations inserted", output.getvalue())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_calibration')
+            self.assertEqual(cursor.fetchone()[0], checkpoint.insertions["calibrations"])
+
+        output = io.StringIO()
+        call_command('importprocessor', path, stdout=output)
+        self.assertIn("was already imported completely, use --restart", output.getvalue())
+
+        output = io.StringIO()
+        call_command('importprocessor', path, restart=True, stdout=output)
+        self.assertNotIn("Resuming", output.getvalue())
+        self.assertIn("Upload Summary: 7000 rows read, 0 calibrations inserted, 7000 unchanged calibrations skipped", output.getvalue())
+        self.assertNotIn("resumed", output.getvalue())
+        self.assertTrue(IngestCheckpoint.objects.get(schema='processor').finished)
+
+    def test_import_directory(self):
+        for seed in range(3):
+            GENERATORS['problem'](os.path.join(self.directory.name, f'problems-{seed}.csv'), 100, seed=seed)
+        with open(os.path.join(self.directory.name, 'broken.csv'), 'w') as file:
+            file.write("Problem,Graph Size\nMax Cut,ten\n")
+
+        output = io.StringIO()
+        call_command('importdirectory', 'problem', self.directory.name, workers=1, stdout=output)
+        self.assertIn("3 of 4 files imported (0 skipped, 1 failed", output.getvalue())
+        self.assertIn("300 rows read", output.getvalue())
+
+        # finished files are skipped by their hash before they are parsed
+        output = io.StringIO()
+        with mock.patch.object(importdirectory, 'open_batches', wraps=importdirectory.open_batches) as open_batches:
+            call_command('importdirectory', 'problem', self.directory.name, workers=1, stdout=output)
+        self.assertEqual([call.args[0] for call in open_batches.call_args_list], [os.path.join(self.directory.name, 'broken.csv')])
+        self.assertIn("0 of 4 files imported (3 skipped, 1 failed", output.getvalue())
+
+    def test_import_directory_streams_large_files_in_the_writer(self):
+        for seed in range(2):
+            GENERATORS['problem'](os.path.join(self.directory.name, f'problems-{seed}.csv'), 100, seed=seed)
+        with open(os.path.join(self.directory.name, 'problems-broken.csv'), 'w') as file:
+            file.write("Problem,Graph Size,Graph Type\n" + "Max Cut,987654,ER\n" * 6000 + "Max Cut,ten,ER\n")
+
+        output = io.StringIO()
+        with mock.patch.object(importdirectory, 'MAX_PARSED_SIZE', 0), mock.patch.object(importdirectory, 'parse_file') as parse_file:
+            call_command('importdirectory', 'problem', self.directory.name, workers=2, stdout=output)
+        parse_file.assert_not_called()
+        self.assertIn("2 of 3 files imported (0 skipped, 1 failed", output.getvalue())
+        self.assertIn("problems-broken.csv: failed schema validation, nothing was saved", output.getvalue())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM benchmarks_probleminstance WHERE graph_size = 987654') # the batches loaded before the error are rolled back
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+
+class CSVBatchReaderTests(TestCase):
+    """
+    Header handling of the declarative engine: strict headers of the csv upload types, lenient headers and missing value markers of spreadsheet exports
+    """
+    schema = {"System Name": [str], "CLOPS": [int, None], "EPLG": [float, None]}
+
+    def read(self, text, **options):
+        reader = CSVBatchReader(io.StringIO(text), self.schema, **options)
+        return [row for batch in reader for row in batch], [error["text"] for error in reader.errors]
+
+    def test_strict_header(self):
+        self.assertEqual(self.read("System Name,EPLG\nibm_kyiv,0.5\n"), ([("ibm_kyiv", None, 0.5, 1)], []))
+        self.assertEqual(self.read("EPLG,System Name\n0.5,ibm_kyiv\n")[1][0], "Header Error: bad header")
+        self.assertEqual(self.read(" System Name ,Extra\nibm_kyiv,1\n")[1], ["Header Error: missing required headers (System Name)"])
+
+    def test_lenient_header_and_na_values(self):
+        rows, errors = self.read(" CLOPS ,,System Name,Extra\nN/A,,ibm_kyiv,x\n#N/A,,ibm_torino,y\n", strict_header=False, na_values=NA_STRINGS)
+        self.assertEqual((rows, errors), ([("ibm_kyiv", None, None, 1), ("ibm_torino", None, None, 2)], []))
+        rows, errors = self.read("System Name,CLOPS\nNULL,5\n", strict_header=False, na_values=NA_STRINGS)
+        self.assertEqual(errors, ["Value Error (row 1): System Name column expects nonnull strs"])
+
+
+class DimensionResolverTests(TestCase):
+    """
+    DimensionResolver: names are looked up once, only the missing ones are inserted, in one batch
+    """
+    def test_inserts_only_missing_names_in_one_batch(self):
+        with CaptureQueriesContext(connection) as queries, connection.cursor() as cursor:
+            cursor.execute("INSERT INTO benchmarks_solver (name) VALUES ('QAOA')")
+            resolver = DimensionResolver(cursor)
+            first = len(queries)
+            ids = resolver.resolve('benchmarks_solver', ['QAOA', 'VQE', None, 'Grover', 'VQE'])
+            inserts = [query["sql"] for query in queries[first:] if "INSERT" in query["sql"]]
+            self.assertEqual(inserts, ["2 times: INSERT INTO benchmarks_solver(name) values (%s)"]) # one executemany of the missing names
+            self.assertEqual(resolver.created['benchmarks_solver'], {'VQE', 'Grover'})
+
+            cursor.execute("SELECT name, id FROM benchmarks_solver")
+            self.assertEqual(dict(cursor.fetchall()), {'QAOA': ids['QAOA'], 'VQE': ids['VQE'], 'Grover': ids['Grover']})
+            first = len(queries) # resolved names are served from the cache
+            resolver.resolve('benchmarks_solver', ['QAOA', 'Grover'])
+            self.assertEqual(resolver.get('benchmarks_solver', 'VQE'), ids['VQE'])
+            self.assertEqual(len(queries), first)
+
+
+class InlineExecutor:
+    """
+    Stands in for the upload pool: runs a job to completion on its own thread (and database connection) before submit returns
+    """
+    def submit(self, function, *args):
+        thread = threading.Thread(target=function, args=args)
+        thread.start()
+        thread.join()
+
+
+@mock.patch.object(jobs, 'executor', InlineExecutor())
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UploadJobTests(TransactionTestCase):
+    """
+    Background uploads of the dataupload page: the request queues a job, the worker stores its summary and counters, progress is polled as json
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_dir = mock.patch.object(jobs, 'LOG_DIR', self.directory.name)
+        self.log_dir.start()
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def tearDown(self):
+        self.log_dir.stop()
+        self.directory.cleanup()
+
+    def upload(self, content, name='problems.csv', field='problemFile', dry_run=False, **settings):
+        data = {field: SimpleUploadedFile(name, content.encode())}
+        if dry_run:
+            data['dryRun'] = 'on'
+        with self.settings(**settings):
+            return self.client.post('/admin/dataupload/', data)
+
+    def test_upload_runs_as_a_job(self):
+        with mock.patch.object(jobs, 'run_upload_job', wraps=jobs.run_upload_job) as run:
+            response = self.upload("Problem,Graph Size,Graph Type\nMax Cut,10,ER\nMax Cut,12,ER\n")
+        self.assertIsInstance(run.call_args.args[1], SimpleUploadedFile) # small uploads are parsed from memory, not spooled
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertEqual((job.status, job.rows_processed, job.error_count), ("success", 2, 0))
+        self.assertEqual(job.insertions["problem_instances"], 2)
+        self.assertIn("2 rows read", job.summary["top_message"])
+        self.assertTrue(os.path.exists(job.log_file))
+
+        progress = self.client.get(f'/admin/dataupload/progress/{job.id}/').json()
+        self.assertEqual((progress["status"], progress["rows_processed"]), ("success", 2))
+        page = self.client.get('/admin/dataupload/', {'job': job.id})
+        self.assertEqual(page.context['problem_upload_summary']["top_message"], job.summary["top_message"])
+
+    def test_spooled_uploads_are_removed(self):
+        spool = os.path.join(self.directory.name, 'spool')
+        os.mkdir(spool)
+        with mock.patch.object(jobs, 'run_upload_job', wraps=jobs.run_upload_job) as run:
+            response = self.upload("Problem,Graph Size,Graph Type\nMax Cut,ten,ER\n", FILE_UPLOAD_MAX_MEMORY_SIZE=10, FILE_UPLOAD_TEMP_DIR=spool)
+        self.assertEqual(os.path.dirname(run.call_args.args[1]), spool)
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertEqual((job.status, job.error_count), ("error", 1))
+        self.assertEqual(os.listdir(spool), [])
+
+        with mock.patch.dict(jobs.UPLOAD_HANDLERS, problem=mock.Mock(side_effect=RuntimeError("disk full"))):
+            response = self.upload("Problem,Graph Size,Graph Type\nMax Cut,10,ER\n", FILE_UPLOAD_MAX_MEMORY_SIZE=10, FILE_UPLOAD_TEMP_DIR=spool)
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertEqual((job.status, job.summary["top_message"]), ("error", "Upload failed: disk full"))
+        self.assertEqual(os.listdir(spool), [])
+
+    def test_job_fails_when_its_summary_cannot_be_saved(self):
+        save = UploadJob.save
+        def failing_save(job, *args, **kwargs):
+            if job.finished: # the final write of the worker
+                raise DatabaseError("value too long")
+            return save(job, *args, **kwargs)
+        with mock.patch.object(UploadJob, 'save', autospec=True, side_effect=failing_save):
+            response = self.upload("Problem,Graph Size,Graph Type\nMax Cut,10,ER\nMax Cut,12,ER\n")
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertEqual((job.status, job.rows_processed), ("error", 2))
+        self.assertIsNotNone(job.finished)
+        self.assertEqual(job.summary["top_message"], "Upload finished but its summary could not be saved: value too long")
+
+    def test_dry_run_saves_nothing(self):
+        content = "Problem,Graph Size,Graph Type\nMax Cut,10,ER\nMax Cut,12,ER\nMax Cut,12,ER\n"
+        response = self.upload(content, dry_run=True)
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertTrue(job.dry_run)
+        self.assertEqual(job.summary["top_message"], "Dry Run Summary (nothing was saved): 3 rows read, 2 problem instances inserted, 1 new problems, 1 new graphs")
+        self.assertEqual(job.summary["message_counts"], {"success": 2, "exception": 1}) # new names, the repeated row duplicates a planned one
+        with connection.cursor() as cursor:
+            for table in ('benchmarks_problem', 'benchmarks_graph', 'benchmarks_probleminstance'):
+                cursor.execute(f'SELECT COUNT(*) FROM {table}')
+                self.assertEqual(cursor.fetchone()[0], 0)
+
+        response = self.upload(content)
+        job = UploadJob.objects.get(id=response.context['problem_job'].id)
+        self.assertEqual(job.summary["top_message"], "Upload Summary: 3 rows read, 2 problem instances inserted, 1 new problems, 1 new graphs")
+
+    def test_processor_upload_through_the_dataupload_page(self):
+        content = ("System Name,Manufacturer,Processor Type,Physical Qubits,Technology,Topology,CLOPS,Two Qubit Gates,One Qubit Gates\n"
+                   'ibm_kyiv,IBM,Eagle r3,127,Superconducting,Heavy Hex,5000,ECR,"ID, RZ, SX, X"\n'
+                   'ibm_sherbrooke,IBM,Eagle r3,127,Superconducting,Heavy Hex,5000,ECR,"ID, RZ, SX, X"\n'
+                   'ibm_torino,IBM,Heron r1,133,Superconducting,Heavy Hex,,CZ,"ID, RZ, SX, X"\n')
+        response = self.upload(content, name='processors.csv', field='processorFile')
+        job = UploadJob.objects.get(id=response.context['processor_job'].id)
+        self.assertEqual((job.upload_type, job.status, job.rows_processed), ("processor", "success", 3))
+        self.assertIn("3 calibrations inserted, 1 new manufacturers, 1 new technologies, 1 new topologies, 2 new processors, 2 new gate sets, 3 new systems",
+                      job.summary["top_message"])
+        with connection.cursor() as cursor:
+            cursor.execute("""SELECT s.name, p.name, p.physical_qubits, c.clops FROM benchmarks_system s JOIN benchmarks_processor p ON p.id = s.processor_id
+                JOIN benchmarks_calibration c ON c.system_id = s.id ORDER BY s.name""")
+            self.assertEqual(cursor.fetchall(), [("ibm_kyiv", "Eagle r3", 127, 5000), ("ibm_sherbrooke", "Eagle r3", 127, 5000), ("ibm_torino", "Heron r1", 133, None)])
+
+    def test_upload_logs_are_removed_with_their_job_and_pruned(self):
+        uploads = [UploadJob.objects.get(id=self.upload("Problem,Graph Size,Graph Type\nMax Cut,10,ER\n").context['problem_job'].id) for attempt in range(3)]
+        for job in uploads:
+            self.assertTrue(os.path.exists(log_index_path(job.log_file)))
+        uploads[0].delete()
+        self.assertFalse(os.path.exists(uploads[0].log_file) or os.path.exists(log_index_path(uploads[0].log_file)))
+
+        UploadJob.objects.filter(id=uploads[1].id).update(finished=timezone.now() - datetime.timedelta(days=40))
+        orphan = os.path.join(self.directory.name, 'upload-999.jsonl.gz')
+        open(orphan, 'wb').close()
+        output = io.StringIO()
+        call_command('pruneuploadlogs', days=30, stdout=output)
+        self.assertIn("1 upload logs older than 30 days and 1 orphaned files removed", output.getvalue())
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted(os.path.basename(path) for path in (uploads[2].log_file, log_index_path(uploads[2].log_file))))
+        self.assertEqual(UploadJob.objects.get(id=uploads[1].id).log_file, "")
+        self.assertEqual(self.client.get(f'/admin/dataupload/log/{uploads[1].id}/').status_code, 404)
+
+    def test_jobs_of_stopped_processes_fail(self):
+        process = subprocess.Popen(['true'])
+        process.wait()
+        stopped = UploadJob.objects.create(upload_type='problem', file_name='a.csv', status='running', worker=f"{socket.gethostname()}:{process.pid}")
+        elsewhere = UploadJob.objects.create(upload_type='problem', file_name='b.csv', status='running', worker="other-host:1")
+        with mock.patch.object(jobs, 'stale_jobs_checked', False):
+            self.assertEqual(self.client.get(f'/admin/dataupload/progress/{stopped.id}/').json()["status"], "error")
+        self.assertEqual(UploadJob.objects.get(id=elsewhere.id).status, "running")
+
+
+class JSONLinesIngestTests(TestCase):
+    """
+    The api/ingest/reports/ endpoint: token authentication, per-line ids, duplicate flags and errors
+    """
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('INSERT INTO benchmarks_probleminstance (graph_size) VALUES (10)')
+            cursor.execute('SELECT id FROM benchmarks_probleminstance')
+            self.problem_id = cursor.fetchone()[0]
+        self.authorization = f"Bearer {create_token('tests')}"
+
+    def post(self, lines, **headers):
+        body = "\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+        return self.client.post('/benchmarks/api/ingest/reports/', body, content_type='application/x-ndjson', **headers)
+
+    def test_requires_token(self):
+        self.assertEqual(self.post([]).status_code, 401)
+        self.assertEqual(self.post([], HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+
+    def test_ids_and_duplicate_flags(self):
+        report = {"problem_id": self.problem_id, "qubo_var_count": 20, "system": "ibm_torino", "solver": "QAOA",
+                  "compilation_steps": [{"algorithm": "minor miner"}], "values": [{"metric": "Approximation Ratio", "value": 0.9}]}
+        first = self.post([report, report, "{not json", {**report, "problem_id": self.problem_id + 1}], HTTP_AUTHORIZATION=self.authorization).json()
+        second = self.post([report], HTTP_AUTHORIZATION=self.authorization).json()
+
+        report_id = first["results"][0]["id"]
+        self.assertEqual(first["results"][:2], [{"line": 1, "id": report_id, "duplicate": False}, {"line": 2, "id": report_id, "duplicate": True}])
+        self.assertEqual([result["line"] for result in first["results"] if "errors" in result], [3, 4])
+        self.assertEqual(first["insertions"]["performance_values"], 1)
+        self.assertEqual(second["results"], [{"line": 1, "id": report_id, "duplicate": True}])
+        self.assertEqual(second["insertions"]["performance_values"], 0)
+
+    def test_reports_of_a_concurrent_request_are_duplicates(self):
+        report = {"problem_id": self.problem_id, "system": "ibm_torino", "values": [{"metric": "Approximation Ratio", "value": 0.9}]}
+        report_id = self.post([report], HTTP_AUTHORIZATION=self.authorization).json()["results"][0]["id"]
+
+        # the fingerprint probe misses the report, as if another request inserted it after it ran
+        fetch_report_ids = jsoningest.fetch_report_ids
+        with mock.patch.object(jsoningest, 'fetch_report_ids') as probe:
+            probe.side_effect = lambda cursor, fingerprints: {} if probe.call_count == 1 else fetch_report_ids(cursor, fingerprints)
+            response = self.post([{**report, "values": [{"metric": "Approximation Ratio", "value": 0.5}]}], HTTP_AUTHORIZATION=self.authorization).json()
+        self.assertEqual(response["results"], [{"line": 1, "id": report_id, "duplicate": True}])
+        self.assertEqual((response["insertions"]["performance_reports"], response["insertions"]["performance_values"]), (0, 0))
+
+    def test_ints_outside_int64_are_rejected(self):
+        response = self.post([{"problem_id": 99999999999999999999}, {"problem_id": self.problem_id, "qubit_count": -2 ** 63 - 1}], HTTP_AUTHORIZATION=self.authorization)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [{"line": 1, "errors": ["report.problem_id expects a 64-bit int"]},
+                                                      {"line": 2, "errors": ["report.qubit_count expects a 64-bit int"]}])
+
+
+class JoinPlannerTests(TestCase):
+    """
+    graph.connect_all: smallest join trees, memoized plans, the caller's table list is left alone, concurrent requests do not share state
+    """
+    def test_joins_as_few_tables_as_possible(self):
+        tables = ['benchmarks_gate', 'benchmarks_calibration']
+        columns, joins = graph.connect_all(tables)
+        self.assertEqual(tables, ['benchmarks_gate', 'benchmarks_calibration'])
+        self.assertEqual(joins.count("full join"), 4) # gate - membership - gate set - system - calibration
+        self.assertIn('benchmarks_gateset.name', columns)
+        self.assertEqual(graph.connect_all(['benchmarks_calibration', 'benchmarks_gate', 'benchmarks_gate']), (columns, joins))
+        self.assertIn(frozenset(tables), graph.plans)
+        self.assertEqual(graph.connect_all(['benchmarks_manufacturer', 'benchmarks_processor', 'benchmarks_system'])[1].count("full join"), 2)
+        self.assertEqual(graph.connect_all([]), (None, None))
+
+    def test_concurrent_manytable_requests(self):
+        tables = ['benchmarks_manufacturer', 'benchmarks_technology', 'benchmarks_topology', 'benchmarks_processor', 'benchmarks_gateset', 'benchmarks_gate',
+                  'benchmarks_system', 'benchmarks_calibration', 'benchmarks_graph', 'benchmarks_problem', 'benchmarks_probleminstance',
+                  'benchmarks_performancereport', 'benchmarks_compilationstep']
+        table_sets = [random.Random(seed).sample(tables, seed % 5 + 1) for seed in range(64)]
+        factory = RequestFactory()
+        barrier = threading.Barrier(16)
+
+        def columns(table_set, wait=False):
+            if wait: # start the requests of a round together
+                barrier.wait(timeout=30)
+            try:
+                response = manytable(factory.get('/benchmarks/ManyTable/', {'tables': table_set}))
+                return re.findall(r'name="columns" value="([^"]*)"', response.content.decode())
+            finally:
+                if wait:
+                    connection.close()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = [columns(table_set) for table_set in table_sets]
+            graph.plans.clear() # the threads race on planning too
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                results = list(executor.map(lambda table_set: columns(table_set, wait=True), table_sets))
+
+        self.assertEqual(results, expected)
+        for table_set, result in zip(table_sets, expected): # every response shows the columns of its own tables
+            self.assertEqual({table for table in table_set if graph.col_list[table]}, {column.split('.')[0] for column in result if column.split('.')[0] in table_set})
+        with self.assertRaises(RuntimeError):
+            graph.add_vertex('benchmarks_errorlog')
+
+
+class QueryBuilderTests(TestCase):
+    """
+    querybuilder: identifiers are whitelisted, filter values are parameters and the SQL of a spec shape is compiled once
+    """
+    def test_values_are_parameters_and_sql_is_cached(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO benchmarks_system (name) VALUES ('ibm_torino'), ('x''); DROP TABLE benchmarks_system; --')")
+        tables, columns = ['benchmarks_system'], ['benchmarks_system.name']
+        sql, params, keys = manytable_query(tables, columns, [('benchmarks_system.name', "tor")])
+        misses = compile_manytable.cache_info().misses
+        injected, injected_params, keys = manytable_query(tables, columns, [('benchmarks_system.name', "'); DROP TABLE benchmarks_system; --")])
+
+        self.assertIs(injected, sql)
+        self.assertEqual(compile_manytable.cache_info().misses, misses)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            self.assertEqual([row[:-len(keys)] for row in cursor.fetchall()], [("ibm_torino",)])
+            cursor.execute(injected, injected_params)
+            self.assertEqual(len(cursor.fetchall()), 1)
+
+        sql, params, keys = custom_query('benchmarks_gateset', ['benchmarks_gate'], ['qubits'], [('p.name', 'ECR')])
+        self.assertIn("left join benchmarks_gatesetmembership as o", sql)
+        self.assertEqual(params, ['%ECR%'])
+
+    def test_unknown_identifiers_are_rejected(self):
+        with self.assertRaises(ValueError):
+            manytable_query(['benchmarks_system'], ['benchmarks_system.name'], [('1=1) or (1', 'x')])
+        with self.assertRaises(ValueError):
+            manytable_query(['benchmarks_system'], ['benchmarks_solver.name'], [])
+        with self.assertRaises(ValueError):
+            custom_query('benchmarks_system', [], ['name; DROP TABLE benchmarks_system'], [])
+        with self.assertRaises(ValueError):
+            custom_query('benchmarks_errorlog', [], ['*'], [])
+
+    def test_filters_are_typed_by_column(self):
+        with connection.cursor() as cursor:
+            cursor.executemany("INSERT INTO benchmarks_system (name, intro_year) VALUES (%s, %s)", [("ibm_torino", 2023), ("ibm_kyiv", 2022), ("ionq_aria", 2022), ("100%_real", 2019)])
+        def names(filters):
+            sql, params, keys = manytable_query(['benchmarks_system'], ['benchmarks_system.name'], filters)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return sorted(row[0] for row in cursor.fetchall())
+
+        self.assertEqual(names([('benchmarks_system.intro_year', '2022')]), ["ibm_kyiv", "ionq_aria"])
+        self.assertEqual(names([('benchmarks_system.intro_year', '>=2022')]), ["ibm_kyiv", "ibm_torino", "ionq_aria"])
+        self.assertEqual(names([('benchmarks_system.intro_year', '2019..2022')]), ["100%_real", "ibm_kyiv", "ionq_aria"])
+        self.assertEqual(names([('benchmarks_system.intro_year', '2019, 2023')]), ["100%_real", "ibm_torino"])
+        self.assertEqual(names([('benchmarks_system.name', 'ibm*'), ('benchmarks_system.intro_year', '..2022')]), ["ibm_kyiv"])
+        self.assertEqual(names([('benchmarks_system.name', '%_')]), ["100%_real"])
+        self.assertEqual(names([('benchmarks_system.name', 'ionq_aria|ibm_kyiv')]), ["ibm_kyiv", "ionq_aria"])
+
+        sql, params, keys = manytable_query(['benchmarks_system'], ['benchmarks_system.name'], [('benchmarks_system.intro_year', '>2020')])
+        self.assertIn("benchmarks_system.intro_year > %s", sql)
+        self.assertNotIn("cast(", sql)
+        self.assertEqual(params, [2020])
+        with self.assertRaises(ValueError):
+            manytable_query(['benchmarks_system'], ['benchmarks_system.name'], [('benchmarks_system.intro_year', 'abc')])
+        sql, params, keys = custom_query('benchmarks_system', ['benchmarks_calibration'], ['*'], [('k.date', '2024-01-01..2024-02-01')])
+        self.assertIn("k.date BETWEEN %s AND %s", sql)
+
+
+class PaginationTests(TestCase):
+    """
+    Keyset pagination of the table views: pages follow the key order, next and previous cursors walk the whole result exactly once
+    """
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO benchmarks_system (name) VALUES (%s)', [(f"system {number}",) for number in range(120)])
+            cursor.execute('SELECT id FROM benchmarks_system ORDER BY id')
+            system_ids = [system_id for (system_id,) in cursor.fetchall()]
+            # two calibrations for some systems, none for others: the (system, calibration) key is not unique on its first column
+            cursor.executemany('INSERT INTO benchmarks_calibration (system_id, clops) VALUES (%s, %s)', [(system_id, clops) for system_id in system_ids[::3] for clops in (1, 2)])
+
+    def test_cursors_walk_every_row_once(self):
+        sql = f'SELECT a.name, b.clops, a.id AS page_key0, COALESCE(b.id, 0) AS page_key1 FROM benchmarks_system as a left join benchmarks_calibration as b on a.id = b.system_id {SEEK_WHERE}'
+        keys = ("a.id", "COALESCE(b.id, 0)")
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT name, clops FROM ({sql}) rows ORDER BY page_key0, page_key1')
+            expected = cursor.fetchall()
+
+            pages = [fetch_page(cursor, sql, [], keys, page_size=50)]
+            while pages[-1].next_cursor:
+                pages.append(fetch_page(cursor, sql, [], keys, after=pages[-1].next_cursor, page_size=50))
+            self.assertEqual([row for page in pages for row in page.rows], expected)
+            self.assertEqual([len(page.rows) for page in pages], [50, 50, 50, 10])
+            self.assertIsNone(pages[0].previous_cursor)
+            self.assertEqual(pages[0].columns, ["name", "clops"])
+
+            previous = fetch_page(cursor, sql, [], keys, before=pages[2].previous_cursor, page_size=50)
+            self.assertEqual(previous.rows, pages[1].rows)
+            self.assertEqual(previous.next_cursor, pages[1].next_cursor)
+            for cursor_value in ("not a cursor", encode_cursor([1]), encode_cursor([1, "x"]), encode_cursor([1.5, 2]), encode_cursor([True, 2])):
+                with self.assertRaises(BadRequest):
+                    fetch_page(cursor, sql, [], keys, after=cursor_value, page_size=50)
+
+        self.assertEqual(self.client.get('/benchmarks/system/', {'after': 'not a cursor'}).status_code, 400)
+        self.assertEqual(self.client.get('/benchmarks/customize/', {'base': 'benchmarks_system', 'before': encode_cursor(["a"])}).status_code, 400)
+
+    def test_seek_uses_the_id_index(self):
+        sql, params, keys = custom_query('benchmarks_system', ['benchmarks_calibration'], ['b.name', 'k.clops'], [])
+        self.assertEqual(keys, ("b.id", "COALESCE(k.id, 0)"))
+        with CaptureQueriesContext(connection) as queries, connection.cursor() as cursor:
+            first = fetch_page(cursor, sql, params, keys, page_size=50)
+            fetch_page(cursor, sql, params, keys, after=first.next_cursor, page_size=50)
+        page_sql = queries[-1]["sql"] # the seek is part of the query's own WHERE clause and ORDER BY
+        self.assertIn(" WHERE b.id >= ", page_sql)
+        self.assertTrue(page_sql.endswith("ORDER BY b.id, COALESCE(k.id, 0) LIMIT 51"))
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + page_sql)
+                self.assertIn("USING INTEGER PRIMARY KEY (rowid>?)", " ".join(str(row[-1]) for row in cursor.fetchall()))
+
+    def test_views_render_one_page(self):
+        response = self.client.get('/benchmarks/system/', {'page_size': 100})
+        self.assertEqual(len(response.context['joined_results']), 100)
+        self.assertNotIn('page_key0', response.context['columns'])
+        next_page = self.client.get('/benchmarks/system/?' + response.context['page'].next_query)
+        self.assertEqual(len(next_page.context['joined_results']), 60)
+        self.assertIsNone(next_page.context['page'].next_query)
+
+class ExportTests(TestCase):
+    """
+    Streaming csv/tsv exports of the query builder pages: every row of the query, without the page keys, in chunks
+    """
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO benchmarks_system (name) VALUES (%s)', [(f"system, {number}",) for number in range(250)])
+
+    def test_exports_stream_every_row(self):
+        response = self.client.get('/benchmarks/ManyTable/', {'tables': 'benchmarks_system', 'columns': 'benchmarks_system.name', 'export': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="manytable.csv"')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ['benchmarks_system.name'])
+        self.assertEqual(sorted(row[0] for row in rows[1:]), sorted(f"system, {number}" for number in range(250)))
+
+        chunks = list(export_chunks('SELECT name, id AS page_key0 FROM benchmarks_system', [], 1, delimiter="\t", chunk_size=100))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0].splitlines()[0], "name")
+        self.assertEqual(sum(len(chunk.splitlines()) for chunk in chunks), 251)
+
+        response = self.client.get('/benchmarks/customize/', {'base': 'benchmarks_system', 'columns': 'name', 'filter': ['name', '24'], 'export': 'tsv'})
+        self.assertEqual(response['Content-Type'], 'text/tab-separated-values; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'name')
+        self.assertEqual(sorted(lines[1:]), sorted(f"system, {number}" for number in range(250) if '24' in str(number)))
+
+class SearchTests(TestCase):
+    """
+    Search index of names, notes and urls: ranked matches, kept in sync with the searched tables and used by the query builder's contains filters
+    """
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO benchmarks_system (name, notes) VALUES (%s, %s)', [("ibm_torino", "Heron r1"), ("ibm_kyiv", "Eagle r3, heavy hex"), ("ionq_aria", None)])
+            cursor.executemany('INSERT INTO benchmarks_solver (name) VALUES (%s)', [("Gurobi",), ("Heron solver",)])
+
+    def test_search_ranks_matches(self):
+        self.assertEqual({(result.table, result.fields["name"]) for result in search("heron")}, {("benchmarks_system", "ibm_torino"), ("benchmarks_solver", "Heron solver")})
+        self.assertEqual([result.fields["name"] for result in search("heron", ["benchmarks_solver"])], ["Heron solver"])
+        self.assertEqual([result.fields["name"] for result in search("EAGLE hex")], ["ibm_kyiv"])
+        self.assertEqual([result.fields["name"] for result in search("io")], ["ionq_aria"])
+        with self.assertRaises(ValueError):
+            search("heron", ["benchmarks_errorlog"])
+
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE benchmarks_system SET notes = 'Nighthawk' WHERE name = 'ibm_torino'")
+            cursor.execute("DELETE FROM benchmarks_solver WHERE name = 'Heron solver'")
+        self.assertEqual(search("heron"), [])
+        response = self.client.get('/benchmarks/api/search/', {'q': 'nighthawk'})
+        self.assertEqual([(result["table"], result["name"]) for result in response.json()["results"]], [("benchmarks_system", "ibm_torino")])
+
+    def test_query_builder_filters_use_the_index(self):
+        sql, params, keys = manytable_query(['benchmarks_system'], ['benchmarks_system.name'], [('benchmarks_system.notes', 'r3, hea')])
+        if connection.vendor == 'sqlite':
+            self.assertIn("benchmarks_system.id IN (SELECT rowid", sql)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            self.assertEqual([row[0] for row in cursor.fetchall()], ["ibm_kyiv"])
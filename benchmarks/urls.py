@@ -50,4 +50,7 @@ urlpatterns = [
 
     path('customize/', customize, name='customize'),
     path('ManyTable/', manytable, name='manytable'),
+
+    path('api/ingest/reports/', views.ingestreports, name='ingest_reports'),
+    path('api/search/', views.searchrows, name='search'),
 ]
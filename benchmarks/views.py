@@ -1,5 +1,6 @@
+import os
 from django.shortcuts import render
-from .forms import PerformanceReportForm, ProblemForm
+from .forms import PerformanceReportForm, ProblemForm, ProcessorForm
 from django_tables2 import SingleTableView
 from django.contrib.admin.views.decorators import staff_member_required
 from .models import Topology, Manufacturer, Technology, Processor, GateSet, Gate, GateSetMembership
@@ -8,12 +9,21 @@ from .models import Graph, Problem, PerformanceReport
 from .models import CompilationTool, CompilationAlgorithmn, CompilationStep, PerformanceValue, ProblemInstance
 from .tables import ManufacturerTable, TechnologyTable, TopologyTable, ProcessorTable, GateSetTable, GateTable, GateSetMembershipTable, SystemTable, CalibrationTable, GraphTable, ProblemTable, PerformanceReportTable, SolverTable,PerformanceMetricTable
 from .tables import CompilationToolTable, CompilationAlgorithmnTable, CompilationStepTable, PerformanceValueTable, ProblemInstanceTable
+from django.core.exceptions import BadRequest
 from django.db import connection
-from django.http import HttpRequest
-from .models import ErrorLog
+from django.http import FileResponse, Http404, HttpRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from .models import ErrorLog, UploadJob
 from .graph import graph
-import os
-from .csvupload import handle_problem_upload, handle_performance_report_upload
+from .jobs import submit_upload, job_progress
+from .ingest import INLINE_MESSAGES, read_log
+from .jsoningest import authenticate, ingest_reports
+from .pagination import SEEK_WHERE, paginate
+from .export import EXPORT_FORMATS, export_query, export_response
+from .search import MAX_SEARCH_LIMIT, SEARCH_LIMIT, search
+from .querybuilder import CUSTOM_DEFAULT_BASE, METRIC_COLUMNS, custom_query, manytable_query
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 # Create your views here.
 def index(request):
@@ -122,27 +132,9 @@ class PerformanceReportTable(SingleTableView):
     template_name = "benchmarks/table.html"
 
 def Performance(request):
-    extrastringcreate = '''
-        CREATE TEMPORARY TABLE temp_metric (
-        performance_report_id INTEGER,
-        combined TEXT,
-        chosen TEXT)'''
-
-    extrastringinsert = '''INSERT INTO temp_metric (performance_report_id, combined, chosen)
-    SELECT performance_report_id,
-    string_agg(value || ' ' || name, ', ') AS combined,
-    MAX(CASE 
-        WHEN name = 'Modularity Ratio (current/Best)' THEN value
-            ELSE NULL
-        END) AS chosen
-    FROM benchmarks_performancevalue
-    full join benchmarks_performancemetric on benchmarks_performancemetric.id = benchmarks_performancevalue.metric_id
-    group by performance_report_id
-    '''
+    # the performance values of a report are aggregated for the rows of the page only
     with connection.cursor() as cursor:
-        cursor.execute(extrastringcreate)
-        cursor.execute(extrastringinsert)
-        cursor.execute('''SELECT a.id,
+        page = paginate(request, cursor, '''SELECT a.id,
         a.qubo_var_count,
         a.qubo_quad_term_count,
         a.qubit_count,
@@ -151,11 +143,14 @@ def Performance(request):
         a.max_chain_length,
         a.num_runs,
         b.name,
-        temp_metric.combined,
-        temp_metric.chosen,
+        (SELECT string_agg(v.value || ' ' || m.name, ', ') FROM benchmarks_performancevalue as v
+            join benchmarks_performancemetric as m on m.id = v.metric_id where v.performance_report_id = a.id) AS combined,
+        (SELECT MAX(v.value) FROM benchmarks_performancevalue as v
+            join benchmarks_performancemetric as m on m.id = v.metric_id where v.performance_report_id = a.id and m.name = 'Modularity Ratio (current/Best)') AS chosen,
         e.version,
         f.name,
-        g.name
+        g.name,
+        a.id AS page_key0, COALESCE(c.id, 0) AS page_key1, COALESCE(e.id, 0) AS page_key2
          FROM benchmarks_PerformanceReport as a 
         left join benchmarks_solver as b on a.solver_id =b.id
         left join benchmarks_performanceValue as c on c.performance_report_id = a.id 
@@ -163,40 +158,39 @@ def Performance(request):
         left join benchmarks_compilationstep as e on e.performance_report_id = a.id
         left join benchmarks_compilationAlgorithmn as f on f.id= e.compilation_Algorithmn_id
         left join benchmarks_compilationTool as g on g.id = e.compilation_tool_id
-        full join temp_metric on a.id = temp_metric.performance_report_id''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("a.id", "COALESCE(c.id, 0)", "COALESCE(e.id, 0)"))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/Report.html', context)
 
 def ProblemInstanceList(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT a.id,
+        page = paginate(request, cursor, '''SELECT a.id,
         a.graph_size,
         b.name,
-        c.name FROM benchmarks_ProblemInstance as a 
+        c.name,
+        a.id AS page_key0 FROM benchmarks_ProblemInstance as a 
         left join benchmarks_graph as b on a.graph_id =b.id
         left join benchmarks_problem as c on c.id = a.problem_id
-        ''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("a.id",))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/ProblemInstance.html', context)
 
@@ -204,19 +198,18 @@ def ProblemInstanceList(request):
 def SystemCali(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT * FROM benchmarks_system as a 
+        page = paginate(request, cursor, '''SELECT *, a.id AS page_key0, COALESCE(b.id, 0) AS page_key1 FROM benchmarks_system as a 
         left join benchmarks_calibration as b on a.id= b.system_id
-        ''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("a.id", "COALESCE(b.id, 0)"))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/System.html', context)
 
@@ -225,87 +218,85 @@ def SystemCali(request):
 def ProcessorList(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT * FROM benchmarks_Processor as a 
+        page = paginate(request, cursor, '''SELECT *, a.id AS page_key0 FROM benchmarks_Processor as a 
         left join benchmarks_manufacturer as b on a.manufacturer_id =b.id
         left join benchmarks_technology as c on c.id = a.technology_id
         left join benchmarks_topology as d on a.topology_id=d.id
-        ''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("a.id",))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/Processor.html', context)
 
 def GateList(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT * FROM benchmarks_gateset as a 
+        page = paginate(request, cursor, '''SELECT *, a.id AS page_key0, COALESCE(b.id, 0) AS page_key1 FROM benchmarks_gateset as a 
         left join benchmarks_gatesetmembership as b on a.id =b.gate_set_id
         left join benchmarks_gate as c on c.id = b.gate_id
-        ''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("a.id", "COALESCE(b.id, 0)"))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/Gate.html', context)
 
 def Value(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT performance_report_id,
+        page = paginate(request, cursor, '''SELECT performance_report_id,
         string_agg(value || ' ' || name, ', ') AS combined,
         MAX(CASE 
                WHEN name = 'Modularity Ratio (current/Best)' THEN value
                ELSE NULL
-           END) AS Desire
+           END) AS Desire,
+        COALESCE(performance_report_id, 0) AS page_key0
         FROM benchmarks_performancevalue
         full join benchmarks_performancemetric on benchmarks_performancemetric.id = benchmarks_performancevalue.metric_id
+        ''' + SEEK_WHERE + '''
         group by performance_report_id
-        ''')
-        joined_results = cursor.fetchall()
+        ''', [], ("COALESCE(performance_report_id, 0)",))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/maintable.html', context)
 def Value2(request):
     
     with connection.cursor() as cursor:
-        cursor.execute('''SELECT *
+        page = paginate(request, cursor, '''SELECT *,
+        COALESCE(benchmarks_performancevalue.id, 0) AS page_key0, COALESCE(benchmarks_performancemetric.id, 0) AS page_key1
         FROM benchmarks_performancevalue
         full join benchmarks_performancemetric on benchmarks_performancemetric.id = benchmarks_performancevalue.metric_id
-        
-        ''')
-        joined_results = cursor.fetchall()
+        ''' + SEEK_WHERE, [], ("COALESCE(benchmarks_performancevalue.id, 0)", "COALESCE(benchmarks_performancemetric.id, 0)"))
 
     # Check if any results were fetched
-    if not joined_results:
+    if not page.rows:
         print("No results found")
 
-    columns = [col[0] for col in cursor.description]
     context = {
-        'joined_results': joined_results,  # Ensure this matches your template
-        'columns': columns
+        'joined_results': page.rows,  # Ensure this matches your template
+        'columns': page.columns,
+        'page': page,
     }
     return render(request, 'benchmarks/maintable.html', context)
 
@@ -318,18 +309,7 @@ def customize(request: HttpRequest):
 
     
 
-    if user_base:
-        base = user_base[0]
-        if base == "benchmarks_performancereport":
-            basetable = "benchmarks_performanceReport as a"
-        elif base == "benchmarks_system":
-            basetable = "benchmarks_system as b"
-        elif base == "benchmarks_gateset":
-            basetable = "benchmarks_gateset as c"
-        elif base == "benchmarks_probleminstance":
-            basetable = "benchmarks_probleminstance as d"
-    else:
-        basetable = "benchmarks_performanceReport as a"
+    base = user_base[0] if user_base else CUSTOM_DEFAULT_BASE
 
     if not user_columns or "reset" in user_columns:
         user_columns = ["*"]
@@ -338,57 +318,25 @@ def customize(request: HttpRequest):
     if user_filter:
         for index in range(0,len(user_filter)-1,2):
             if user_filter[index+1] != '':
-                filter.append(user_filter[index] + " like '%" + user_filter[index+1] + "%'")
-    
-
-
-    join_clauses = []
-    if user_joins:
-        for table in user_joins:
-            if basetable == "benchmarks_performanceReport as a":
-                if table == "benchmarks_solver":
-                    join_clauses.append("left join benchmarks_solver as e on a.solver_id = e.id")
-                elif table == "benchmarks_performanceValue":
-                    join_clauses.append("left join benchmarks_performanceValue as f on f.performance_report_id = a.id")
-                elif table == "benchmarks_compilationstep":
-                    join_clauses.append("left join benchmarks_compilationstep as g on g.performance_report_id = a.id")
-                elif table == "benchmarks_system":
-                    join_clauses.append("left join benchmarks_system as h on h.id = a.system_id")
-                elif table == "benchmarks_probleminstance":
-                    join_clauses.append("left join benchmarks_probleminstance as i on i.id = a.problem_id")
-            elif basetable == "benchmarks_system as b":
-                if table == "benchmarks_performancereport":
-                    join_clauses.append("left join benchmarks_performancereport as j on j.system_id = b.id")
-                elif table == "benchmarks_calibration":
-                    join_clauses.append("left join benchmarks_calibration as k on k.system_id = b.id")
-                elif table == "benchmarks_manufacturer":
-                    join_clauses.append("left join benchmarks_manufacturer as l on l.id = b.manufactor_id")
-                elif table == "benchmarks_processor":
-                    join_clauses.append("left join benchmarks_processor as m on m.id = b.processor_id")
-                elif table == "benchmarks_gateset":
-                    join_clauses.append("left join benchmarks_gateset as n on n.id = b.gateset_id")
-            elif basetable == "benchmarks_gateset as c":
-                if table == "benchmarks_gatesetmembership":
-                    join_clauses.append("left join benchmarks_gatesetmembership as o on o.gate_set_id=c.id")
-                elif table == "benchmarks_gate":
-                    join_clauses.append("left join benchmarks_gate as p on p.id=o.gate_id")
-            elif basetable == "benchmarks_probleminstance as d":
-                if table == "benchmarks_graph":
-                    join_clauses.append("left join benchmarks_graph as q on q.id = d.graph_id")
-                elif table == "benchmarks_problem":
-                    join_clauses.append("left join benchmarks_problem as r on r.id = d.problem_id")
-
-    sql_query = f"SELECT {', '.join(user_columns)} FROM {basetable} {' '.join(join_clauses)} "
-    if filter:
-        sql_query += 'where ' + ' and '.join(filter)
+                filter.append((user_filter[index], user_filter[index+1]))
+
+    # identifiers are checked against the models, filter values are parameters
+    try:
+        sql_query, params, keys = custom_query(base, user_joins, user_columns, filter)
+    except ValueError as e:
+        ErrorLog.objects.create(error_message=str(e), querycode=f"base={base} joins={user_joins} columns={user_columns} filters={filter}")
+        return render(request, 'benchmarks/index.html')
     print(sql_query)
-
+    if request.GET.get('export') in EXPORT_FORMATS:
+        return export_response(request.GET['export'], 'customize', sql_query, params, len(keys))
 
     with connection.cursor() as cursor:
         try:
-            cursor.execute(sql_query)
-            joined_results = cursor.fetchall()
-            columns = [col[0] for col in cursor.description]
+            page = paginate(request, cursor, sql_query, params, keys)
+            joined_results = page.rows
+            columns = page.columns
+        except BadRequest: # invalid page cursor, answered with 400
+            raise
         except Exception as e:
             error_message = str(e)
             stack_trace = ""
@@ -401,7 +349,9 @@ def customize(request: HttpRequest):
         'columns': columns,
         'selected_columns': user_columns,
         'selected_joins': user_joins,
-        'selected_base': user_base
+        'selected_base': user_base,
+        'page': page,
+        'export_query': export_query(request),
     }
     return render(request, 'benchmarks/custom.html', context)
 
@@ -426,11 +376,9 @@ def manytable(request: HttpRequest):
         user_tables.append("benchmarks_technology")
 
 
-    if user_tables:
-        existing_col,join_clauses = graph.connect_all(user_tables)
-    else:
-        join_clauses = "benchmarks_manufacturer"
-        existing_col = ['benchmarks_manufacturer.name']
+    if graph.plan_joins(user_tables) is None:
+        user_tables = ['benchmarks_manufacturer']
+    existing_col = graph.connect_all(user_tables)[0]
     #print(existing_col)
     displaycol =[]
     if not user_columns or "reset" in user_columns:
@@ -447,15 +395,20 @@ def manytable(request: HttpRequest):
         displaycol.append('temp_metric.combined')
         displaycol.append('temp_metric.chosen')
 
+    # filters on columns outside the join tree are dropped, values are bound as parameters
     filter=[]
     if user_filter:
+        allowed = [col.strip() for col in existing_col] + (list(METRIC_COLUMNS) if extra else [])
         for index in range(0,len(user_filter)-1,2):
-            if user_filter[index+1] != '':
-                filter.append("cast("+user_filter[index]+" as text )" + " like '%" + user_filter[index+1] + "%'")
-    
-
-
-    sql_query = f"SELECT {', '.join(displaycol)} FROM {join_clauses} "
+            if user_filter[index+1] != '' and user_filter[index].strip() in allowed:
+                filter.append((user_filter[index], user_filter[index+1]))
+
+    # filter values are checked against the column types
+    try:
+        sql_query, params, keys = manytable_query(user_tables, displaycol, filter, extra)
+    except ValueError as e:
+        ErrorLog.objects.create(error_message=str(e), querycode=f"tables={user_tables} columns={displaycol} filters={filter}")
+        return render(request, 'benchmarks/index.html')
     extrastring=''
     if extra:
         extrastringcreate = '''
@@ -476,11 +429,6 @@ def manytable(request: HttpRequest):
         group by performance_report_id
 
         '''
-        sql_query = sql_query + " full join temp_metric on benchmarks_performancereport.id = temp_metric.performance_report_id"
-    if filter:
-        sql_query += ' where ' + ' and '.join(filter)
-
-    
 
     group=[]
     colname=[]
@@ -502,12 +450,15 @@ def manytable(request: HttpRequest):
     #print(groupnum)
     combined = [(name, groupnum[name]) for name in group]
     print(sql_query)
+    if request.GET.get('export') in EXPORT_FORMATS:
+        return export_response(request.GET['export'], 'manytable', sql_query, params, len(keys), displaycol,
+                               (extrastringcreate, extrastringinsert) if extra else ())
     with connection.cursor() as cursor:
             if extra:
                 cursor.execute(extrastringcreate)
                 cursor.execute(extrastringinsert)
-            cursor.execute(sql_query)
-            joined_results = cursor.fetchall()
+            page = paginate(request, cursor, sql_query, params, keys)
+            joined_results = page.rows
             columns = displaycol
 
     context = {
@@ -518,6 +469,8 @@ def manytable(request: HttpRequest):
         'selected_tables': tab,
         'colname': colname,
         'combined': combined,
+        'page': page,
+        'export_query': export_query(request),
     }
     return render(request, 'benchmarks/ManyTableBackup.html', context)
 
@@ -525,42 +478,101 @@ def manytable(request: HttpRequest):
 def dataupload(request): # handles csv uploads
     performance_report_form = PerformanceReportForm()
     problem_form = ProblemForm()
+    processor_form = ProcessorForm()
 
     context = {
         'performance_report_form': performance_report_form,
         'performance_report_upload_summary': '',
+        'performance_report_job': None,
         'problem_form': problem_form,
         'problem_upload_summary': '',
+        'problem_job': None,
+        'processor_form': processor_form,
+        'processor_upload_summary': '',
+        'processor_job': None,
+        'inline_messages': INLINE_MESSAGES,
         'has_permission': True
     }
 
+    # uploads run as background jobs, the page polls the job's progress and reloads with ?job=<id> once it finished
     if request.method == 'POST':
         if 'performanceReportFile' in request.FILES:
             performance_report_form = PerformanceReportForm(request.POST, request.FILES)
 
             if performance_report_form.is_valid():
-                temporaryFile = "tmp" + request.FILES["performanceReportFile"].name
-                with open(temporaryFile, "wb+") as file:
-                    for chunk in request.FILES["performanceReportFile"].chunks():
-                        file.write(chunk)
-
-                upload_summary = handle_performance_report_upload(temporaryFile)
-                context['performance_report_upload_summary'] = upload_summary
-
-                os.remove(temporaryFile)
+                context['performance_report_job'] = submit_upload('performance_report', request.FILES["performanceReportFile"], performance_report_form.cleaned_data["dryRun"])
 
         elif 'problemFile' in request.FILES:
             problem_form = ProblemForm(request.POST, request.FILES)
 
             if problem_form.is_valid():
-                temporaryFile = "tmp" + request.FILES["problemFile"].name
-                with open(temporaryFile, "wb+") as file:
-                    for chunk in request.FILES["problemFile"].chunks():
-                        file.write(chunk)
+                context['problem_job'] = submit_upload('problem', request.FILES["problemFile"], problem_form.cleaned_data["dryRun"])
 
-                upload_summary = handle_problem_upload(temporaryFile)
-                context['problem_upload_summary'] = upload_summary
+        elif 'processorFile' in request.FILES:
+            processor_form = ProcessorForm(request.POST, request.FILES)
 
-                os.remove(temporaryFile)
+            if processor_form.is_valid():
+                context['processor_job'] = submit_upload('processor', request.FILES["processorFile"], processor_form.cleaned_data["dryRun"])
+
+    elif request.GET.get('job', '').isdigit():
+        job = get_object_or_404(UploadJob, id=request.GET['job'])
+        context[f'{job.upload_type}_job'] = job
+        context[f'{job.upload_type}_upload_summary'] = job.summary or ''
 
     return render(request, 'admin/csvupload.html', context=context)
+
+@staff_member_required
+def uploadprogress(request, job_id): # progress of a background upload job as json
+    job = get_object_or_404(UploadJob, id=job_id)
+    return JsonResponse(job_progress(job))
+
+LOG_PAGE_SIZE = 200 # messages per page of an upload log
+
+@staff_member_required
+def uploadlog(request, job_id): # paginated messages of an upload job, optionally of one message type
+    job = get_object_or_404(UploadJob, id=job_id)
+    if not job.log_file or not os.path.exists(job.log_file):
+        raise Http404("The upload log of this job is not available")
+
+    message_type = request.GET.get('type') if request.GET.get('type') in ('success', 'exception', 'error') else None
+    counts = (job.summary or {}).get('message_counts', {})
+    total = counts.get(message_type, 0) if message_type else sum(counts.values())
+    pages = max(1, -(-total // LOG_PAGE_SIZE))
+    page = min(max(int(request.GET['page']) if request.GET.get('page', '').isdigit() else 1, 1), pages)
+
+    context = {
+        'job': job,
+        'messages': list(read_log(job.log_file, message_type, (page - 1) * LOG_PAGE_SIZE, LOG_PAGE_SIZE)),
+        'message_type': message_type or '',
+        'message_counts': counts,
+        'message_total': sum(counts.values()),
+        'page': page,
+        'pages': pages,
+        'first_row': (page - 1) * LOG_PAGE_SIZE + 1,
+        'has_permission': True,
+    }
+    return render(request, 'admin/uploadlog.html', context=context)
+
+@staff_member_required
+def uploadlogdownload(request, job_id): # the full upload log of a job as gzip compressed JSON Lines
+    job = get_object_or_404(UploadJob, id=job_id)
+    if not job.log_file or not os.path.exists(job.log_file):
+        raise Http404("The upload log of this job is not available")
+    return FileResponse(open(job.log_file, 'rb'), as_attachment=True, filename=f"upload-{job.id}-messages.jsonl.gz", content_type="application/gzip")
+
+def searchrows(request): # ranked matches of ?q= in the names, notes and urls of the searched tables (?tables=, ?limit=)
+    try:
+        limit = min(max(int(request.GET.get('limit', SEARCH_LIMIT)), 1), MAX_SEARCH_LIMIT)
+        results = search(request.GET.get('q', ''), request.GET.getlist('tables'), limit)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"results": [result.as_dict() for result in results]})
+
+@csrf_exempt
+@require_POST
+def ingestreports(request): # JSON Lines performance reports pushed by benchmark harnesses, authenticated with an IngestToken
+    if authenticate(request) is None:
+        return JsonResponse({"error": "missing or invalid ingest token"}, status=401)
+
+    # the request itself is iterated so the body is parsed line by line as it is read
+    return JsonResponse(ingest_reports(request))